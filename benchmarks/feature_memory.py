@@ -0,0 +1,96 @@
+"""Measure peak memory of ``FeatureEngine.add_indicators`` per configuration.
+
+Each configuration runs in a fresh interpreter so the reported peak resident
+set size (RSS) is not polluted by earlier runs.  Example::
+
+    python -m benchmarks.feature_memory --rows 2000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import resource
+import subprocess
+import sys
+import time
+import tracemalloc
+
+import numpy as np
+import pandas as pd
+
+
+CONFIGURATIONS = {
+    "finta": {"backend": "finta"},
+    "finta-low-memory": {"backend": "finta", "low_memory": True},
+    "numpy": {"backend": "numpy"},
+    "numpy-low-memory": {"backend": "numpy", "low_memory": True},
+}
+
+
+def synthetic_ohlcv(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Return a random-walk OHLCV frame with ``rows`` bars."""
+
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 0.5, rows)) + 1_000
+    open_ = close + rng.normal(0, 0.1, rows)
+    high = np.maximum(open_, close) + np.abs(rng.normal(0.2, 0.1, rows))
+    low = np.minimum(open_, close) - np.abs(rng.normal(0.2, 0.1, rows))
+    volume = rng.integers(1_000, 5_000, rows).astype(float)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume})
+
+
+def _peak_rss_mb() -> float:
+    # ru_maxrss is reported in kilobytes on Linux and bytes on macOS.
+    scale = 1 if sys.platform == "darwin" else 1024
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale / 1e6
+
+
+def measure(name: str, rows: int) -> dict:
+    """Run one configuration in this process and return its measurements."""
+
+    from engine.feature_engine import FeatureEngine
+
+    df = synthetic_ohlcv(rows)
+    baseline_rss = _peak_rss_mb()
+    tracemalloc.start()
+    started = time.perf_counter()
+    enriched = FeatureEngine(df, **CONFIGURATIONS[name]).add_indicators()
+    elapsed = time.perf_counter() - started
+    _current, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {
+        "configuration": name,
+        "rows": rows,
+        "seconds": round(elapsed, 3),
+        "input_mb": round(df.memory_usage().sum() / 1e6, 1),
+        "output_rows": len(enriched),
+        "traced_peak_mb": round(traced_peak / 1e6, 1),
+        "rss_before_mb": round(baseline_rss, 1),
+        "peak_rss_mb": round(_peak_rss_mb(), 1),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--configuration", choices=sorted(CONFIGURATIONS), default=None)
+    args = parser.parse_args()
+
+    if args.configuration:
+        print(json.dumps(measure(args.configuration, args.rows)))
+        return
+
+    for name in CONFIGURATIONS:
+        command = [sys.executable, "-m", "benchmarks.feature_memory", "--rows", str(args.rows)]
+        output = subprocess.run(
+            command + ["--configuration", name],
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout
+        print(output.strip())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""Compare the recursive indicators of the ``numpy`` kernels with Finta.
+
+EMA, MACD and RSI are exponentially weighted recursions that Finta evaluates
+through pandas ``ewm``; the kernels evaluate them with the block scan in
+:func:`engine.kernels.decay_scan`.  ATR and OBV are included for completeness.
+Example::
+
+    python -m benchmarks.recursive_indicators --rows 10000000
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import time
+from typing import Callable, Dict, Tuple
+
+import numpy as np
+import pandas as pd
+from finta import TA
+
+from benchmarks.feature_memory import synthetic_ohlcv
+from engine import kernels
+
+Arrays = Dict[str, np.ndarray]
+
+INDICATORS: Dict[str, Tuple[Callable[[pd.DataFrame], object], Callable[[Arrays], np.ndarray]]] = {
+    "EMA_10": (lambda df: TA.EMA(df, 10), lambda a: kernels.ema(a["close"], 10)),
+    "EMA_200": (lambda df: TA.EMA(df, 200), lambda a: kernels.ema(a["close"], 200)),
+    "RSI_14": (lambda df: TA.RSI(df, 14), lambda a: kernels.rsi(a["close"], 14)),
+    "MACD": (lambda df: TA.MACD(df)["MACD"], lambda a: kernels.macd(a["close"])[0]),
+    "ATR_14": (lambda df: TA.ATR(df, 14), lambda a: kernels.atr(a["high"], a["low"], a["close"], 14)),
+    "OBV": (lambda df: TA.OBV(df), lambda a: kernels.obv(a["close"], a["volume"])),
+}
+
+
+def _timed(func: Callable[[], object]) -> Tuple[float, np.ndarray]:
+    started = time.perf_counter()
+    result = func()
+    return time.perf_counter() - started, np.asarray(result, dtype=np.float64)
+
+
+def run(rows: int) -> list:
+    df = synthetic_ohlcv(rows)
+    arrays = {column: kernels.as_float_array(df[column]) for column in df.columns}
+    results = []
+    for name, (finta, native) in INDICATORS.items():
+        finta_seconds, expected = _timed(lambda: finta(df))
+        numpy_seconds, actual = _timed(lambda: native(arrays))
+        scale = np.nanmax(np.abs(expected))
+        results.append(
+            {
+                "indicator": name,
+                "rows": rows,
+                "finta_seconds": round(finta_seconds, 3),
+                "numpy_seconds": round(numpy_seconds, 3),
+                "speedup": round(finta_seconds / numpy_seconds, 1),
+                "max_relative_difference": float(np.nanmax(np.abs(actual - expected)) / scale),
+            }
+        )
+    return results
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+    for result in run(args.rows):
+        print(json.dumps(result))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""Benchmark suite with JSON baselines and regression gates.
+
+Times the feature engine, the backtester, the signal book and the path scorer
+on synthetic data, recording best-of-``repeat`` wall time, throughput, traced
+peak memory and (for ``add_indicators``) the time spent in each indicator.
+Record a baseline, then compare a later run against it::
+
+    python -m benchmarks.suite --scale quick --output baseline.json
+    python -m benchmarks.suite --scale quick --compare baseline.json --threshold 0.25
+
+Comparison exits with status 1 when any case is slower (or uses more memory)
+than the baseline by more than ``threshold``.  The ``full`` scale covers 1k to
+10M rows and 1 to 5k symbols and needs several gigabytes of memory.
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterator, List, Mapping, Optional
+
+import numpy as np
+import pandas as pd
+
+from benchmarks.feature_memory import synthetic_ohlcv
+from engine.feature_engine import BACKENDS, FeatureEngine
+from engine.integration import ArbitragePathScorer
+from engine.signals import SignalBook
+from engine.strategy_runner import StrategyRunner
+
+SCALES: Mapping[str, Mapping[str, List[int]]] = {
+    "quick": {
+        "rows": [1_000, 100_000],
+        "symbols": [1, 100],
+        "backtest_rows": [1_000, 10_000],
+        "paths": [1_000, 10_000],
+    },
+    "full": {
+        "rows": [1_000, 100_000, 1_000_000, 10_000_000],
+        "symbols": [1, 100, 5_000],
+        "backtest_rows": [1_000, 10_000, 100_000, 1_000_000, 10_000_000],
+        "paths": [1_000, 100_000],
+    },
+}
+
+# Rows per symbol in the multi-symbol cases.
+SYMBOL_ROWS = 1_000
+
+# Differences below these floors are treated as measurement noise by ``compare``.
+NOISE_FLOOR_SECONDS = 0.002
+NOISE_FLOOR_MB = 1.0
+
+
+@dataclass
+class Case:
+    """One benchmark: ``run`` is timed, ``units`` is the work it processes."""
+
+    name: str
+    units: int
+    run: Callable[[], object]
+    details: Optional[Callable[[], Dict[str, float]]] = None
+
+
+class _LogisticModel:
+    """Fixed linear model exposing ``predict_proba`` like a fitted classifier."""
+
+    def __init__(self, features: int, seed: int = 0) -> None:
+        self.weights = np.random.default_rng(seed).normal(size=features)
+
+    def predict_proba(self, X: np.ndarray) -> np.ndarray:
+        positive = 1.0 / (1.0 + np.exp(-(np.asarray(X) @ self.weights)))
+        return np.column_stack([1.0 - positive, positive])
+
+
+def _indicator_timings(df: pd.DataFrame, backend: str) -> Dict[str, float]:
+    """Time every default indicator of ``backend`` once, in dependency order."""
+
+    _, summary = FeatureEngine(df, dropna=False, backend=backend).profile_indicators()
+    seconds = summary.drop_duplicates("indicator").set_index("indicator")["seconds"]
+    return {key: round(value, 6) for key, value in seconds.items()}
+
+
+def _symbol_frames(symbols: int) -> Dict[str, pd.DataFrame]:
+    return {f"S{index:05d}": synthetic_ohlcv(SYMBOL_ROWS, seed=index) for index in range(symbols)}
+
+
+def build_cases(scale: str) -> Iterator[Case]:
+    """Yield the benchmark cases for ``scale``, building their inputs lazily."""
+
+    sizes = SCALES[scale]
+    for rows in sizes["rows"]:
+        df = synthetic_ohlcv(rows)
+        for backend in BACKENDS:
+            yield Case(
+                name=f"add_indicators[{backend},rows={rows}]",
+                units=rows,
+                run=lambda df=df, backend=backend: FeatureEngine(df, backend=backend).add_indicators(),
+                details=lambda df=df, backend=backend: _indicator_timings(df, backend),
+            )
+        del df
+
+    for symbols in sizes["symbols"]:
+        frames = _symbol_frames(symbols)
+        yield Case(
+            name=f"compute_many[serial,symbols={symbols}]",
+            units=symbols * SYMBOL_ROWS,
+            run=lambda frames=frames: FeatureEngine.compute_many(
+                frames, executor="serial", backend="numpy"
+            ),
+        )
+        panel = {
+            column: np.column_stack([frame[column].to_numpy() for frame in frames.values()])
+            for column in ("high", "low", "close", "volume")
+        }
+        yield Case(
+            name=f"compute_panel[symbols={symbols}]",
+            units=symbols * SYMBOL_ROWS,
+            run=lambda panel=panel: FeatureEngine.compute_panel(panel),
+        )
+        del frames, panel
+
+    signals = SignalBook()
+    for rows in sizes["backtest_rows"]:
+        enriched = FeatureEngine(synthetic_ohlcv(rows), backend="numpy").add_indicators()
+        yield Case(
+            name=f"run_backtest[rows={rows}]",
+            units=rows,
+            run=lambda enriched=enriched: StrategyRunner(enriched).run_backtest(
+                entry_rule="RSI < 35", exit_rule="RSI > 65", sl=0.05, tp=0.1
+            ),
+        )
+        yield Case(
+            name=f"signals[rows={rows}]",
+            units=rows * len(signals.registry),
+            run=lambda enriched=enriched: [
+                signals.evaluate(name, enriched) for name in signals.registry
+            ],
+        )
+        del enriched
+
+    for count in sizes["paths"]:
+        features = np.random.default_rng(count).normal(size=(count, 12))
+        scorer = ArbitragePathScorer(_LogisticModel(12))
+        yield Case(
+            name=f"score_paths[paths={count}]",
+            units=count,
+            run=lambda features=features, scorer=scorer: scorer.score_paths(
+                [{"features": row} for row in features]
+            ),
+        )
+
+
+def measure(case: Case, repeat: int) -> Dict[str, object]:
+    """Return timing, throughput and peak memory for ``case``."""
+
+    seconds = []
+    for _ in range(repeat):
+        gc.collect()
+        started = time.perf_counter()
+        case.run()
+        seconds.append(time.perf_counter() - started)
+    gc.collect()
+    tracemalloc.start()
+    case.run()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    best = min(seconds)
+    result: Dict[str, object] = {
+        "seconds": round(best, 6),
+        "units_per_second": round(case.units / best, 1),
+        "traced_peak_mb": round(peak / 1e6, 2),
+    }
+    if case.details is not None:
+        result["indicator_seconds"] = case.details()
+    return result
+
+
+def environment() -> Dict[str, str]:
+    return {
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "pandas": pd.__version__,
+        "platform": platform.platform(),
+    }
+
+
+def run_suite(scale: str, repeat: int, pattern: Optional[str] = None) -> Dict[str, object]:
+    results = {}
+    for case in build_cases(scale):
+        if pattern and pattern not in case.name:
+            continue
+        results[case.name] = measure(case, repeat)
+        print(f"{case.name:<45} {results[case.name]['seconds']:>10.4f}s", file=sys.stderr)
+    return {"scale": scale, "environment": environment(), "results": results}
+
+
+def _exceeds(now: float, before: float, threshold: float, floor: float) -> bool:
+    return now > before * (1 + threshold) and now - before > floor
+
+
+def compare(
+    baseline: Mapping[str, object], current: Mapping[str, object], threshold: float
+) -> List[Dict[str, object]]:
+    """Return one row per case present in both runs, flagging regressions beyond ``threshold``.
+
+    A case regresses when its time, its traced peak memory or the time of any
+    single indicator grows by more than ``threshold`` (relative) and by more
+    than the noise floors (absolute).
+    """
+
+    rows = []
+    for name, now in current["results"].items():
+        before = baseline["results"].get(name)
+        if before is None:
+            continue
+        indicators = now.get("indicator_seconds", {})
+        slow_indicators = [
+            key
+            for key, seconds in indicators.items()
+            if key in before.get("indicator_seconds", {})
+            and _exceeds(seconds, before["indicator_seconds"][key], threshold, NOISE_FLOOR_SECONDS)
+        ]
+        slower = _exceeds(now["seconds"], before["seconds"], threshold, NOISE_FLOOR_SECONDS)
+        larger = _exceeds(now["traced_peak_mb"], before["traced_peak_mb"], threshold, NOISE_FLOOR_MB)
+        rows.append(
+            {
+                "case": name,
+                "time_ratio": round(now["seconds"] / before["seconds"], 3),
+                "memory_ratio": round(now["traced_peak_mb"] / max(before["traced_peak_mb"], 1e-9), 3),
+                "slow_indicators": slow_indicators,
+                "regression": bool(slower or larger or slow_indicators),
+            }
+        )
+    return rows
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", choices=sorted(SCALES), default="quick")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--filter", default=None, help="Only run cases whose name contains this text")
+    parser.add_argument("--output", default=None, help="Write the results to this JSON file")
+    parser.add_argument("--compare", default=None, help="Baseline JSON file to compare against")
+    parser.add_argument("--threshold", type=float, default=0.2, help="Allowed relative slowdown")
+    args = parser.parse_args()
+
+    current = run_suite(args.scale, args.repeat, args.filter)
+    if args.output:
+        with open(args.output, "w") as handle:
+            json.dump(current, handle, indent=2)
+    if not args.compare:
+        if not args.output:
+            print(json.dumps(current, indent=2))
+        return
+
+    with open(args.compare) as handle:
+        baseline = json.load(handle)
+    rows = compare(baseline, current, args.threshold)
+    for row in rows:
+        flag = "REGRESSION" if row["regression"] else "ok"
+        if row["slow_indicators"]:
+            flag += " (" + ", ".join(row["slow_indicators"]) + ")"
+        print(f"{row['case']:<45} time x{row['time_ratio']:<7} memory x{row['memory_ratio']:<7} {flag}")
+    if any(row["regression"] for row in rows):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
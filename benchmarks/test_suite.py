@@ -0,0 +1,60 @@
+from benchmarks.suite import compare
+
+
+def _run(**cases) -> dict:
+    return {"results": cases}
+
+
+def _case(seconds=1.0, memory=100.0, indicators=None) -> dict:
+    case = {"seconds": seconds, "units_per_second": 1.0 / seconds, "traced_peak_mb": memory}
+    if indicators is not None:
+        case["indicator_seconds"] = indicators
+    return case
+
+
+def _verdicts(baseline: dict, current: dict, threshold: float = 0.2) -> dict:
+    return {row["case"]: row for row in compare(baseline, current, threshold)}
+
+
+def test_compare_flags_time_memory_and_single_indicator_regressions():
+    indicators = {"RSI": 0.1, "MACD": 0.2}
+    baseline = _run(
+        fast=_case(),
+        lean=_case(),
+        mixed=_case(indicators=indicators),
+        steady=_case(indicators=indicators),
+    )
+    current = _run(
+        fast=_case(seconds=1.5),
+        lean=_case(memory=150.0),
+        mixed=_case(indicators={"RSI": 0.2, "MACD": 0.2}),
+        steady=_case(seconds=1.1, memory=110.0, indicators={"RSI": 0.11, "MACD": 0.19}),
+    )
+
+    rows = _verdicts(baseline, current)
+    assert rows["fast"]["regression"] and rows["fast"]["time_ratio"] == 1.5
+    assert rows["lean"]["regression"] and rows["lean"]["memory_ratio"] == 1.5
+    assert rows["mixed"]["regression"] and rows["mixed"]["slow_indicators"] == ["RSI"]
+    assert not rows["steady"]["regression"] and rows["steady"]["slow_indicators"] == []
+
+
+def test_compare_ignores_noise_and_cases_or_indicators_without_a_baseline():
+    baseline = _run(
+        tiny=_case(seconds=0.001, memory=0.5, indicators={"RSI": 0.0005}),
+        bare=_case(),
+    )
+    current = _run(
+        # Several times slower, but by less than the absolute noise floors.
+        tiny=_case(seconds=0.0025, memory=1.2, indicators={"RSI": 0.0015}),
+        bare=_case(indicators={"RSI": 5.0}),
+        new=_case(seconds=100.0),
+    )
+
+    rows = _verdicts(baseline, current)
+    assert set(rows) == {"tiny", "bare"}
+    assert not rows["tiny"]["regression"] and rows["tiny"]["time_ratio"] == 2.5
+    assert not rows["bare"]["regression"] and rows["bare"]["slow_indicators"] == []
+
+    partial = _run(mixed=_case(indicators={"RSI": 0.1}))
+    grown = _run(mixed=_case(indicators={"RSI": 0.1, "ATR_14": 3.0}))
+    assert not _verdicts(partial, grown)["mixed"]["regression"]
@@ -1,9 +1,21 @@
 """Alpha Indicator engine package."""
 
 __all__ = [
+    "backtest",
+    "cache",
+    "execution",
     "feature_engine",
     "integration",
+    "kernels",
+    "metrics",
     "models",
+    "parallel",
+    "portfolio",
+    "profiling",
+    "rules",
     "signals",
     "strategy_runner",
+    "streaming",
+    "timeframes",
+    "walk_forward",
 ]
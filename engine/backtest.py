@@ -0,0 +1,517 @@
+"""Array-based trade simulation used by :class:`~engine.strategy_runner.StrategyRunner`.
+
+The simulator works on a ``float64`` close-price array and boolean entry and
+exit masks, optionally with a second pair of masks for short positions.
+Exits are first resolved for every bar that could open a position at once:
+the next rule exit comes from a binary search over the exit bars, and
+stop-loss and take-profit crossings within the next few bars are found with
+vectorised comparisons.  Following the chain of entry and exit
+events is then a short Python loop over list lookups.  Positions held longer
+than that look-ahead are resolved in batches: every chain stuck on such a
+position, across all stop-loss/take-profit combinations of a grid, scans a
+growing window of later bars together.
+"""
+
+from __future__ import annotations
+
+from collections.abc import Mapping
+from dataclasses import dataclass
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+EXIT_REASONS = ("stop_loss", "take_profit", "rule_exit", "end_of_data")
+STOP_LOSS, TAKE_PROFIT, RULE_EXIT, END_OF_DATA = range(len(EXIT_REASONS))
+
+LEDGER_DTYPE = np.dtype(
+    [
+        ("entry_index", np.int64),
+        ("exit_index", np.int64),
+        ("entry_price", np.float64),
+        ("exit_price", np.float64),
+        ("return_pct", np.float64),
+        ("reason", np.int8),
+        ("side", np.int8),
+    ]
+)
+
+LONG, SHORT = 1, -1
+
+# Bars after each potential entry checked for stops in the vectorised pass.
+_LOOKAHEAD = 16
+# Bars first checked beyond the look-ahead, and the cap on bars checked at once.
+_FIRST_SLICE = 64
+_SCAN_CELLS = 1 << 20
+
+
+@dataclass
+class TradeIndices:
+    """Entry bar, exit bar, exit reason code (into ``EXIT_REASONS``) and side of each trade.
+
+    ``side`` is ``LONG`` (``1``) or ``SHORT`` (``-1``); ``None`` means all long.
+    """
+
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    reason: np.ndarray
+    side: Optional[np.ndarray] = None
+
+    @property
+    def sides(self) -> np.ndarray:
+        return np.ones(len(self.entry_index), dtype=np.int8) if self.side is None else self.side
+
+    def __len__(self) -> int:
+        return len(self.entry_index)
+
+    @property
+    def reasons(self) -> List[str]:
+        return [EXIT_REASONS[code] for code in self.reason.tolist()]
+
+
+class TradeRecord(Mapping):
+    """Read-only view of one row of a :class:`TradeLedger`.
+
+    Behaves like the trade dicts earlier ledgers held - ``trade["reason"]``
+    is the reason name - and also exposes the fields as attributes.
+    """
+
+    __slots__ = ("_records", "_row")
+
+    def __init__(self, records: np.ndarray, row: int) -> None:
+        self._records, self._row = records, row
+
+    def __getitem__(self, key: str) -> Any:
+        value = self._records[key][self._row]
+        if isinstance(value, np.generic):
+            value = value.item()
+        return EXIT_REASONS[value] if key == "reason" else value
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except (KeyError, ValueError):
+            raise AttributeError(name) from None
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._records.dtype.names)
+
+    def __len__(self) -> int:
+        return len(self._records.dtype.names)
+
+    def __repr__(self) -> str:
+        return f"TradeRecord({self.to_dict()})"
+
+    def to_dict(self) -> Dict[str, Any]:
+        return dict(self.items())
+
+
+class TradeLedger:
+    """Trades stored column-wise in a structured array (``LEDGER_DTYPE`` by default).
+
+    Columns are read as arrays with ``ledger["return_pct"]`` (reasons as
+    codes into ``EXIT_REASONS``; :attr:`reasons` has the names), and
+    iterating or indexing with an integer yields :class:`TradeRecord` views,
+    so code written against a list of trade dicts keeps working.  A ledger
+    compares equal to another ledger with the same rows or to a sequence of
+    equal trade mappings.
+    """
+
+    __slots__ = ("records",)
+
+    def __init__(self, records: np.ndarray) -> None:
+        if records.dtype.names is None:
+            raise ValueError("A trade ledger needs a structured array")
+        self.records = records
+
+    @classmethod
+    def from_indices(cls, close: np.ndarray, indices: TradeIndices, returns: np.ndarray) -> TradeLedger:
+        """Build the ledger of ``indices`` with prices from ``close`` and the matching ``returns``."""
+
+        return cls.from_columns(
+            entry_index=indices.entry_index,
+            exit_index=indices.exit_index,
+            entry_price=close[indices.entry_index],
+            exit_price=close[indices.exit_index],
+            return_pct=returns,
+            reason=indices.reason,
+            side=indices.sides,
+        )
+
+    @classmethod
+    def from_columns(cls, **columns: np.ndarray) -> TradeLedger:
+        """Build a ledger from one array per ``LEDGER_DTYPE`` field."""
+
+        missing = set(LEDGER_DTYPE.names) - set(columns)
+        if missing:
+            raise ValueError(f"Missing ledger columns: {sorted(missing)}")
+        records = np.empty(len(columns["entry_index"]), dtype=LEDGER_DTYPE)
+        for name in LEDGER_DTYPE.names:
+            records[name] = columns[name]
+        return cls(records)
+
+    @property
+    def columns(self) -> Tuple[str, ...]:
+        return self.records.dtype.names
+
+    @property
+    def reasons(self) -> List[str]:
+        return [EXIT_REASONS[code] for code in self.records["reason"].tolist()]
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            return self.records[key]
+        if isinstance(key, slice):
+            return TradeLedger(self.records[key])
+        return TradeRecord(self.records, range(len(self.records))[key])
+
+    def __iter__(self) -> Iterator[TradeRecord]:
+        return (TradeRecord(self.records, row) for row in range(len(self.records)))
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, TradeLedger):
+            mine, theirs = self.records, other.records
+            return mine.dtype == theirs.dtype and np.array_equal(mine, theirs)
+        if isinstance(other, Sequence) and not isinstance(other, str):
+            return len(other) == len(self) and all(mine == theirs for mine, theirs in zip(self, other))
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"TradeLedger({len(self)} trades, columns={list(self.columns)})"
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Return the trades as a list of dicts."""
+
+        return [record.to_dict() for record in self]
+
+    def to_frame(self) -> pd.DataFrame:
+        """Return the trades as a dataframe with the reason names as a categorical column."""
+
+        frame = pd.DataFrame(self.records)
+        if "reason" in frame:
+            frame["reason"] = pd.Categorical.from_codes(frame["reason"], categories=EXIT_REASONS)
+        return frame
+
+    def to_parquet(self, path: Any, **kwargs: Any) -> None:
+        """Write the trades to a Parquet file; needs ``pyarrow`` or ``fastparquet``."""
+
+        self.to_frame().to_parquet(path, **kwargs)
+
+
+def _as_mask(condition: Any, length: int) -> np.ndarray:
+    mask = np.asarray(condition, dtype=bool)
+    if mask.shape != (length,):
+        raise ValueError(f"Rule masks must have one value per bar, got shape {mask.shape}")
+    return mask
+
+
+@dataclass
+class RuleEvents:
+    """Close prices, candidate entry bars and the next rule exit after each of them.
+
+    Everything here depends only on the rule masks, so one instance serves
+    simulations with any number of stop-loss and take-profit settings.  By
+    default a position opened at a candidate is priced at that bar's close
+    and its stops are checked against later closes; ``entry_price`` (one per
+    candidate) and ``low``/``high`` (one per bar) override these, as
+    :class:`~engine.execution.ExecutionModel` does.  ``side`` gives the
+    direction of each candidate, all long when ``None``.
+    """
+
+    close: np.ndarray
+    starts: np.ndarray
+    rule_bars: np.ndarray
+    entry_price: Optional[np.ndarray] = None
+    low: Optional[np.ndarray] = None
+    high: Optional[np.ndarray] = None
+    side: Optional[np.ndarray] = None
+
+    @property
+    def entry_prices(self) -> np.ndarray:
+        return self.close[self.starts] if self.entry_price is None else self.entry_price
+
+    @property
+    def stop_prices(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Prices checked against the stop-loss and the take-profit on each bar."""
+
+        low = self.close if self.low is None else self.low
+        return low, self.close if self.high is None else self.high
+
+
+def _threshold_hits(
+    low: np.ndarray, high: np.ndarray, entry: np.ndarray, side: Any, sl: Any, tp: Any
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return whether each ``low``/``high`` pair hits the stop-loss, and whether it hits either level.
+
+    Returns are computed as the bar-by-bar loop does; short positions (``side``
+    ``-1``) check the stop-loss against ``high`` and the take-profit against
+    ``low``, on negated returns.  ``NaN`` prices hit nothing.  All arguments
+    broadcast against each other.
+    """
+
+    if high is low:
+        change = side * (low - entry) / entry
+        loss = change <= -sl
+        return loss, loss | (change >= tp)
+    long = side == LONG
+    adverse, favourable = np.where(long, low, high), np.where(long, high, low)
+    loss = side * (adverse - entry) / entry <= -sl
+    return loss, loss | (side * (favourable - entry) / entry >= tp)
+
+
+def _distant_exits(
+    events: RuleEvents, candidates: np.ndarray, entry: np.ndarray, sl: np.ndarray, tp: np.ndarray
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the exit bars and reasons of positions held beyond the look-ahead window.
+
+    All ``candidates`` are resolved together, each with its own entry price,
+    stop-loss and take-profit: a window of bars after each look-ahead is
+    checked for every position still open, and the window grows fourfold
+    until each position has crossed a level or reached its rule exit.
+    """
+
+    length = len(events.close)
+    low, high = events.stop_prices
+    side = np.full(len(candidates), LONG) if events.side is None else events.side[candidates]
+    rule_bars = events.rule_bars[candidates]
+    stops = np.minimum(rule_bars + 1, length)
+    begin = events.starts[candidates] + _LOOKAHEAD + 1
+    crossing = np.full(len(candidates), -1, dtype=np.int64)
+    active = np.flatnonzero(begin < stops)
+    width = _FIRST_SLICE
+    while active.size:
+        # Bound the (positions, bars) temporaries however many positions are open.
+        span = max(1, min(width, _SCAN_CELLS // active.size))
+        bars = begin[active, None] + np.arange(span)
+        inside = bars < stops[active, None]
+        bars = np.where(inside, bars, 0)
+        low_bars = low[bars]
+        high_bars = low_bars if high is low else high[bars]
+        column = active[:, None]
+        _loss, hit = _threshold_hits(
+            low_bars, high_bars, entry[column], side[column], sl[column], tp[column]
+        )
+        hit &= inside
+        first = hit.argmax(axis=1)
+        found = hit[np.arange(len(active)), first]
+        crossing[active[found]] = bars[found, first[found]]
+        begin[active] += span
+        active = active[~found]
+        active = active[begin[active] < stops[active]]
+        width *= 4
+
+    crossed = crossing >= 0
+    bars = np.where(crossed, crossing, stops - 1)
+    at = bars[crossed]
+    high_at = low[at] if high is low else high[at]
+    loss, _hit = _threshold_hits(
+        low[at], high_at, entry[crossed], side[crossed], sl[crossed], tp[crossed]
+    )
+    reason = np.where(rule_bars < length, RULE_EXIT, END_OF_DATA).astype(np.int8)
+    reason[crossed] = np.where(loss, STOP_LOSS, TAKE_PROFIT)
+    return bars, reason
+
+
+def _nearby_exits(events: RuleEvents, sl: float, tp: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the exit bar and reason of a position opened at each of ``events.starts``.
+
+    Positions that neither cross a threshold nor reach their rule exit or the
+    last bar within ``_LOOKAHEAD`` bars get exit bar ``-1``.  Returns are
+    computed exactly as the bar-by-bar loop does, so threshold ties resolve
+    identically.  Short positions check their stop-loss against ``high``
+    and their take-profit against ``low``, on negated returns.
+    """
+
+    starts, rule_bars = events.starts, events.rule_bars
+    length = len(events.close)
+    low, high = events.stop_prices
+    exit_bar = np.full(len(starts), -1, dtype=np.int64)
+    reason = np.full(len(starts), RULE_EXIT, dtype=np.int8)
+    stops = np.minimum(rule_bars + 1, length)
+    entry = events.entry_prices
+    held = np.arange(len(starts))
+    for offset in range(1, _LOOKAHEAD + 1):
+        bars = starts[held] + offset
+        reached = bars >= stops[held]
+        if reached.any():
+            # No crossing before the stop: exit on the rule, or at the last bar.
+            done = held[reached]
+            exit_bar[done] = stops[done] - 1
+            reason[done] = np.where(rule_bars[done] < length, RULE_EXIT, END_OF_DATA)
+            held, bars = held[~reached], bars[~reached]
+        if not held.size:
+            break
+        if events.side is None:
+            adverse, favourable, side = low[bars], high[bars], 1
+        else:
+            side = events.side[held]
+            adverse = np.where(side == LONG, low[bars], high[bars])
+            favourable = adverse if high is low else np.where(side == LONG, high[bars], low[bars])
+        change = side * (adverse - entry[held]) / entry[held]
+        loss = change <= -sl
+        if favourable is not adverse:
+            change = side * (favourable - entry[held]) / entry[held]
+        hit = loss | (change >= tp)
+        exit_bar[held[hit]] = bars[hit]
+        reason[held[hit]] = np.where(loss[hit], STOP_LOSS, TAKE_PROFIT)
+        held = held[~hit]
+    return exit_bar, reason
+
+
+def _next_exits(starts: np.ndarray, exits: np.ndarray, length: int) -> np.ndarray:
+    exit_bars = np.flatnonzero(exits)
+    return np.append(exit_bars, length)[np.searchsorted(exit_bars, starts, side="right")]
+
+
+def rule_events(
+    close: Any, entries: Any, exits: Any, short_entries: Any = None, short_exits: Any = None
+) -> RuleEvents:
+    """Locate the entry candidates and rule exits of boolean ``entries`` and ``exits`` masks.
+
+    ``short_entries`` and ``short_exits`` add short candidates with their own
+    rule exits; a bar that signals both sides is a long candidate.
+    """
+
+    close = np.ascontiguousarray(close, dtype=np.float64)
+    length = len(close)
+    entries = _as_mask(entries, length)
+    starts = np.flatnonzero(entries)
+    rule_bars = _next_exits(starts, _as_mask(exits, length), length)
+    if short_entries is None and short_exits is None:
+        return RuleEvents(close, starts, rule_bars)
+    if short_entries is None or short_exits is None:
+        raise ValueError("Short entries and short exits must be given together")
+
+    short_starts = np.flatnonzero(_as_mask(short_entries, length) & ~entries)
+    short_rule_bars = _next_exits(short_starts, _as_mask(short_exits, length), length)
+    order = np.argsort(np.concatenate([starts, short_starts]), kind="stable")
+    side = np.repeat(np.array([LONG, SHORT], dtype=np.int8), [len(starts), len(short_starts)])
+    return RuleEvents(
+        close,
+        np.concatenate([starts, short_starts])[order],
+        np.concatenate([rule_bars, short_rule_bars])[order],
+        side=side[order],
+    )
+
+
+def simulate_trades(
+    close: Any,
+    entries: Any,
+    exits: Any,
+    *,
+    sl: float,
+    tp: float,
+    short_entries: Any = None,
+    short_exits: Any = None,
+) -> TradeIndices:
+    """Simulate a strategy and return the bars, reasons and sides of its trades.
+
+    A long position opens on the close of a bar where ``entries`` is set
+    while flat.  On every later bar it closes at that bar's close with the
+    first applicable reason of: return at or below ``-sl`` (``stop_loss``),
+    return at or above ``tp`` (``take_profit``), ``exits`` set
+    (``rule_exit``).  The bar after an exit may open the next position.  A
+    position still open after the last bar is closed there with reason
+    ``end_of_data``.  With ``short_entries`` and ``short_exits`` the
+    strategy also goes short while flat, with the same rules applied to the
+    negated return; long entries win when both sides signal on one bar.
+    """
+
+    events = rule_events(close, entries, exits, short_entries, short_exits)
+    return simulate_events(events, sl=sl, tp=tp)
+
+
+class CandidateExits:
+    """Exit bar and reason of a position opened at each entry candidate of ``events``.
+
+    Exits within the look-ahead window are resolved for all candidates at
+    construction; longer holds are resolved on first access, or for many
+    candidates and tables at once by :func:`resolve_exits`, and memoised.
+    """
+
+    def __init__(self, events: RuleEvents, *, sl: float, tp: float) -> None:
+        self.events, self.sl, self.tp = events, sl, tp
+        self.entry_prices = events.entry_prices
+        nearby_bar, nearby_reason = _nearby_exits(events, sl, tp)
+        self.nearby_bar = nearby_bar
+        self.exit_bar, self.reason = nearby_bar.tolist(), nearby_reason.tolist()
+
+    def __len__(self) -> int:
+        return len(self.exit_bar)
+
+    def __getitem__(self, candidate: int) -> Tuple[int, int]:
+        if self.exit_bar[candidate] < 0:
+            resolve_exits([self], [candidate])
+        return self.exit_bar[candidate], self.reason[candidate]
+
+
+def resolve_exits(tables: Sequence[CandidateExits], candidates: Sequence[int]) -> np.ndarray:
+    """Resolve the exit of ``candidates[i]`` in ``tables[i]`` for every ``i`` together.
+
+    The tables must share their :class:`RuleEvents`; each may use its own
+    stop-loss and take-profit.  Returns the exit bars.
+    """
+
+    if not tables:
+        return np.empty(0, dtype=np.int64)
+    events = tables[0].events
+    picked = np.asarray(candidates, dtype=np.int64)
+    entry = tables[0].entry_prices[picked]
+    sl = np.array([table.sl for table in tables], dtype=np.float64)
+    tp = np.array([table.tp for table in tables], dtype=np.float64)
+    bars, reasons = _distant_exits(events, picked, entry, sl, tp)
+    for table, candidate, bar, code in zip(tables, candidates, bars.tolist(), reasons.tolist()):
+        table.exit_bar[candidate], table.reason[candidate] = bar, code
+    return bars
+
+
+def simulate_events(events: RuleEvents, *, sl: float, tp: float) -> TradeIndices:
+    """Like :func:`simulate_trades`, reusing precomputed :class:`RuleEvents`."""
+
+    return simulate_grid(events, [(sl, tp)])[0]
+
+
+def simulate_grid(events: RuleEvents, combinations: Sequence[Tuple[float, float]]) -> List[TradeIndices]:
+    """Simulate every ``(sl, tp)`` pair of ``combinations`` on ``events``.
+
+    The combinations advance together: each round follows every chain of
+    trades as far as the exits resolved so far allow, then resolves the long
+    holds all of them are waiting on in one :func:`resolve_exits` call.
+    """
+
+    starts = events.starts
+    tables = [CandidateExits(events, sl=sl, tp=tp) for sl, tp in combinations]
+    # Candidate that opens the next position after each exit resolved up front.
+    successors = [np.searchsorted(starts, table.nearby_bar + 1).tolist() for table in tables]
+    chains: List[List[int]] = [[] for _ in tables]
+    heads = [0] * len(tables)
+    waiting = list(range(len(tables)))
+    while waiting:
+        stuck = []
+        for row in waiting:
+            exit_bar, successor, chain = tables[row].exit_bar, successors[row], chains[row]
+            candidate = heads[row]
+            while candidate < len(successor) and exit_bar[candidate] >= 0:
+                chain.append(candidate)
+                candidate = successor[candidate]
+            heads[row] = candidate
+            if candidate < len(successor):
+                stuck.append(row)
+        bars = resolve_exits([tables[row] for row in stuck], [heads[row] for row in stuck])
+        following = np.searchsorted(starts, bars + 1).tolist()
+        for row, candidate in zip(stuck, following):
+            successors[row][heads[row]] = candidate
+        waiting = stuck
+
+    return [
+        TradeIndices(
+            entry_index=starts[chain],
+            exit_index=np.asarray(table.exit_bar, dtype=np.int64)[chain],
+            reason=np.asarray(table.reason, dtype=np.int8)[chain],
+            side=None if events.side is None else events.side[chain],
+        )
+        for table, chain in zip(tables, chains)
+    ]
@@ -0,0 +1,284 @@
+"""Content-addressed on-disk cache for computed indicator columns.
+
+Entries are keyed by a digest of the input rows together with a fingerprint of
+the indicator set, its parameters and the engine version.  Each entry stores
+its indicator block as a column-major ``.npy`` file next to a small JSON
+manifest, and the cache evicts the least recently used entries once it grows
+beyond ``max_bytes``.  Manifests also record the number of rows they cover so
+a longer input whose leading rows match an entry can reuse it and only compute
+the appended rows.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import inspect
+import json
+import os
+from dataclasses import dataclass
+from functools import partial
+from pathlib import Path
+from types import BuiltinFunctionType, ModuleType
+from typing import Any, List, Optional, Set, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def row_hashes(df: pd.DataFrame) -> np.ndarray:
+    """Return one ``uint64`` hash per row covering the index and every column."""
+
+    return pd.util.hash_pandas_object(df, index=True).to_numpy()
+
+
+def _digest(hashes: np.ndarray) -> str:
+    return hashlib.sha256(np.ascontiguousarray(hashes).tobytes()).hexdigest()
+
+
+_SCALARS = (type(None), bool, int, float, complex, str, bytes)
+
+
+def fingerprint_callable(func: Any) -> Optional[str]:
+    """Describe a callable by everything its result may depend on, or ``None`` if that is unknowable.
+
+    Besides the code and constants this covers the values a function
+    captures in closures, the globals and defaults it reads, the instance
+    behind a bound method or callable object and the arguments of a
+    ``partial``.  Closures created by factories such as ``_ema(10)`` differ
+    only in their captured values, and two instances of one class only in
+    their state.  Callables depending on values without a stable description
+    (objects without inspectable state, object arrays) yield ``None`` and
+    must not be cached.
+    """
+
+    return _callable_fingerprint(func, set())
+
+
+def _callable_fingerprint(func: Any, seen: Set[int]) -> Optional[str]:
+    if isinstance(func, partial):
+        parts = [
+            _callable_fingerprint(func.func, seen),
+            _value_fingerprint(func.args, seen),
+            _value_fingerprint(func.keywords, seen),
+        ]
+        return None if None in parts else f"partial({','.join(parts)})"
+    if inspect.ismethod(func):
+        parts = [_callable_fingerprint(func.__func__, seen), _value_fingerprint(func.__self__, seen)]
+        return None if None in parts else f"method({','.join(parts)})"
+    if isinstance(func, (BuiltinFunctionType, np.ufunc)):
+        owner = getattr(func, "__self__", None)
+        name = f"{getattr(func, '__module__', None)}.{getattr(func, '__qualname__', func.__name__)}"
+        if owner is None or isinstance(owner, ModuleType):
+            return f"builtin:{name}"
+        state = _value_fingerprint(owner, seen)
+        return None if state is None else f"builtin:{name}({state})"
+
+    code = getattr(func, "__code__", None)
+    if code is None:
+        # A callable object: its ``__call__`` together with its state.
+        call = getattr(type(func), "__call__", None)
+        if call is None or not hasattr(call, "__code__"):
+            return None
+        parts = [_callable_fingerprint(call, seen), _state_fingerprint(func, seen)]
+        return None if None in parts else f"instance({','.join(parts)})"
+
+    name = f"{func.__module__}.{func.__qualname__}"
+    if id(func) in seen:
+        return f"recursive:{name}"
+    seen.add(id(func))
+    values = [cell.cell_contents for cell in func.__closure__ or ()]
+    values += [func.__defaults__, func.__kwdefaults__]
+    namespace = func.__globals__
+    values += [namespace[global_name] for global_name in _global_names(code) if global_name in namespace]
+    captured = [_value_fingerprint(value, seen) for value in values]
+    if None in captured:
+        return None
+    return "|".join([name, _code_fingerprint(code), *captured])
+
+
+def _global_names(code: Any) -> List[str]:
+    """Return the names ``code`` and the code objects nested in it may look up as globals."""
+
+    names = list(code.co_names)
+    for const in code.co_consts:
+        if hasattr(const, "co_code"):
+            names.extend(_global_names(const))
+    return sorted(set(names))
+
+
+def _code_fingerprint(code: Any) -> str:
+    """Describe a code object together with its constants and nested code objects."""
+
+    consts = [
+        _code_fingerprint(const) if hasattr(const, "co_code") else repr(const) for const in code.co_consts
+    ]
+    return "|".join([code.co_code.hex(), repr(code.co_names), *consts])
+
+
+def _value_fingerprint(value: Any, seen: Set[int]) -> Optional[str]:
+    """Describe a value a callable reads, or return ``None`` if it has no stable description."""
+
+    if isinstance(value, _SCALARS):
+        return f"{type(value).__name__}:{value!r}"
+    if isinstance(value, np.generic):
+        return f"{value.dtype}:{value!r}"
+    if isinstance(value, np.ndarray):
+        if value.dtype.hasobject:
+            return None
+        digest = hashlib.sha256(np.ascontiguousarray(value).tobytes()).hexdigest()
+        return f"ndarray:{value.dtype}:{value.shape}:{digest}"
+    if isinstance(value, ModuleType):
+        return f"module:{value.__name__}"
+    if isinstance(value, type):
+        return f"type:{value.__module__}.{value.__qualname__}"
+    if isinstance(value, (list, tuple, set, frozenset)):
+        items = [_value_fingerprint(item, seen) for item in value]
+        if None in items:
+            return None
+        if isinstance(value, (set, frozenset)):
+            items.sort()
+        return f"{type(value).__name__}({','.join(items)})"
+    if isinstance(value, dict):
+        pairs = [
+            (_value_fingerprint(key, seen), _value_fingerprint(item, seen)) for key, item in value.items()
+        ]
+        if any(None in pair for pair in pairs):
+            return None
+        return "dict(" + ",".join(f"{key}={item}" for key, item in sorted(pairs)) + ")"
+    if callable(value):
+        return _callable_fingerprint(value, seen)
+    return _state_fingerprint(value, seen)
+
+
+def _state_fingerprint(obj: Any, seen: Set[int]) -> Optional[str]:
+    """Describe an object by its type and the values of its attributes."""
+
+    name = f"{type(obj).__module__}.{type(obj).__qualname__}"
+    if id(obj) in seen:
+        return f"cycle:{name}"
+    slots = [slot for cls in type(obj).__mro__ for slot in getattr(cls, "__slots__", ())]
+    if not hasattr(obj, "__dict__") and not slots:
+        return None
+    seen.add(id(obj))
+    state = dict(getattr(obj, "__dict__", {}))
+    state.update({slot: getattr(obj, slot) for slot in slots if hasattr(obj, slot)})
+    described = _value_fingerprint(state, seen)
+    return None if described is None else f"{name}{described}"
+
+
+@dataclass
+class FeatureCache:
+    """Size-bounded LRU cache of indicator blocks stored under ``directory``."""
+
+    directory: Path
+    max_bytes: int = 512 * 1024 * 1024
+
+    def __post_init__(self) -> None:
+        self.directory = Path(self.directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    @staticmethod
+    def entry_key(fingerprint: str, hashes: np.ndarray) -> str:
+        """Return the content address for ``hashes`` computed with ``fingerprint``."""
+
+        return hashlib.sha256((fingerprint + _digest(hashes)).encode()).hexdigest()
+
+    def load(self, key: str) -> Optional[pd.DataFrame]:
+        """Return the cached indicator block for ``key`` or ``None`` on a miss."""
+
+        manifest = self._read_manifest(key)
+        if manifest is None:
+            return None
+        return self._load_block(key, manifest)
+
+    def find_prefix(self, fingerprint: str, hashes: np.ndarray) -> Optional[Tuple[int, pd.DataFrame]]:
+        """Return the longest cached block whose rows are a prefix of ``hashes``."""
+
+        best: Optional[Tuple[int, str, dict]] = None
+        for path in self.directory.glob("*.json"):
+            manifest = self._read_manifest(path.stem)
+            if manifest is None or manifest["fingerprint"] != fingerprint:
+                continue
+            rows = manifest["rows"]
+            if rows >= len(hashes) or (best is not None and rows <= best[0]):
+                continue
+            if _digest(hashes[:rows]) == manifest["digest"]:
+                best = (rows, path.stem, manifest)
+        if best is None:
+            return None
+        rows, key, manifest = best
+        block = self._load_block(key, manifest)
+        return (rows, block) if block is not None else None
+
+    def store(self, key: str, fingerprint: str, hashes: np.ndarray, features: pd.DataFrame) -> None:
+        """Persist ``features`` (one float column per indicator) and enforce the size bound."""
+
+        block = np.asfortranarray(features.to_numpy(dtype=np.float64))
+        manifest = {
+            "fingerprint": fingerprint,
+            "digest": _digest(hashes),
+            "rows": len(hashes),
+            "columns": [str(column) for column in features.columns],
+        }
+        # Write to temporary names first so readers never observe half-written entries.
+        block_tmp = self.directory / f"{key}.npy.tmp"
+        with block_tmp.open("wb") as handle:
+            np.save(handle, block)
+        os.replace(block_tmp, self._block_path(key))
+        manifest_tmp = self.directory / f"{key}.json.tmp"
+        manifest_tmp.write_text(json.dumps(manifest))
+        os.replace(manifest_tmp, self._manifest_path(key))
+        self.evict()
+
+    def evict(self) -> None:
+        """Remove least recently used entries until the cache fits in ``max_bytes``."""
+
+        entries = []
+        for block in self.directory.glob("*.npy"):
+            manifest = self._manifest_path(block.stem)
+            try:
+                size = block.stat().st_size + manifest.stat().st_size
+                entries.append((block.stat().st_mtime, size, block.stem))
+            except FileNotFoundError:
+                continue
+        total = sum(size for _mtime, size, _key in entries)
+        for _mtime, size, key in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            self._remove(key)
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+
+        for block in self.directory.glob("*.npy"):
+            self._remove(block.stem)
+
+    def _block_path(self, key: str) -> Path:
+        return self.directory / f"{key}.npy"
+
+    def _manifest_path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def _read_manifest(self, key: str) -> Optional[dict]:
+        try:
+            return json.loads(self._manifest_path(key).read_text())
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def _load_block(self, key: str, manifest: dict) -> Optional[pd.DataFrame]:
+        path = self._block_path(key)
+        try:
+            block = np.load(path)
+        except (FileNotFoundError, ValueError):
+            return None
+        # Touch the entry so eviction treats it as recently used.
+        os.utime(path)
+        return pd.DataFrame(block, columns=manifest["columns"])
+
+    def _remove(self, key: str) -> None:
+        for path in (self._block_path(key), self._manifest_path(key)):
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,159 @@
+"""Execution assumptions for :class:`~engine.strategy_runner.StrategyRunner` backtests.
+
+Without an :class:`ExecutionModel` a backtest trades at the close of the
+signal bar, checks its stops against later closes and pays nothing, which
+flatters every strategy.  The model adds per-side commission, a slippage
+function, intrabar stop detection against the bar's low and high with fills
+at the stop level (or at the open when the bar gaps through it) and entries
+at the next bar's open.  Everything is applied to whole arrays: the model
+adjusts the :class:`~engine.backtest.RuleEvents` the simulator walks and
+then prices all trades at once.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, replace
+from typing import Callable, Mapping, Optional, Tuple
+
+import numpy as np
+
+from engine.backtest import LONG, STOP_LOSS, TAKE_PROFIT, RuleEvents, TradeIndices
+
+# (prices, sides) -> fill prices, with side +1 for buys and -1 for sells.
+Slippage = Callable[[np.ndarray, np.ndarray], np.ndarray]
+
+ENTRY_TIMINGS = ("close", "next_open")
+
+
+def bps_slippage(bps: float) -> Slippage:
+    """Return a slippage function that pays ``bps`` basis points away from every price."""
+
+    if bps < 0:
+        raise ValueError("Slippage must be non-negative")
+
+    def slippage(prices: np.ndarray, sides: np.ndarray) -> np.ndarray:
+        return prices * (1 + sides * (bps / 10_000))
+
+    return slippage
+
+
+@dataclass
+class Fills:
+    """Fill bars and prices of simulated trades, and their returns net of costs.
+
+    ``entry_basis`` and ``exit_basis`` are the fill prices after commission,
+    paid when buying and received when selling, so ``return_pct`` is
+    ``side * (exit_basis / entry_basis - 1)`` with ``side`` ``1`` for longs
+    and ``-1`` for shorts.
+    """
+
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    entry_basis: np.ndarray
+    exit_basis: np.ndarray
+    return_pct: np.ndarray
+    reason: np.ndarray
+    side: np.ndarray
+
+
+@dataclass(frozen=True)
+class ExecutionModel:
+    """How signals turn into fills.
+
+    ``commission_bps`` is charged on the notional of each side.
+    ``slippage`` maps prices and sides to fill prices (see
+    :func:`bps_slippage`).  With ``intrabar=True`` the stop-loss and
+    take-profit are checked against each bar's ``low`` and ``high`` and fill
+    at their level, or at the bar's ``open`` when it opens beyond the level;
+    a bar touching both counts as a stop-loss.  Short positions mirror this:
+    the stop-loss is checked against ``high``, the take-profit against
+    ``low``, and they sell on entry and buy on exit.  ``entry="next_open"`` fills
+    entries at the open of the bar after the signal, whose range is then
+    already checked against the stops; a signal on the last bar is dropped.
+    Rule exits always fill at the close of the exit bar.
+    """
+
+    commission_bps: float = 0.0
+    slippage: Optional[Slippage] = None
+    intrabar: bool = False
+    entry: str = "close"
+
+    def __post_init__(self) -> None:
+        if self.commission_bps < 0:
+            raise ValueError("commission_bps must be non-negative")
+        if self.entry not in ENTRY_TIMINGS:
+            raise ValueError(f"Unknown entry timing '{self.entry}'. Expected one of {ENTRY_TIMINGS}")
+
+    @property
+    def required_columns(self) -> Tuple[str, ...]:
+        """Price columns besides ``close`` this model reads."""
+
+        if self.intrabar:
+            return ("open", "high", "low")
+        return ("open",) if self.entry == "next_open" else ()
+
+    def prepare(self, events: RuleEvents, prices: Mapping[str, np.ndarray]) -> RuleEvents:
+        """Return ``events`` with the entry prices and stop levels the simulator should use."""
+
+        updates = {}
+        if self.entry == "next_open":
+            keep = events.starts < len(events.close) - 1
+            starts = events.starts[keep]
+            updates.update(
+                starts=starts, rule_bars=events.rule_bars[keep], entry_price=prices["open"][starts + 1]
+            )
+            if events.side is not None:
+                updates["side"] = events.side[keep]
+        if self.intrabar:
+            updates.update(low=prices["low"], high=prices["high"])
+        return replace(events, **updates) if updates else events
+
+    def fill(
+        self,
+        events: RuleEvents,
+        indices: TradeIndices,
+        prices: Mapping[str, np.ndarray],
+        *,
+        sl: float,
+        tp: float,
+    ) -> Fills:
+        """Price the trades ``indices`` simulated on ``events`` returned by :meth:`prepare`."""
+
+        close = events.close
+        candidates = np.searchsorted(events.starts, indices.entry_index)
+        quoted = events.entry_prices[candidates]
+        entry_index = indices.entry_index + (self.entry == "next_open")
+        exit_index, reason, side = indices.exit_index, indices.reason, indices.sides
+
+        exit_quote = close[exit_index].copy()
+        if self.intrabar:
+            opens = prices["open"][exit_index]
+            long = side == LONG
+            # The level is hit inside the bar unless the bar already opened beyond it.
+            stop, target = quoted * (1 - side * sl), quoted * (1 + side * tp)
+            stop_fill = np.where(long, np.minimum(opens, stop), np.maximum(opens, stop))
+            target_fill = np.where(long, np.maximum(opens, target), np.minimum(opens, target))
+            exit_quote = np.where(reason == STOP_LOSS, stop_fill, exit_quote)
+            exit_quote = np.where(reason == TAKE_PROFIT, target_fill, exit_quote)
+
+        entry_price, exit_price = quoted, exit_quote
+        if self.slippage is not None:
+            buys = side.astype(np.float64)
+            entry_price = np.asarray(self.slippage(quoted, buys), dtype=np.float64)
+            exit_price = np.asarray(self.slippage(exit_quote, -buys), dtype=np.float64)
+        commission = self.commission_bps / 10_000
+        entry_basis = entry_price * (1 + side * commission)
+        exit_basis = exit_price * (1 - side * commission)
+        return Fills(
+            entry_index=entry_index,
+            exit_index=exit_index,
+            entry_price=entry_price,
+            exit_price=exit_price,
+            entry_basis=entry_basis,
+            exit_basis=exit_basis,
+            return_pct=side * (exit_basis - entry_basis) / entry_basis,
+            reason=reason,
+            side=side,
+        )
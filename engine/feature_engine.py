@@ -4,24 +4,83 @@ This module centralises the computation of technical indicators that power the
 rest of the trading research workflow.  It is deliberately designed to be
 extensible so the CLI (``main.py``), notebooks, or external services can add or
 override indicators without rewriting the engine.
+
+Two computation backends are available.  ``"finta"`` (the default) hands each
+indicator an upper-cased dataframe for Finta, while ``"numpy"`` hands it a
+mapping of contiguous ``float64`` OHLCV arrays and evaluates the vectorised
+kernels from :mod:`engine.kernels` without any intermediate dataframes.
 """
 
 from __future__ import annotations
 
+import hashlib
+import re
+import time
+from concurrent.futures import as_completed
 from dataclasses import dataclass, field
-from typing import Callable, Dict, Iterable, Mapping, Optional
+from functools import partial
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
+import numpy as np
 import pandas as pd
 from finta import TA
 
+from engine import kernels, streaming
+from engine.cache import FeatureCache, fingerprint_callable, row_hashes
+from engine.parallel import make_executor
+from engine.profiling import FeatureProfiler
+
+
+IndicatorCallable = Callable[[Any, pd.DataFrame], Any]
+
+OHLCV_COLUMNS = ("open", "high", "low", "close", "volume")
+
+# Bump whenever indicator semantics change so cached features are invalidated.
+ENGINE_VERSION = "1"
+
+# Appending more rows than this to a cached prefix recomputes the whole frame,
+# which is cheaper than streaming a long tail bar by bar.
+STREAM_TAIL_LIMIT = 10_000
+
+
+@dataclass(frozen=True)
+class Indicator:
+    """Indicator that may emit several columns and depend on other columns.
 
-IndicatorCallable = Callable[[pd.DataFrame, pd.DataFrame], pd.Series]
+    ``compute`` receives the same arguments as a plain indicator callable.  A
+    single-output indicator returns one series or array; a multi-output one
+    returns a dataframe or mapping containing every name in ``outputs``, or a
+    sequence of values in ``outputs`` order.  Columns listed in ``depends_on``
+    are computed first and can be read from the raw dataframe argument.
+    ``stream`` optionally builds a :class:`~engine.streaming.StreamingIndicator`
+    used by :meth:`FeatureEngine.update` and :meth:`FeatureEngine.extend`.
+    """
+
+    outputs: Tuple[str, ...]
+    compute: IndicatorCallable
+    depends_on: Tuple[str, ...] = ()
+    stream: Optional[Callable[[], streaming.StreamingIndicator]] = None
+
+
+IndicatorSpec = Union[IndicatorCallable, Indicator]
 
 
 def _ensure_required_columns(df: pd.DataFrame) -> pd.DataFrame:
     """Validate that the dataframe exposes the OHLCV columns required by Finta."""
 
-    required = {"open", "high", "low", "close", "volume"}
+    required = set(OHLCV_COLUMNS)
     missing = required.difference(col.lower() for col in df.columns)
     if missing:
         raise ValueError(
@@ -31,74 +90,598 @@ def _ensure_required_columns(df: pd.DataFrame) -> pd.DataFrame:
 
 
 def _uppercase_columns(df: pd.DataFrame) -> pd.DataFrame:
-    """Return a dataframe copy whose columns are upper-cased for Finta."""
+    """Return a view of ``df`` whose columns are upper-cased for Finta."""
 
-    renamed = {col: col.upper() for col in df.columns}
-    return df.rename(columns=renamed)
+    renamed = df.copy(deep=False)
+    renamed.columns = [col.upper() for col in df.columns]
+    return renamed
 
 
-def _ema(period: int) -> IndicatorCallable:
-    return lambda finta_df, _raw_df: TA.EMA(finta_df, period)
+def _drop_incomplete_rows(df: pd.DataFrame) -> pd.DataFrame:
+    """Equivalent of ``dropna().reset_index(drop=True)`` built from one row mask.
 
+    Missing values usually only occur during indicator warm-up, in which case
+    the kept rows form one contiguous slice and no data is copied at all.
+    """
 
-def _sma(period: int) -> IndicatorCallable:
-    return lambda finta_df, _raw_df: TA.SMA(finta_df, period)
+    missing = np.zeros(len(df), dtype=bool)
+    for _name, column in df.items():
+        missing |= column.isna().to_numpy()
+    keep = np.flatnonzero(~missing)
+    if len(keep) and keep[-1] - keep[0] + 1 == len(keep):
+        trimmed = df.iloc[keep[0] : keep[-1] + 1]
+    else:
+        trimmed = df.take(keep)
+    return trimmed.reset_index(drop=True)
 
 
-def _bollinger(period: int, band: str) -> IndicatorCallable:
-    def calculate(finta_df: pd.DataFrame, _raw_df: pd.DataFrame) -> pd.Series:
-        bands = TA.BBANDS(finta_df, period=period)
-        return bands[band]
+def _ohlcv_arrays(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Return the OHLCV columns as contiguous ``float64`` arrays keyed in lower case."""
 
-    return calculate
+    lookup = {col.lower(): col for col in df.columns}
+    return {name: kernels.as_float_array(df[lookup[name]]) for name in OHLCV_COLUMNS}
+
+
+def _to_float(values: Any, dtype: Any = np.float64) -> Any:
+    """Coerce an indicator result to ``dtype``, keeping pandas index alignment."""
+
+    if isinstance(values, pd.Series):
+        return values if values.dtype == dtype else values.astype(dtype)
+    return np.asarray(values, dtype=dtype)
+
+
+def _can_downcast(series: pd.Series, dtype: np.dtype, tolerance: float = 0.0) -> bool:
+    """Return whether ``series`` survives a cast to ``dtype`` without meaningful loss.
+
+    Integers must round-trip exactly (volumes stay exact below 2**24 in
+    ``float32``); floats must stay finite and move by at most ``tolerance``
+    relative to their value, so with the default of ``0`` only floats the
+    target represents exactly are cast.
+    """
+
+    if not pd.api.types.is_numeric_dtype(series.dtype) or pd.api.types.is_bool_dtype(series.dtype):
+        return False
+    values = series.to_numpy()
+    cast = values.astype(dtype)
+    if np.issubdtype(values.dtype, np.integer):
+        return bool(np.array_equal(cast.astype(values.dtype), values))
+    finite = np.isfinite(values)
+    if not np.array_equal(np.isfinite(cast), finite):
+        return False
+    error = np.abs(cast[finite].astype(np.float64) - values[finite])
+    return bool(np.all(error <= tolerance * np.abs(values[finite])))
+
+
+def _as_indicator(name: str, spec: IndicatorSpec) -> Indicator:
+    """Wrap plain callables as single-output indicators named after their key."""
+
+    if isinstance(spec, Indicator):
+        return spec
+    return Indicator(outputs=(name,), compute=spec)
+
+
+def _split_outputs(result: Any, outputs: Sequence[str]) -> List[Any]:
+    """Return one value per output name from an indicator result."""
+
+    if len(outputs) == 1 and not isinstance(result, (pd.DataFrame, Mapping, tuple, list)):
+        return [result]
+    if isinstance(result, (pd.DataFrame, Mapping)):
+        return [result[name] for name in outputs]
+    values = list(result)
+    if len(values) != len(outputs):
+        raise ValueError(f"Indicator returned {len(values)} values for outputs {list(outputs)}")
+    return values
+
+
+def _output_owners(indicators: Mapping[str, Indicator]) -> Dict[str, str]:
+    """Map each output column to the indicator key that produces it.
+
+    Later registrations win when several indicators emit the same column.
+    """
+
+    return {column: key for key, spec in indicators.items() for column in spec.outputs}
+
+
+def _require_streaming(indicators: Mapping[str, Indicator]) -> None:
+    unsupported = [key for key, spec in indicators.items() if spec.stream is None]
+    if unsupported:
+        raise ValueError("Indicators without streaming support: " + ", ".join(unsupported))
+
+
+def _history_arrays(ohlcv: pd.DataFrame, features: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Combine OHLCV inputs and computed indicator columns for priming streams."""
+
+    arrays = _ohlcv_arrays(ohlcv)
+    arrays.update({column: kernels.as_float_array(features[column]) for column in features.columns})
+    return arrays
+
+
+def _primed_stream(
+    indicators: Mapping[str, Indicator], history: Mapping[str, np.ndarray]
+) -> streaming.IndicatorStream:
+    """Build the streaming state for ``indicators`` and prime it from ``history``."""
+
+    _require_streaming(indicators)
+    order = _resolve_order(indicators, _output_owners(indicators), history)
+    stream = streaming.IndicatorStream(
+        [(indicators[key].outputs, indicators[key].stream()) for key in order]
+    )
+    stream.prime(history)
+    return stream
+
+
+def _stream_rows(stream: streaming.IndicatorStream, df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Feed every row of ``df`` through ``stream`` and collect the indicator columns."""
+
+    arrays = _ohlcv_arrays(df)
+    rows = [
+        stream.update(dict(zip(OHLCV_COLUMNS, values)))
+        for values in zip(*(arrays[column].tolist() for column in OHLCV_COLUMNS))
+    ]
+    return {
+        column: np.fromiter((row[column] for row in rows), dtype=float, count=len(rows))
+        for column in stream.columns
+    }
+
+
+def _resolve_order(
+    indicators: Mapping[str, Indicator],
+    owners: Mapping[str, str],
+    columns: Iterable[str],
+    roots: Optional[Iterable[str]] = None,
+) -> List[str]:
+    """Return indicator keys ordered so that dependencies are computed first.
+
+    ``roots`` restricts the result to those keys and their dependencies.
+    """
+
+    available = set(columns)
+    order: List[str] = []
+    state: Dict[str, str] = {}
+
+    def visit(key: str) -> None:
+        if state.get(key) == "done":
+            return
+        if state.get(key) == "visiting":
+            raise ValueError(f"Indicator dependency cycle detected at '{key}'")
+        state[key] = "visiting"
+        for column in indicators[key].depends_on:
+            if column in owners:
+                visit(owners[column])
+            elif column not in available:
+                raise ValueError(f"Indicator '{key}' depends on unknown column '{column}'")
+        state[key] = "done"
+        order.append(key)
+
+    for key in indicators if roots is None else roots:
+        visit(key)
+    return order
+
+
+# Column references in a ``DataFrame.eval`` expression: backtick-quoted names or identifiers.
+_EVAL_NAME = re.compile(r"`([^`]+)`|([A-Za-z_]\w*)")
+
+
+def _referenced_columns(expression: str, columns: Iterable[str]) -> List[str]:
+    """Return the entries of ``columns`` that ``expression`` mentions by name."""
+
+    known = set(columns)
+    names = dict.fromkeys(quoted or name for quoted, name in _EVAL_NAME.findall(expression))
+    return [name for name in names if name in known]
+
+
+def _ema(period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"EMA_{period}",),
+        compute=lambda finta_df, _raw_df: TA.EMA(finta_df, period),
+        stream=partial(streaming.EMAStream, period),
+    )
+
+
+def _sma(period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"SMA_{period}",),
+        compute=lambda finta_df, _raw_df: TA.SMA(finta_df, period),
+        stream=partial(streaming.SMAStream, period),
+    )
+
+
+def _rsi(period: int = 14) -> Indicator:
+    return Indicator(
+        outputs=("RSI",),
+        compute=lambda finta_df, _raw_df: TA.RSI(finta_df, period),
+        stream=partial(streaming.RSIStream, period),
+    )
+
+
+def _macd() -> Indicator:
+    def calculate(finta_df: pd.DataFrame, _raw_df: pd.DataFrame) -> Tuple[pd.Series, pd.Series]:
+        macd = TA.MACD(finta_df)
+        return macd["MACD"], macd["SIGNAL"]
 
+    return Indicator(outputs=("MACD", "MACD_SIGNAL"), compute=calculate, stream=streaming.MACDStream)
 
-def _atr(period: int) -> IndicatorCallable:
-    return lambda finta_df, _raw_df: TA.ATR(finta_df, period=period)
 
+def _obv() -> Indicator:
+    return Indicator(
+        outputs=("OBV",),
+        compute=lambda finta_df, raw_df: TA.OBV(raw_df),
+        stream=streaming.OBVStream,
+    )
+
+
+def _bollinger(period: int) -> Indicator:
+    def calculate(finta_df: pd.DataFrame, _raw_df: pd.DataFrame) -> pd.DataFrame:
+        return TA.BBANDS(finta_df, period=period)
+
+    return Indicator(
+        outputs=("BB_UPPER", "BB_LOWER"),
+        compute=calculate,
+        stream=partial(streaming.BollingerStream, period),
+    )
+
+
+def _atr(period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"ATR_{period}",),
+        compute=lambda finta_df, _raw_df: TA.ATR(finta_df, period=period),
+        stream=partial(streaming.ATRStream, period),
+    )
 
-def _stochastic_k(period: int) -> IndicatorCallable:
-    return lambda finta_df, _raw_df: TA.STOCH(finta_df, period=period).rename("STOCH_K")
+
+def _stochastic_k(period: int) -> Indicator:
+    return Indicator(
+        outputs=("STOCH_K",),
+        compute=lambda finta_df, _raw_df: TA.STOCH(finta_df, period=period),
+        stream=partial(streaming.StochasticKStream, period),
+    )
 
 
-def _stochastic_d(period: int, stoch_period: int) -> IndicatorCallable:
-    return lambda finta_df, _raw_df: TA.STOCHD(finta_df, period=period, stoch_period=stoch_period).rename(
-        "STOCH_D"
+def _stochastic_d(period: int) -> Indicator:
+    # %D is a moving average of %K, so reuse the column instead of recomputing it.
+    return Indicator(
+        outputs=("STOCH_D",),
+        compute=lambda _finta_df, raw_df: raw_df["STOCH_K"].rolling(window=period).mean(),
+        depends_on=("STOCH_K",),
+        stream=partial(streaming.SMAStream, period, column="STOCH_K"),
     )
 
 
-DEFAULT_INDICATORS: Mapping[str, IndicatorCallable] = {
-    "EMA_10": _ema(10),
-    "EMA_50": _ema(50),
-    "SMA_20": _sma(20),
-    "RSI": lambda finta_df, _raw_df: TA.RSI(finta_df),
-    "MACD": lambda finta_df, _raw_df: TA.MACD(finta_df)["MACD"],
-    "MACD_SIGNAL": lambda finta_df, _raw_df: TA.MACD(finta_df)["SIGNAL"],
-    "OBV": lambda finta_df, raw_df: TA.OBV(raw_df),
-    "BB_UPPER": _bollinger(period=20, band="BB_UPPER"),
-    "BB_LOWER": _bollinger(period=20, band="BB_LOWER"),
-    "ATR_14": _atr(14),
-    "STOCH_K": _stochastic_k(period=14),
-    "STOCH_D": _stochastic_d(period=3, stoch_period=14),
+# Keys of indicators whose columns were merged into one multi-output indicator.
+INDICATOR_ALIASES: Mapping[str, str] = {
+    "BB_UPPER": "BBANDS",
+    "BB_LOWER": "BBANDS",
+    "MACD_SIGNAL": "MACD",
 }
 
 
+class _IndicatorTable(dict):
+    """Built-in indicators; the retired keys of ``INDICATOR_ALIASES`` look up their replacement."""
+
+    def __missing__(self, key: str) -> IndicatorSpec:
+        if key in INDICATOR_ALIASES:
+            return self[INDICATOR_ALIASES[key]]
+        raise KeyError(key)
+
+
+DEFAULT_INDICATORS: Mapping[str, IndicatorSpec] = _IndicatorTable(
+    {
+        "EMA_10": _ema(10),
+        "EMA_50": _ema(50),
+        "SMA_20": _sma(20),
+        "RSI": _rsi(),
+        "MACD": _macd(),
+        "OBV": _obv(),
+        "BBANDS": _bollinger(period=20),
+        "ATR_14": _atr(14),
+        "STOCH_K": _stochastic_k(period=14),
+        "STOCH_D": _stochastic_d(period=3),
+    }
+)
+
+
+def _native_ema(period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"EMA_{period}",),
+        compute=lambda arrays, _raw_df: kernels.ema(arrays["close"], period),
+        stream=partial(streaming.EMAStream, period),
+    )
+
+
+def _native_sma(period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"SMA_{period}",),
+        compute=lambda arrays, _raw_df: kernels.sma(arrays["close"], period),
+        stream=partial(streaming.SMAStream, period),
+    )
+
+
+def _native_rsi(period: int = 14) -> Indicator:
+    return Indicator(
+        outputs=("RSI",),
+        compute=lambda arrays, _raw_df: kernels.rsi(arrays["close"], period),
+        stream=partial(streaming.RSIStream, period),
+    )
+
+
+def _native_macd() -> Indicator:
+    return Indicator(
+        outputs=("MACD", "MACD_SIGNAL"),
+        compute=lambda arrays, _raw_df: kernels.macd(arrays["close"]),
+        stream=streaming.MACDStream,
+    )
+
+
+def _native_obv() -> Indicator:
+    return Indicator(
+        outputs=("OBV",),
+        compute=lambda arrays, _raw_df: kernels.obv(arrays["close"], arrays["volume"]),
+        stream=streaming.OBVStream,
+    )
+
+
+def _native_bollinger(period: int) -> Indicator:
+    def calculate(
+        arrays: Mapping[str, np.ndarray], _raw_df: pd.DataFrame
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        upper, _middle, lower = kernels.bollinger(arrays["close"], period)
+        return upper, lower
+
+    return Indicator(
+        outputs=("BB_UPPER", "BB_LOWER"),
+        compute=calculate,
+        stream=partial(streaming.BollingerStream, period),
+    )
+
+
+def _native_atr(period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"ATR_{period}",),
+        compute=lambda arrays, _raw_df: kernels.atr(
+            arrays["high"], arrays["low"], arrays["close"], period
+        ),
+        stream=partial(streaming.ATRStream, period),
+    )
+
+
+def _native_stochastic_k(period: int) -> Indicator:
+    return Indicator(
+        outputs=("STOCH_K",),
+        compute=lambda arrays, _raw_df: kernels.stochastic_k(
+            arrays["high"], arrays["low"], arrays["close"], period
+        ),
+        stream=partial(streaming.StochasticKStream, period),
+    )
+
+
+def _native_stochastic_d(period: int) -> Indicator:
+    return Indicator(
+        outputs=("STOCH_D",),
+        compute=lambda _arrays, raw_df: kernels.rolling_mean(
+            kernels.as_float_array(raw_df["STOCH_K"]), period
+        ),
+        depends_on=("STOCH_K",),
+        stream=partial(streaming.SMAStream, period, column="STOCH_K"),
+    )
+
+
+NATIVE_INDICATORS: Mapping[str, IndicatorSpec] = _IndicatorTable(
+    {
+        "EMA_10": _native_ema(10),
+        "EMA_50": _native_ema(50),
+        "SMA_20": _native_sma(20),
+        "RSI": _native_rsi(),
+        "MACD": _native_macd(),
+        "OBV": _native_obv(),
+        "BBANDS": _native_bollinger(period=20),
+        "ATR_14": _native_atr(14),
+        "STOCH_K": _native_stochastic_k(period=14),
+        "STOCH_D": _native_stochastic_d(period=3),
+    }
+)
+
+
+BACKENDS: Mapping[str, Mapping[str, IndicatorSpec]] = {
+    "finta": DEFAULT_INDICATORS,
+    "numpy": NATIVE_INDICATORS,
+}
+
+
+def _indicator_specs(specs: Mapping[str, IndicatorSpec]) -> Dict[str, Indicator]:
+    """Normalise ``specs`` to :class:`Indicator`, keying merged built-ins by their current name.
+
+    A retired key such as ``"MACD_SIGNAL"`` that names the built-in indicator
+    replacing it is folded into that indicator's key, so listing the old
+    keys computes it once; any other spec under a retired key is kept as is.
+    """
+
+    indicators: Dict[str, Indicator] = {}
+    for key, spec in specs.items():
+        merged = INDICATOR_ALIASES.get(key)
+        if merged is not None and any(table[merged] is spec for table in BACKENDS.values()):
+            key = merged
+        indicators[key] = _as_indicator(key, spec)
+    return indicators
+
+
+def _zscore(column: str, period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"{column}_Z{period}",),
+        compute=lambda _inputs, raw_df: kernels.rolling_zscore(
+            kernels.as_float_array(raw_df[column]), period
+        ),
+        depends_on=(column,),
+        stream=partial(streaming.ZScoreStream, period, column=column),
+    )
+
+
+def _rolling_rank(column: str, period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"{column}_RANK{period}",),
+        compute=lambda _inputs, raw_df: kernels.rolling_rank(
+            kernels.as_float_array(raw_df[column]), period
+        ),
+        depends_on=(column,),
+        stream=partial(streaming.RollingRankStream, period, column=column),
+    )
+
+
+def _minmax(column: str, _period: int) -> Indicator:
+    return Indicator(
+        outputs=(f"{column}_MINMAX",),
+        compute=lambda _inputs, raw_df: kernels.expanding_minmax(kernels.as_float_array(raw_df[column])),
+        depends_on=(column,),
+        stream=partial(streaming.MinMaxStream, column=column),
+    )
+
+
+NORMALIZERS: Mapping[str, Callable[[str, int], Indicator]] = {
+    "zscore": _zscore,
+    "rank": _rolling_rank,
+    "minmax": _minmax,
+}
+
+
+def normalization_indicators(
+    columns: Iterable[str], method: str = "zscore", period: int = 100
+) -> Dict[str, Indicator]:
+    """Return indicators that normalise ``columns`` for use as ``extra_indicators``.
+
+    ``method`` is ``"zscore"`` (trailing ``period`` z-score, ``<col>_Z<period>``),
+    ``"rank"`` (trailing percentile rank, ``<col>_RANK<period>``) or
+    ``"minmax"`` (expanding min-max scaling, ``<col>_MINMAX``).  The columns may
+    be inputs or other indicators; each normaliser declares its source as a
+    dependency and supports streaming updates, in O(1) per bar except for the
+    rank, which costs O(period) per bar and O(rows x period) in batch.
+    """
+
+    if method not in NORMALIZERS:
+        raise ValueError(
+            f"Unknown normalization '{method}'. Expected one of: " + ", ".join(sorted(NORMALIZERS))
+        )
+    if period < 2:
+        raise ValueError("period must be at least 2")
+    specs = [NORMALIZERS[method](column, period) for column in columns]
+    return {spec.outputs[0]: spec for spec in specs}
+
+
+SweepResult = Tuple[List[str], np.ndarray]
+SweepCallable = Callable[[Mapping[str, np.ndarray], Sequence[int]], SweepResult]
+
+
+def _sweep_bollinger(arrays: Mapping[str, np.ndarray], periods: Sequence[int]) -> SweepResult:
+    upper, _middle, lower = kernels.bollinger_many(arrays["close"], periods)
+    names = [f"BB_UPPER_{period}" for period in periods] + [f"BB_LOWER_{period}" for period in periods]
+    return names, np.hstack([upper, lower])
+
+
+def _single_output_sweep(prefix: str, kernel: Callable[..., np.ndarray], *columns: str) -> SweepCallable:
+    def calculate(arrays: Mapping[str, np.ndarray], periods: Sequence[int]) -> SweepResult:
+        block = kernel(*(arrays[column] for column in columns), periods)
+        return [f"{prefix}_{period}" for period in periods], block
+
+    return calculate
+
+
+SWEEPS: Mapping[str, SweepCallable] = {
+    "EMA": _single_output_sweep("EMA", kernels.ema_many, "close"),
+    "SMA": _single_output_sweep("SMA", kernels.rolling_mean_many, "close"),
+    "RSI": _single_output_sweep("RSI", kernels.rsi_many, "close"),
+    "ATR": _single_output_sweep("ATR", kernels.atr_many, "high", "low", "close"),
+    "BBANDS": _sweep_bollinger,
+}
+
+
+@dataclass
+class BatchResult:
+    """Outcome of :meth:`FeatureEngine.compute_many`.
+
+    ``features`` stacks the enriched frames of every successful symbol,
+    ``timings`` holds the per-symbol computation time in seconds and
+    ``failures`` maps failed symbols to their error message.
+    """
+
+    features: pd.DataFrame
+    timings: Dict[Hashable, float]
+    failures: Dict[Hashable, str]
+
+
+ChunkResult = List[Tuple[Hashable, Optional[pd.DataFrame], float, Optional[str]]]
+
+
+def _compute_chunk(
+    chunk: Sequence[Tuple[Hashable, pd.DataFrame]], engine_kwargs: Mapping[str, Any]
+) -> ChunkResult:
+    """Enrich every frame of ``chunk``, capturing failures instead of raising."""
+
+    results: ChunkResult = []
+    for symbol, frame in chunk:
+        started = time.perf_counter()
+        try:
+            enriched = FeatureEngine(frame, **engine_kwargs).add_indicators()
+        except Exception as exc:  # noqa: BLE001 - one bad symbol must not abort the batch
+            message = f"{type(exc).__name__}: {exc}"
+            results.append((symbol, None, time.perf_counter() - started, message))
+        else:
+            results.append((symbol, enriched, time.perf_counter() - started, None))
+    return results
+
+
 @dataclass
 class FeatureEngine:
-    """Compute and append technical indicators to OHLCV datasets."""
+    """Compute and append technical indicators to OHLCV datasets.
+
+    ``backend`` selects what indicator callables receive as their first
+    argument: an upper-cased dataframe for ``"finta"`` or a mapping of
+    lower-case ``float64`` OHLCV arrays for ``"numpy"``.  When ``indicators``
+    is omitted the backend's default indicator set is used.  An optional
+    :class:`~engine.cache.FeatureCache` serves repeated computations on
+    unchanged (or merely appended) data from disk; indicator sets it cannot
+    fingerprint reliably are always computed.  ``low_memory`` skips the
+    defensive copy of ``df`` and writes all indicator outputs into a single
+    preallocated block, so the enriched frame shares memory with the input.
+    ``dtype`` sets the floating type of the indicator columns; with a type
+    narrower than ``float64`` the OHLCV columns are downcast too wherever the
+    cast is lossless, or for float columns changes no value by more than the
+    relative ``input_tolerance`` (``0`` by default, so prices the target
+    cannot represent exactly stay ``float64``).  Indicators are still
+    evaluated in ``float64`` and only stored in ``dtype``.  An optional
+    :class:`~engine.profiling.FeatureProfiler` records the wall time,
+    allocations and ``NaN`` count of every indicator the engine evaluates.
+    """
 
     df: pd.DataFrame
-    indicators: Mapping[str, IndicatorCallable] = field(default_factory=lambda: DEFAULT_INDICATORS)
+    indicators: Optional[Mapping[str, IndicatorSpec]] = None
     dropna: bool = True
+    backend: str = "finta"
+    cache: Optional[FeatureCache] = None
+    low_memory: bool = False
+    dtype: Any = np.float64
+    input_tolerance: float = 0.0
+    profiler: Optional[FeatureProfiler] = None
+    _stream: Optional[streaming.IndicatorStream] = field(default=None, init=False, repr=False)
 
     def __post_init__(self) -> None:
+        if self.backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{self.backend}'. Expected one of: " + ", ".join(sorted(BACKENDS))
+            )
+        if self.indicators is None:
+            self.indicators = BACKENDS[self.backend]
+        self.dtype = np.dtype(self.dtype)
+        if self.dtype.kind != "f":
+            raise ValueError(f"dtype must be a floating point type, got '{self.dtype}'")
+        if self.input_tolerance < 0:
+            raise ValueError("input_tolerance must be non-negative")
         _ensure_required_columns(self.df)
-        # Work on a copy to avoid mutating user supplied dataframes.
-        self.df = self.df.copy()
+        # Work on a copy to avoid mutating user supplied dataframes.  The
+        # low-memory mode only copies the column index; the engine never
+        # writes into the input buffers, so sharing them is safe.
+        self.df = self.df.copy(deep=not self.low_memory)
 
     def add_indicators(
         self,
-        extra_indicators: Optional[Mapping[str, IndicatorCallable]] = None,
+        extra_indicators: Optional[Mapping[str, IndicatorSpec]] = None,
         overwrite: bool = False,
     ) -> pd.DataFrame:
         """Return a dataframe enriched with the configured indicators.
@@ -106,33 +689,515 @@ class FeatureEngine:
         Parameters
         ----------
         extra_indicators:
-            Additional indicator callables keyed by output column name.  These
-            are merged with the engine's configured indicators at runtime.
+            Additional indicator callables keyed by output column name, or
+            :class:`Indicator` specs keyed by any name.  These are merged with
+            the engine's configured indicators at runtime and may declare
+            dependencies on other indicator columns.
         overwrite:
             If ``True`` existing columns will be replaced; otherwise we will
             skip indicators whose target column already exists.
         """
 
-        indicators: Dict[str, IndicatorCallable]
-        indicators = dict(self.indicators)
-        if extra_indicators:
-            indicators.update(extra_indicators)
+        indicators = self._indicator_graph(extra_indicators)
+        fingerprint = None if self.cache is None else self._fingerprint(indicators, overwrite)
+        if fingerprint is not None:
+            raw_df = self._cached_compute(indicators, fingerprint, overwrite=overwrite)
+        else:
+            raw_df = self._compute(indicators, overwrite=overwrite)
+        if self.dtype.itemsize < 8:
+            self._downcast_inputs(raw_df)
 
-        raw_df = self.df.copy()
-        finta_ready = _uppercase_columns(raw_df)
+        if self.dropna:
+            raw_df = _drop_incomplete_rows(raw_df)
 
-        for column, indicator in indicators.items():
-            if not overwrite and column in raw_df.columns:
-                continue
-            series = indicator(finta_ready, raw_df)
-            raw_df[column] = series.astype(float)
+        return raw_df
+
+    def profile_indicators(
+        self,
+        extra_indicators: Optional[Mapping[str, IndicatorSpec]] = None,
+        overwrite: bool = False,
+        *,
+        track_allocations: bool = False,
+    ) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Run :meth:`add_indicators` and return the frame with a per-column timing table.
+
+        The engine's ``profiler`` is used (and reset) when one is attached,
+        otherwise a temporary one is created.  Results served from ``cache``
+        are not evaluated and therefore do not appear in the table.
+        """
+
+        attached = self.profiler
+        profiler = attached
+        if profiler is None:
+            profiler = FeatureProfiler(track_allocations=track_allocations)
+        profiler.reset()
+        self.profiler = profiler
+        try:
+            enriched = self.add_indicators(extra_indicators, overwrite=overwrite)
+        finally:
+            self.profiler = attached
+        return enriched, profiler.summary()
+
+    @classmethod
+    def compute_many(
+        cls,
+        frames: Mapping[Hashable, pd.DataFrame],
+        *,
+        executor: str = "process",
+        max_workers: Optional[int] = None,
+        chunksize: int = 16,
+        layout: str = "multiindex",
+        **engine_kwargs: Any,
+    ) -> BatchResult:
+        """Enrich many symbols in parallel and stack the results.
+
+        Parameters
+        ----------
+        frames:
+            OHLCV dataframes keyed by symbol.
+        executor:
+            ``"process"`` or ``"thread"`` to use a pool of ``max_workers``
+            workers, or ``"serial"`` to run in the calling thread.  Process
+            pools pickle ``engine_kwargs``, so custom indicators must be
+            module-level callables; the default indicator sets always work.
+        chunksize:
+            Number of symbols sent to a worker per task.
+        layout:
+            ``"multiindex"`` indexes rows by ``(symbol, row)``; ``"long"``
+            returns a flat frame with a leading ``symbol`` column.
+        engine_kwargs:
+            Forwarded to the :class:`FeatureEngine` built for each symbol.
+        """
+
+        if layout not in {"multiindex", "long"}:
+            raise ValueError(f"Unknown layout '{layout}'. Expected 'multiindex' or 'long'")
+        items = list(frames.items())
+        step = max(chunksize, 1)
+        chunks = [items[start : start + step] for start in range(0, len(items), step)]
+
+        results: ChunkResult = []
+        if executor == "serial":
+            for chunk in chunks:
+                results.extend(_compute_chunk(chunk, engine_kwargs))
+        else:
+            with make_executor(executor, max_workers) as pool:
+                futures = {
+                    pool.submit(_compute_chunk, chunk, engine_kwargs): chunk for chunk in chunks
+                }
+                for future in as_completed(futures):
+                    try:
+                        results.extend(future.result())
+                    except Exception as exc:  # noqa: BLE001 - unpicklable indicators, dead workers
+                        message = f"{type(exc).__name__}: {exc}"
+                        results.extend((symbol, None, 0.0, message) for symbol, _ in futures[future])
+
+        by_symbol = {symbol: (frame, seconds, error) for symbol, frame, seconds, error in results}
+        timings: Dict[Hashable, float] = {}
+        failures: Dict[Hashable, str] = {}
+        enriched: Dict[Hashable, pd.DataFrame] = {}
+        for symbol, _frame in items:
+            frame, seconds, error = by_symbol[symbol]
+            timings[symbol] = seconds
+            if error is not None:
+                failures[symbol] = error
+            else:
+                enriched[symbol] = frame
+
+        features = pd.concat(enriched, names=["symbol", None]) if enriched else pd.DataFrame()
+        if layout == "long" and enriched:
+            features = features.reset_index(level=0).reset_index(drop=True)
+        return BatchResult(features=features, timings=timings, failures=failures)
+
+    @staticmethod
+    def compute_panel(
+        panel: Mapping[str, Any],
+        *,
+        indicators: Optional[Mapping[str, IndicatorSpec]] = None,
+        dtype: Any = np.float64,
+        as_tensor: bool = False,
+    ) -> Union[Dict[str, np.ndarray], Tuple[np.ndarray, List[str]]]:
+        """Compute indicators column-wise over an aligned ``time x symbols`` panel.
+
+        ``panel`` maps ``close``, ``high``, ``low`` and ``volume`` (and optionally
+        ``open``) to 2-D arrays or wide dataframes sharing one shape.  Every
+        indicator runs once over the whole panel using the ``"numpy"`` backend
+        kernels, so ``indicators`` must follow the array calling convention;
+        dependencies are read from the same mapping of computed arrays.
+
+        Returns a dict of 2-D arrays keyed by column, or with ``as_tensor`` a
+        ``(time, symbols, indicators)`` tensor together with its column names.
+        """
+
+        missing = {"high", "low", "close", "volume"}.difference(panel)
+        if missing:
+            raise ValueError("Panel is missing required columns: " + ", ".join(sorted(missing)))
+        store = {name: kernels.as_float_array(values) for name, values in panel.items()}
+        shape = store["close"].shape
+        if len(shape) != 2 or any(values.shape != shape for values in store.values()):
+            raise ValueError("Panel arrays must be 2-D and share the same (time, symbols) shape")
+
+        specs = _indicator_specs(NATIVE_INDICATORS if indicators is None else indicators)
+        owners = _output_owners(specs)
+        features: Dict[str, np.ndarray] = {}
+        for key in _resolve_order(specs, owners, store):
+            spec = specs[key]
+            values = _split_outputs(spec.compute(store, store), spec.outputs)
+            for column, result in zip(spec.outputs, values):
+                if owners[column] == key:
+                    store[column] = np.asarray(result, dtype=np.float64)
+                    features[column] = store[column]
+
+        if not as_tensor:
+            return {column: values.astype(dtype, copy=False) for column, values in features.items()}
+        columns = list(features)
+        tensor = np.empty(shape + (len(columns),), dtype=dtype)
+        for position, column in enumerate(columns):
+            tensor[..., position] = features[column]
+        return tensor, columns
+
+    def sweep(self, indicator: str, periods: Iterable[int]) -> pd.DataFrame:
+        """Compute one indicator family for many periods in a single vectorised pass.
+
+        ``indicator`` is one of ``SWEEPS`` (``EMA``, ``SMA``, ``RSI``, ``ATR``,
+        ``BBANDS``).  Windowed families share one cumulative sum across all
+        periods and the exponential ones run a single batched recursion
+        instead of evaluating a fixed-period indicator once per period.
+        Columns are named ``<INDICATOR>_<period>`` (``BB_UPPER_<p>`` and
+        ``BB_LOWER_<p>`` for Bollinger bands) and share the index of ``df``;
+        warm-up rows are left as ``NaN`` regardless of ``dropna``.
+        """
+
+        name = indicator.upper()
+        if name not in SWEEPS:
+            raise ValueError(
+                f"Unknown sweep '{indicator}'. Expected one of: " + ", ".join(sorted(SWEEPS))
+            )
+        periods = [int(period) for period in periods]
+        if not periods or min(periods) < 1:
+            raise ValueError("periods must be a non-empty sequence of positive integers")
+        columns, block = SWEEPS[name](_ohlcv_arrays(self.df), periods)
+        return pd.DataFrame(
+            block.astype(self.dtype, copy=False), index=self.df.index, columns=columns, copy=False
+        )
+
+    def lazy(
+        self,
+        extra_indicators: Optional[Mapping[str, IndicatorSpec]] = None,
+        overwrite: bool = False,
+    ) -> "LazyFeatureFrame":
+        """Return a :class:`LazyFeatureFrame` computing indicators on first access.
 
+        Accepts the same arguments as :meth:`add_indicators`.  Only indicators
+        that are read (and their dependencies) are ever evaluated.
+        """
+
+        return LazyFeatureFrame(self, self._indicator_graph(extra_indicators), overwrite=overwrite)
+
+    def update(self, bar: Mapping[str, Any]) -> Dict[str, Any]:
+        """Advance the streaming state by one bar and return it with its indicator values.
+
+        The first streaming call primes every indicator from ``df``; after that
+        each bar costs O(1) per indicator, or O(period) for a rolling rank.
+        ``df`` itself is not extended, so :meth:`add_indicators` keeps
+        describing the original history.
+        """
+
+        row = {
+            key.lower() if isinstance(key, str) and key.lower() in OHLCV_COLUMNS else key: value
+            for key, value in bar.items()
+        }
+        for column in OHLCV_COLUMNS:
+            row[column] = float(row[column])
+        return self._ensure_stream().update(row)
+
+    def extend(self, df_tail: pd.DataFrame) -> pd.DataFrame:
+        """Stream the rows of ``df_tail`` and return them enriched with indicators.
+
+        Only the new rows are returned, keeping the index of ``df_tail``.  Rows
+        with missing values are dropped when ``dropna`` is enabled.
+        """
+
+        _ensure_required_columns(df_tail)
+        values = _stream_rows(self._ensure_stream(), df_tail)
+
+        enriched = df_tail.copy()
+        for column, series in values.items():
+            enriched[column] = series.astype(self.dtype, copy=False)
+        if self.dtype.itemsize < 8:
+            self._downcast_inputs(enriched)
         if self.dropna:
-            raw_df = raw_df.dropna().reset_index(drop=True)
+            enriched = enriched.dropna()
+        return enriched
+
+    def _ensure_stream(self) -> streaming.IndicatorStream:
+        """Build and prime the streaming state on first use."""
+
+        if self._stream is None:
+            indicators = self._indicator_graph()
+            _require_streaming(indicators)
+            history = self._compute(indicators, overwrite=True)
+            self._stream = _primed_stream(indicators, _history_arrays(history, history))
+        return self._stream
+
+    def _cached_compute(
+        self, indicators: Mapping[str, Indicator], fingerprint: str, *, overwrite: bool
+    ) -> pd.DataFrame:
+        """Like :meth:`_compute` but served from, and stored into, ``cache`` under ``fingerprint``."""
+
+        hashes = row_hashes(self.df)
+        key = FeatureCache.entry_key(fingerprint, hashes)
+
+        block = self.cache.load(key)
+        if block is None:
+            block = self._extend_cached_prefix(indicators, fingerprint, hashes)
+            if block is None:
+                raw_df = self._compute(indicators, overwrite=overwrite)
+                owners = _output_owners(indicators)
+                features = raw_df[[column for column in raw_df.columns if column in owners]]
+                self.cache.store(key, fingerprint, hashes, features)
+                return raw_df
+            self.cache.store(key, fingerprint, hashes, block)
+
+        raw_df = self.df.copy(deep=False)
+        for column in block.columns:
+            raw_df[column] = block[column].to_numpy(dtype=self.dtype)
+        return raw_df
+
+    def _extend_cached_prefix(
+        self, indicators: Mapping[str, Indicator], fingerprint: str, hashes: np.ndarray
+    ) -> Optional[pd.DataFrame]:
+        """Reuse a cached block covering the leading rows and stream only the appended rows."""
+
+        streamable = all(spec.stream is not None for spec in indicators.values())
+        if not streamable or any(column in self.df.columns for column in _output_owners(indicators)):
+            return None
+        match = self.cache.find_prefix(fingerprint, hashes)
+        if match is None or len(hashes) - match[0] > STREAM_TAIL_LIMIT:
+            return None
+
+        rows, block = match
+        stream = _primed_stream(indicators, _history_arrays(self.df.iloc[:rows], block))
+        tail = _stream_rows(stream, self.df.iloc[rows:])
+        appended = pd.DataFrame({column: tail[column] for column in block.columns})
+        return pd.concat([block, appended], ignore_index=True)
+
+    def _fingerprint(self, indicators: Mapping[str, Indicator], overwrite: bool) -> Optional[str]:
+        """Hash the engine version, backend, input columns and indicator definitions for cache keys.
+
+        The ordered column labels and dtypes are included because the row
+        hashes cover values only: relabelled or reordered inputs, or inputs
+        that already hold some feature columns, get their own entries.
+        Returns ``None`` when an indicator cannot be fingerprinted reliably
+        (see :func:`~engine.cache.fingerprint_callable`); such sets bypass the cache.
+        """
+
+        parts = [ENGINE_VERSION, self.backend, str(self.dtype), repr(overwrite)]
+        parts.append(repr([(column, str(dtype)) for column, dtype in self.df.dtypes.items()]))
+        for key, spec in indicators.items():
+            described = fingerprint_callable(spec.compute)
+            if described is None:
+                return None
+            parts.append(f"{key}:{spec.outputs}:{spec.depends_on}:{described}")
+        return hashlib.sha256("\n".join(parts).encode()).hexdigest()
+
+    def _compute(self, indicators: Mapping[str, Indicator], *, overwrite: bool) -> pd.DataFrame:
+        """Return ``df`` plus ``indicators`` evaluated in dependency order.
+
+        The input columns are shared with ``df`` rather than copied.  In
+        ``low_memory`` mode every output is written into one preallocated
+        float block that backs the returned frame.
+        """
+
+        owners = _output_owners(indicators)
+        order = _resolve_order(indicators, owners, self.df.columns)
+        targets = {
+            key: [
+                column
+                for column in indicators[key].outputs
+                if owners[column] == key and (overwrite or column not in self.df.columns)
+            ]
+            for key in order
+        }
+
+        block_rows: Dict[str, np.ndarray] = {}
+        if self.low_memory:
+            names = [column for key in order for column in targets[key]]
+            block = np.full((len(names), len(self.df)), np.nan, dtype=self.dtype)
+            block_rows = dict(zip(names, block))
+            data = {column: block_rows.get(column, self.df[column]) for column in self.df.columns}
+            data.update(block_rows)
+            raw_df = pd.DataFrame(data, copy=False)
+        else:
+            raw_df = self.df.copy(deep=False)
+        inputs = self._backend_inputs(raw_df)
 
+        for key in order:
+            spec = indicators[key]
+            if not targets[key]:
+                continue
+            if self.profiler is None:
+                result = spec.compute(inputs, raw_df)
+            else:
+                result, seconds, allocated = self.profiler.measure(spec.compute, inputs, raw_df)
+            values = _split_outputs(result, spec.outputs)
+            for column, series in zip(spec.outputs, values):
+                if column not in targets[key]:
+                    continue
+                if column in block_rows:
+                    block_rows[column][:] = _to_float(series, self.dtype)
+                else:
+                    raw_df[column] = _to_float(series, self.dtype)
+            if self.profiler is not None:
+                written = {column: raw_df[column] for column in targets[key]}
+                self.profiler.record(key, written, seconds, allocated)
         return raw_df
 
+    def _downcast_inputs(self, raw_df: pd.DataFrame) -> None:
+        """Store the OHLCV columns of ``raw_df`` in ``dtype`` where that is safe."""
+
+        lookup = {col.lower(): col for col in raw_df.columns}
+        for name in OHLCV_COLUMNS:
+            column = lookup[name]
+            series = raw_df[column]
+            if series.dtype != self.dtype and _can_downcast(series, self.dtype, self.input_tolerance):
+                raw_df[column] = series.astype(self.dtype)
+
+    def _indicator_graph(
+        self, extra_indicators: Optional[Mapping[str, IndicatorSpec]] = None
+    ) -> Dict[str, Indicator]:
+        """Return the configured and extra indicators normalised to :class:`Indicator`."""
+
+        specs: Dict[str, IndicatorSpec] = dict(self.indicators)
+        if extra_indicators:
+            specs.update(extra_indicators)
+        return _indicator_specs(specs)
+
+    def _backend_inputs(self, raw_df: pd.DataFrame) -> Any:
+        """Return the first argument passed to indicator callables for this backend."""
+
+        if self.backend == "numpy":
+            return _ohlcv_arrays(raw_df)
+        return _uppercase_columns(raw_df)
+
     def available_indicators(self) -> Iterable[str]:
-        """Return the indicator names currently configured on this engine."""
+        """Return the indicator columns currently configured on this engine."""
+
+        return [column for spec in self._indicator_graph().values() for column in spec.outputs]
+
+
+class LazyFeatureFrame:
+    """Indicator columns computed on first access and memoised afterwards.
+
+    Item access, :meth:`eval` and :meth:`materialize` evaluate only the
+    requested indicators and their dependencies, so a rule that reads ``RSI``
+    never pays for the other indicators.  Every input row is kept, with
+    warm-up rows left as ``NaN``, because dropping incomplete rows would
+    depend on columns that may never be computed.  :meth:`to_frame` computes
+    everything and returns the same frame as
+    :meth:`FeatureEngine.add_indicators`.
+    """
+
+    def __init__(
+        self, engine: FeatureEngine, indicators: Mapping[str, Indicator], *, overwrite: bool = False
+    ) -> None:
+        self._engine = engine
+        self._indicators = indicators
+        self._owners = _output_owners(indicators)
+        # Resolving the full graph up front reports cycles and unknown columns immediately.
+        self._order = _resolve_order(indicators, self._owners, engine.df.columns)
+        self._targets = {
+            key: [
+                column
+                for column in spec.outputs
+                if self._owners[column] == key and (overwrite or column not in engine.df.columns)
+            ]
+            for key, spec in indicators.items()
+        }
+        self._done: set = set()
+        self._frame = engine.df.copy(deep=False)
+        self._inputs = engine._backend_inputs(self._frame)
+
+    @property
+    def columns(self) -> List[str]:
+        """Input columns followed by every indicator column that can be computed."""
+
+        extra = [column for key in self._order for column in self._targets[key]]
+        return list(self._engine.df.columns) + extra
+
+    @property
+    def computed(self) -> List[str]:
+        """Indicator columns materialised so far."""
 
-        return self.indicators.keys()
+        return [column for key in self._order if key in self._done for column in self._targets[key]]
+
+    @property
+    def frame(self) -> pd.DataFrame:
+        """The input columns plus the indicators computed so far."""
+
+        return self._frame
+
+    @property
+    def index(self) -> pd.Index:
+        return self._frame.index
+
+    def __len__(self) -> int:
+        return len(self._frame)
+
+    def __contains__(self, column: object) -> bool:
+        return column in self._frame.columns or column in self._owners
+
+    def __getitem__(self, key: Any) -> Any:
+        if isinstance(key, str):
+            self.materialize([key])
+            return self._frame[key]
+        keys = list(key)
+        self.materialize(keys)
+        return self._frame[keys]
+
+    def materialize(self, columns: Optional[Iterable[str]] = None) -> None:
+        """Compute ``columns`` (all indicator columns by default) if not done yet."""
+
+        if columns is None:
+            roots = list(self._indicators)
+        else:
+            owners = (self._owners[column] for column in columns if column in self._owners)
+            roots = list(dict.fromkeys(owners))
+        for key in _resolve_order(self._indicators, self._owners, self._frame.columns, roots):
+            if key in self._done:
+                continue
+            targets = self._targets[key]
+            if not targets:
+                self._done.add(key)
+                continue
+            spec = self._indicators[key]
+            profiler = self._engine.profiler
+            if profiler is None:
+                result = spec.compute(self._inputs, self._frame)
+            else:
+                result, seconds, allocated = profiler.measure(spec.compute, self._inputs, self._frame)
+            values = _split_outputs(result, spec.outputs)
+            for column, series in zip(spec.outputs, values):
+                if column in targets:
+                    self._frame[column] = _to_float(series, self._engine.dtype)
+            # Only once the columns exist: a failed compute is retried on the next access.
+            self._done.add(key)
+            if profiler is not None:
+                written = {column: self._frame[column] for column in targets}
+                profiler.record(key, written, seconds, allocated)
+
+    def eval(self, expression: str, **kwargs: Any) -> Any:
+        """Evaluate a ``DataFrame.eval`` expression, computing only the columns it names."""
+
+        self.materialize(_referenced_columns(expression, self.columns))
+        return self._frame.eval(expression, **kwargs)
+
+    def to_frame(self) -> pd.DataFrame:
+        """Compute every indicator and return the frame ``add_indicators`` would produce."""
+
+        self.materialize()
+        raw_df = self._frame[self.columns]
+        if self._engine.dtype.itemsize < 8:
+            self._engine._downcast_inputs(raw_df)
+        if self._engine.dropna:
+            raw_df = _drop_incomplete_rows(raw_df)
+        return raw_df
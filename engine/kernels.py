@@ -0,0 +1,416 @@
+"""NumPy kernels for the default technical indicators.
+
+Every kernel works along axis 0 of contiguous ``float64`` arrays and mirrors the
+Finta formula it replaces, so the ``"numpy"`` backend of
+:class:`~engine.feature_engine.FeatureEngine` stays interchangeable with the
+``"finta"`` backend.  Leading values that Finta reports as ``NaN`` (incomplete
+windows, the first difference, ...) are ``NaN`` here as well.
+"""
+
+from __future__ import annotations
+
+from typing import Sequence, Tuple
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def as_float_array(values) -> np.ndarray:
+    """Return ``values`` as a contiguous ``float64`` array without copying when possible."""
+
+    return np.ascontiguousarray(values, dtype=np.float64)
+
+
+def shift(values: np.ndarray, periods: int = 1) -> np.ndarray:
+    """Shift ``values`` forward along axis 0, padding the gap with ``NaN``."""
+
+    out = np.empty_like(values)
+    out[:periods] = np.nan
+    out[periods:] = values[:-periods]
+    return out
+
+
+# Largest exponent used when rescaling a block in :func:`decay_scan`; keeps the
+# intermediate weights below ``e**300`` so ordinary price data cannot overflow.
+_SCAN_EXPONENT_LIMIT = 300.0
+
+
+def decay_scan(values: np.ndarray, decay, scale=1.0) -> np.ndarray:
+    """Evaluate ``s[t] = decay * s[t - 1] + values[t]`` along axis 0 without a per-row loop.
+
+    ``decay`` is a scalar or one factor per trailing column, each in ``(0, 1)``.
+    Rows are processed in blocks whose local recursion has the closed form
+    ``decay**k * cumsum(values * decay**-k)``; only the carry between blocks is
+    propagated sequentially, once per block rather than once per row.  The
+    result is multiplied by ``scale`` (scalar or per column) in the same pass.
+
+    Error bound: blocks are sized so ``decay**-k`` stays below ``e**300``,
+    which rules out overflow for ``|values| < 1e170``.  Each rounding error of
+    the running sum is scaled back by ``decay**k`` before it reaches the
+    output, so the errors decay with the recursion instead of accumulating
+    over the block: the absolute error of ``s`` is ``O(eps * max|values| /
+    (1 - decay)**2)``, and the normalised mean ``s * (1 - decay)`` built by
+    :func:`ewm_mean` stays within ``eps * max|values| / alpha`` (``eps`` being
+    ``2.2e-16``), the same order as a sequential float64 loop.
+    """
+
+    decay = np.asarray(decay, dtype=np.float64)
+    n = values.shape[0]
+    out_shape = np.broadcast_shapes(values.shape, (1,) + decay.shape)
+    columns = out_shape[1:]
+    if n == 0:
+        return np.zeros(out_shape)
+
+    rate = float(np.max(-np.log(decay)))
+    block = int(max(1, min(n, _SCAN_EXPONENT_LIMIT // rate)))
+    count, tail = divmod(n, block)
+    factor = np.broadcast_to(decay, columns)[..., None]
+    steps = np.arange(block, dtype=np.float64)
+    grow = (factor**-steps)[..., None, :]
+
+    # Time runs along the last axis so every block is contiguous; copying the
+    # input and weighting it by ``decay**-k`` happen in one pass.
+    source = np.moveaxis(np.broadcast_to(values, out_shape), 0, -1)
+    blocks = np.empty(columns + (count + (tail > 0), block))
+    head = source[..., : count * block].reshape(columns + (count, block))
+    np.multiply(head, grow, out=blocks[..., :count, :])
+    if tail:
+        blocks[..., count, :tail] = source[..., count * block :] * grow[..., 0, :tail]
+        blocks[..., count, tail:] = 0.0
+
+    # Carry each block's final state into the first element of the next one.
+    ends = blocks.sum(axis=-1) * factor ** (block - 1)
+    carry_decay = factor[..., 0] ** block
+    running = np.zeros(columns)
+    for index in range(1, blocks.shape[-2]):
+        running = ends[..., index - 1] + carry_decay * running
+        blocks[..., index, 0] += factor[..., 0] * running
+
+    np.cumsum(blocks, axis=-1, out=blocks)
+    blocks *= (factor**steps * np.broadcast_to(scale, columns)[..., None])[..., None, :]
+    return np.moveaxis(blocks.reshape(columns + (-1,))[..., :n], -1, 0)
+
+
+def _ewm(values: np.ndarray, decay: np.ndarray) -> np.ndarray:
+    """Adjusted exponentially weighted mean along axis 0 with per-column ``decay``."""
+
+    missing = np.isnan(values)
+    if values.shape[0] == 0:
+        return np.zeros(np.broadcast_shapes(values.shape, (1,) + decay.shape))
+    start = np.argmin(missing, axis=0)
+    if not np.array_equal(missing.sum(axis=0), start):
+        # Interior gaps age the weights without contributing (``ignore_na=False``).
+        numerator = decay_scan(np.where(missing, 0.0, values), decay)
+        denominator = decay_scan((~missing).astype(np.float64), decay)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            return np.where(denominator > 0, numerator / denominator, np.nan)
+
+    # Past any leading NaN the weights form a geometric series, which saturates
+    # at ``1 / (1 - decay)`` once ``decay**count`` drops below float64 resolution.
+    filled = np.where(missing, 0.0, values) if start.any() else values
+    means = decay_scan(filled, decay, scale=1.0 - decay)
+    horizon = min(values.shape[0], int(np.max(start)) + int(40.0 / np.min(-np.log(decay))) + 1)
+    rows = np.arange(horizon, dtype=np.float64).reshape((-1,) + (1,) * (values.ndim - 1))
+    counts = rows - start + 1
+    with np.errstate(divide="ignore", invalid="ignore"):
+        means[:horizon] /= -np.expm1(counts * np.log(decay))
+    means[:horizon][counts <= 0] = np.nan
+    return means
+
+
+def ewm_mean(values: np.ndarray, alpha: float) -> np.ndarray:
+    """Adjusted exponentially weighted mean, equivalent to ``ewm(alpha=..., adjust=True)``.
+
+    Evaluated with :func:`decay_scan`; see there for the error bound.
+    """
+
+    return _ewm(values, np.float64(1.0 - alpha))
+
+
+def ewm_mean_many(values: np.ndarray, alphas: Sequence[float]) -> np.ndarray:
+    """Adjusted exponentially weighted means of a 1-D series for several ``alphas`` at once.
+
+    Returns a ``(rows, len(alphas))`` array.  Missing values age the weights
+    without contributing, matching ``ewm(adjust=True, ignore_na=False)``.
+    """
+
+    decay = 1.0 - np.asarray(alphas, dtype=np.float64)
+    return _ewm(np.broadcast_to(values[:, None], (len(values), len(decay))), decay)
+
+
+def _window_sums(values: np.ndarray, period: int) -> Tuple[np.ndarray, np.ndarray]:
+    """Return trailing window sums and a mask flagging windows without ``NaN``."""
+
+    missing = np.isnan(values)
+    if not missing.any():
+        # Common case: skip the masked copy and the running count entirely.
+        totals = np.cumsum(values, axis=0)
+        sums = totals[period - 1 :].copy()
+        sums[1:] -= totals[:-period]
+        return sums, np.ones(sums.shape, dtype=bool)
+
+    totals = np.cumsum(np.where(missing, 0.0, values), axis=0)
+    counts = np.cumsum(~missing, axis=0)
+    sums = totals[period - 1 :].copy()
+    sums[1:] -= totals[:-period]
+    complete = counts[period - 1 :].copy()
+    complete[1:] -= counts[:-period]
+    return sums, complete == period
+
+
+def rolling_mean(values: np.ndarray, period: int) -> np.ndarray:
+    """Trailing mean over ``period`` rows; incomplete windows are ``NaN``."""
+
+    out = np.full(values.shape, np.nan)
+    if period > values.shape[0]:
+        return out
+    # Centre the data first so long cumulative sums keep their precision.
+    offset = np.nan_to_num(values[:1])
+    sums, complete = _window_sums(values - offset, period)
+    out[period - 1 :] = np.where(complete, sums / period + offset, np.nan)
+    return out
+
+
+def rolling_std(values: np.ndarray, period: int) -> np.ndarray:
+    """Trailing sample standard deviation (``ddof=1``) over ``period`` rows."""
+
+    out = np.full(values.shape, np.nan)
+    if period > values.shape[0] or period < 2:
+        return out
+    offset = np.nan_to_num(values[:1])
+    centred = values - offset
+    sums, complete = _window_sums(centred, period)
+    squares, _ = _window_sums(centred * centred, period)
+    variance = np.maximum((squares - sums * sums / period) / (period - 1), 0.0)
+    out[period - 1 :] = np.where(complete, np.sqrt(variance), np.nan)
+    return out
+
+
+def rolling_max(values: np.ndarray, period: int) -> np.ndarray:
+    """Trailing maximum over ``period`` rows."""
+
+    out = np.full(values.shape, np.nan)
+    if period > values.shape[0]:
+        return out
+    out[period - 1 :] = sliding_window_view(values, period, axis=0).max(axis=-1)
+    return out
+
+
+def rolling_min(values: np.ndarray, period: int) -> np.ndarray:
+    """Trailing minimum over ``period`` rows."""
+
+    out = np.full(values.shape, np.nan)
+    if period > values.shape[0]:
+        return out
+    out[period - 1 :] = sliding_window_view(values, period, axis=0).min(axis=-1)
+    return out
+
+
+def _window_sums_many(values: np.ndarray, periods: np.ndarray) -> np.ndarray:
+    """Trailing sums of a 1-D series for every period from a single cumulative sum.
+
+    Returns a ``(rows, len(periods))`` array in which incomplete windows and
+    windows containing ``NaN`` are ``NaN``.
+    """
+
+    missing = np.isnan(values)
+    totals = np.concatenate([[0.0], np.cumsum(np.where(missing, 0.0, values))])
+    gaps = np.concatenate([[0], np.cumsum(missing)]) if missing.any() else None
+    sums = np.full((len(periods), len(values)), np.nan)
+    for row, period in zip(sums, periods):
+        window = row[period - 1 :]
+        np.subtract(totals[period:], totals[:-period], out=window)
+        if gaps is not None:
+            window[gaps[period:] != gaps[:-period]] = np.nan
+    return sums.T
+
+
+def rolling_mean_many(values: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """:func:`rolling_mean` of a 1-D series for several periods, as columns."""
+
+    periods = np.asarray(periods, dtype=np.int64)
+    offset = np.nan_to_num(values[:1])
+    means = _window_sums_many(values - offset, periods)
+    means /= periods
+    means += offset
+    return means
+
+
+def rolling_std_many(values: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """:func:`rolling_std` of a 1-D series for several periods, as columns."""
+
+    periods = np.asarray(periods, dtype=np.int64)
+    centred = values - np.nan_to_num(values[:1])
+    sums = _window_sums_many(centred, periods)
+    variance = _window_sums_many(centred * centred, periods)
+    sums *= sums
+    sums /= periods
+    variance -= sums
+    with np.errstate(divide="ignore", invalid="ignore"):
+        variance /= periods - 1
+    np.maximum(variance, 0.0, out=variance)
+    variance[:, periods < 2] = np.nan
+    return np.sqrt(variance, out=variance)
+
+
+def sma(close: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average (``TA.SMA``)."""
+
+    return rolling_mean(close, period)
+
+
+def ema(close: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average with span ``period`` (``TA.EMA``)."""
+
+    return ewm_mean(close, 2.0 / (period + 1.0))
+
+
+def rsi(close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Relative Strength Index using Wilder-style smoothing (``TA.RSI``)."""
+
+    delta = close - shift(close)
+    gain = ewm_mean(np.clip(delta, 0.0, None), 1.0 / period)
+    loss = ewm_mean(np.clip(-delta, 0.0, None), 1.0 / period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+def macd(
+    close: np.ndarray, period_fast: int = 12, period_slow: int = 26, signal: int = 9
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the MACD line and its signal line (``TA.MACD``)."""
+
+    line = ema(close, period_fast) - ema(close, period_slow)
+    return line, ema(line, signal)
+
+
+def obv(close: np.ndarray, volume: np.ndarray) -> np.ndarray:
+    """On Balance Volume (``TA.OBV``).
+
+    Like Finta, bars whose close is unchanged carry ``NaN`` while the running
+    total continues across them.
+    """
+
+    previous = shift(close)
+    flow = np.where(close > previous, volume, np.where(close < previous, -volume, np.nan))
+    out = np.nancumsum(flow, axis=0)
+    out[np.isnan(flow)] = np.nan
+    return out
+
+
+def bollinger(
+    close: np.ndarray, period: int = 20, std_multiplier: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the upper, middle and lower Bollinger bands (``TA.BBANDS``)."""
+
+    middle = rolling_mean(close, period)
+    width = std_multiplier * rolling_std(close, period)
+    return middle + width, middle, middle - width
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """True range, ignoring the missing previous close on the first bar (``TA.TR``)."""
+
+    previous = shift(close)
+    return np.fmax(np.fmax(np.abs(high - low), np.abs(high - previous)), np.abs(previous - low))
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Average true range as a simple mean of the true range (``TA.ATR``)."""
+
+    return rolling_mean(true_range(high, low, close), period)
+
+
+def stochastic_k(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 14) -> np.ndarray:
+    """Stochastic oscillator %K (``TA.STOCH``)."""
+
+    highest = rolling_max(high, period)
+    lowest = rolling_min(low, period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (close - lowest) / (highest - lowest) * 100.0
+
+
+def stochastic_d(
+    high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = 3, stoch_period: int = 14
+) -> np.ndarray:
+    """Stochastic oscillator %D, the ``period`` mean of %K (``TA.STOCHD``)."""
+
+    return rolling_mean(stochastic_k(high, low, close, stoch_period), period)
+
+
+def ema_many(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """:func:`ema` for several periods in one batched recursion, as columns."""
+
+    return ewm_mean_many(close, 2.0 / (np.asarray(periods, dtype=np.float64) + 1.0))
+
+
+def rsi_many(close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """:func:`rsi` for several periods in one batched recursion, as columns."""
+
+    alphas = 1.0 / np.asarray(periods, dtype=np.float64)
+    delta = close - shift(close)
+    gain = ewm_mean_many(np.clip(delta, 0.0, None), alphas)
+    loss = ewm_mean_many(np.clip(-delta, 0.0, None), alphas)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return 100.0 - 100.0 / (1.0 + gain / loss)
+
+
+def atr_many(high: np.ndarray, low: np.ndarray, close: np.ndarray, periods: Sequence[int]) -> np.ndarray:
+    """:func:`atr` for several periods sharing one true range, as columns."""
+
+    return rolling_mean_many(true_range(high, low, close), periods)
+
+
+def bollinger_many(
+    close: np.ndarray, periods: Sequence[int], std_multiplier: float = 2.0
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """:func:`bollinger` for several periods sharing one set of cumulative sums."""
+
+    middle = rolling_mean_many(close, periods)
+    width = std_multiplier * rolling_std_many(close, periods)
+    return middle + width, middle, middle - width
+
+
+def rolling_zscore(values: np.ndarray, period: int) -> np.ndarray:
+    """Distance of each value from its trailing ``period`` mean in sample standard deviations."""
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values - rolling_mean(values, period)) / rolling_std(values, period)
+
+
+# Rows compared per chunk in :func:`rolling_rank`, bounding the temporary
+# ``(rows, period)`` comparison arrays.
+_RANK_CHUNK_ROWS = 1 << 16
+
+
+def rolling_rank(values: np.ndarray, period: int) -> np.ndarray:
+    """Percentile rank of each value within its trailing ``period`` window.
+
+    Ties share their average rank, matching ``rolling(period).rank(pct=True)``;
+    windows containing ``NaN`` are ``NaN``.  Every value is compared with its
+    whole window, so the cost is O(rows x period), vectorised over chunks of
+    ``_RANK_CHUNK_ROWS`` rows.
+    """
+
+    out = np.full(values.shape, np.nan)
+    if period > values.shape[0]:
+        return out
+    windows = sliding_window_view(values, period, axis=0)
+    for start in range(0, windows.shape[0], _RANK_CHUNK_ROWS):
+        chunk = windows[start : start + _RANK_CHUNK_ROWS]
+        current = chunk[..., -1:]
+        below = (chunk < current).sum(axis=-1)
+        equal = (chunk == current).sum(axis=-1)
+        ranks = (below + (equal + 1) / 2.0) / period
+        complete = ~np.isnan(chunk).any(axis=-1)
+        out[period - 1 + start : period - 1 + start + len(chunk)] = np.where(complete, ranks, np.nan)
+    return out
+
+
+def expanding_minmax(values: np.ndarray) -> np.ndarray:
+    """Scale each value into ``[0, 1]`` using the minimum and maximum seen so far."""
+
+    lowest = np.fmin.accumulate(values, axis=0)
+    highest = np.fmax.accumulate(values, axis=0)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return (values - lowest) / (highest - lowest)
@@ -0,0 +1,221 @@
+"""Bar-level equity curves and risk metrics for backtests.
+
+Positions are represented as a ``(strategies, bars)`` array holding the
+position after the close of each bar (``1`` long, ``-1`` short, ``0``
+flat), so many strategies on the same prices - the combinations of a grid,
+say - are marked to market and scored together.  Every function also accepts a single 1-D
+row, returning scalars where the batched form returns one value per row.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Sequence
+
+import numpy as np
+
+METRIC_COLUMNS = [
+    "sharpe",
+    "sortino",
+    "calmar",
+    "exposure",
+    "turnover",
+    "bar_max_drawdown",
+    "max_drawdown_duration",
+]
+
+
+def _trade_rows(entries: Sequence[np.ndarray]) -> np.ndarray:
+    return np.repeat(np.arange(len(entries)), [len(entered) for entered in entries])
+
+
+def position_matrix(
+    length: int,
+    entries: Sequence[np.ndarray],
+    exits: Sequence[np.ndarray],
+    sides: Optional[Sequence[np.ndarray]] = None,
+) -> np.ndarray:
+    """Return one row per strategy holding each trade's side (``1`` unless ``sides`` says
+    otherwise) from its entry bar up to, not including, its exit bar."""
+
+    changes = np.zeros((len(entries), length + 1))
+    if len(entries):
+        rows = _trade_rows(entries)
+        size = 1.0 if sides is None else np.concatenate(sides).astype(np.float64)
+        np.add.at(changes, (rows, np.concatenate(entries)), size)
+        np.add.at(changes, (rows, np.concatenate(exits)), -size)
+    return np.cumsum(changes[:, :length], axis=1)
+
+
+def anchor_matrix(
+    length: int, entries: Sequence[np.ndarray], prices: Sequence[np.ndarray]
+) -> np.ndarray:
+    """Return one row per strategy holding, on every bar, the entry price of its latest trade.
+
+    Bars before a row's first trade are ``NaN``.
+    """
+
+    anchors = np.full((len(entries), length), np.nan)
+    if len(entries) and length:
+        trade = np.full((len(entries), length), -1)
+        trade[_trade_rows(entries), np.concatenate(entries)] = np.arange(sum(map(len, entries)))
+        # Trades are numbered in time order within each row, so the running maximum is the latest one.
+        latest = np.maximum.accumulate(trade, axis=1)
+        flat = np.append(np.concatenate(prices).astype(np.float64), np.nan)
+        anchors = flat[latest]
+    return anchors
+
+
+def _forward_filled(close: Any) -> np.ndarray:
+    close = np.asarray(close, dtype=np.float64)
+    known = np.where(np.isnan(close), 0, np.arange(len(close)))
+    return close[np.maximum.accumulate(known)] if len(close) else close
+
+
+def price_returns(close: Any) -> np.ndarray:
+    """Return the bar-on-bar return of ``close``, ``0`` on the first bar and across gaps.
+
+    Missing prices carry the last known price forward.
+    """
+
+    filled = _forward_filled(close)
+    returns = np.zeros(len(filled))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[1:] = filled[1:] / filled[:-1] - 1
+    return np.nan_to_num(returns, nan=0.0, posinf=0.0, neginf=0.0)
+
+
+def mark_to_market(
+    close: Any, positions: np.ndarray, anchors: Optional[np.ndarray] = None
+) -> np.ndarray:
+    """Return the strategy return of every bar: last bar's position times this bar's price change.
+
+    A short held at a fixed size gains ``entry - price``, which is not a
+    constant multiple of the equity, so with ``anchors`` (see
+    :func:`anchor_matrix`) short bars are valued against their trade's entry
+    price instead and compound exactly to the trade's return.
+    """
+
+    positions = np.asarray(positions, dtype=np.float64)
+    returns = np.zeros_like(positions)
+    returns[..., 1:] = positions[..., :-1] * price_returns(close)[1:]
+    if anchors is not None:
+        filled = _forward_filled(close)
+        short = positions[..., :-1] < 0
+        with np.errstate(divide="ignore", invalid="ignore"):
+            shorted = (filled[:-1] - filled[1:]) / (2 * anchors[..., :-1] - filled[:-1])
+        returns[..., 1:] = np.where(short, np.nan_to_num(shorted), returns[..., 1:])
+    return returns
+
+
+def settle_fills(
+    returns: np.ndarray,
+    close: Any,
+    rows: np.ndarray,
+    entry_bars: np.ndarray,
+    exit_bars: np.ndarray,
+    entry_basis: np.ndarray,
+    exit_basis: np.ndarray,
+    sides: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """Replace close-to-close returns on entry and exit bars with returns on the actual fills.
+
+    ``returns`` is a 2-D result of :func:`mark_to_market` and is updated in
+    place; trade ``i`` belongs to row ``rows[i]``, was entered at
+    ``entry_basis[i]`` on ``entry_bars[i]`` and left at ``exit_basis[i]`` on
+    ``exit_bars[i]``, on side ``sides[i]`` (long by default).  A trade's bar
+    returns then compound to its net return.
+    """
+
+    filled = _forward_filled(close)
+    side = np.ones(len(rows)) if sides is None else np.asarray(sides, dtype=np.float64)
+    same = exit_bars == entry_bars
+    held = ~same
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns[rows, entry_bars] = side * (filled[entry_bars] / entry_basis - 1)
+        previous = filled[exit_bars[held] - 1]
+        long_exit = exit_basis[held] / previous - 1
+        short_exit = (previous - exit_basis[held]) / (2 * entry_basis[held] - previous)
+        returns[rows[held], exit_bars[held]] = np.where(side[held] > 0, long_exit, short_exit)
+        returns[rows[same], entry_bars[same]] = side[same] * (exit_basis[same] / entry_basis[same] - 1)
+    return returns
+
+
+def equity_curve(returns: np.ndarray) -> np.ndarray:
+    """Compound bar returns into an equity curve starting from ``1``."""
+
+    return np.cumprod(1 + returns, axis=-1)
+
+
+def underwater(equity: np.ndarray) -> np.ndarray:
+    """Return the fractional distance of the equity below its running peak (``<= 0``)."""
+
+    return equity / np.maximum.accumulate(equity, axis=-1) - 1
+
+
+def drawdown_duration(equity: np.ndarray) -> np.ndarray:
+    """Return, for every bar, the number of bars since the equity last stood at its peak."""
+
+    equity = np.asarray(equity, dtype=np.float64)
+    bars = np.broadcast_to(np.arange(equity.shape[-1]), equity.shape)
+    at_peak = equity >= np.maximum.accumulate(equity, axis=-1)
+    return bars - np.maximum.accumulate(np.where(at_peak, bars, 0), axis=-1)
+
+
+def max_drawdown(equity: np.ndarray) -> Any:
+    """Return the largest peak-to-trough loss of each equity curve along the last axis."""
+
+    equity = np.asarray(equity, dtype=np.float64)
+    if equity.shape[-1] == 0:
+        return 0.0 if equity.ndim == 1 else np.zeros(equity.shape[:-1])
+    # ``1 - equity / peak`` rather than ``-underwater``, which is ``-0.0`` without a drawdown.
+    drawdowns = (1 - equity / np.maximum.accumulate(equity, axis=-1)).max(axis=-1)
+    return float(drawdowns) if equity.ndim == 1 else drawdowns
+
+
+def _ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    return np.divide(numerator, denominator, out=np.zeros_like(numerator), where=denominator > 0)
+
+
+def risk_metrics(
+    returns: np.ndarray, positions: np.ndarray, *, periods_per_year: float = 252
+) -> Dict[str, Any]:
+    """Score bar returns and positions, one value per row (or scalars for 1-D input).
+
+    Sharpe and Sortino ratios annualise per-bar means with
+    ``periods_per_year``; Calmar divides the annualised compound return by
+    the maximum drawdown.  ``exposure`` is the fraction of bars with an open
+    position, long or short, and ``turnover`` the position changes per bar.
+    Ratios with a zero denominator are reported as ``0``.
+    """
+
+    single = np.ndim(returns) == 1
+    returns = np.atleast_2d(np.asarray(returns, dtype=np.float64))
+    positions = np.atleast_2d(np.asarray(positions, dtype=np.float64))
+    length = returns.shape[1]
+    equity = equity_curve(returns)
+
+    scale = np.sqrt(periods_per_year)
+    mean = returns.mean(axis=1) if length else np.zeros(len(returns))
+    spread = returns.std(axis=1, ddof=1) if length > 1 else np.zeros(len(returns))
+    downside = np.sqrt((np.minimum(returns, 0) ** 2).mean(axis=1)) if length else np.zeros(len(returns))
+    drawdown = max_drawdown(equity) if length else np.zeros(len(returns))
+    final = equity[:, -1] if length else np.ones(len(returns))
+    with np.errstate(invalid="ignore"):
+        # Equity at or below zero has lost everything.
+        annual = np.where(final > 0, np.abs(final) ** (periods_per_year / max(length, 1)) - 1, -1.0)
+    steps = np.abs(np.diff(positions, axis=1, prepend=0))
+
+    metrics = {
+        "sharpe": _ratio(mean, spread) * scale,
+        "sortino": _ratio(mean, downside) * scale,
+        "calmar": _ratio(annual, drawdown),
+        "exposure": np.abs(positions).mean(axis=1) if length else np.zeros(len(returns)),
+        "turnover": steps.sum(axis=1) / max(length, 1),
+        "bar_max_drawdown": drawdown,
+        "max_drawdown_duration": (
+            drawdown_duration(equity).max(axis=1) if length else np.zeros(len(returns), dtype=np.int64)
+        ),
+    }
+    if single:
+        return {key: value[0].item() for key, value in metrics.items()}
+    return metrics
@@ -59,6 +59,16 @@ class AlphaModel:
 
         return metrics
 
+    def fit(self, X, y) -> "AlphaModel":
+        """Fit the classifier on all of ``X`` and ``y`` without holding out a split.
+
+        Used when the caller manages its own out-of-sample windows, as
+        :mod:`engine.walk_forward` does.
+        """
+
+        self.model.fit(X, y)
+        return self
+
     def predict(self, X) -> np.ndarray:
         """Return class predictions for the provided feature matrix."""
 
@@ -0,0 +1,64 @@
+"""Process and thread pools for the engine's parallel entry points.
+
+:func:`make_executor` builds the pool named by an ``executor`` argument, and
+:func:`map_shared` maps a task over a pool together with one large shared
+input - rule events, a feature frame - that process workers receive once,
+through the pool initializer, rather than pickled with every task.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, List, Optional, Tuple
+
+# Input shared by every task a worker process evaluates, installed by ``map_shared``.
+_SHARED: Any = None
+
+
+def make_executor(
+    executor: str,
+    max_workers: Optional[int],
+    initializer: Optional[Callable[..., None]] = None,
+    initargs: Tuple[Any, ...] = (),
+) -> Executor:
+    """Return the ``"process"`` or ``"thread"`` pool named by ``executor``.
+
+    Process workers run ``initializer(*initargs)`` once on start-up; threads
+    share memory and skip it.  Callers handle ``"serial"`` inline.
+    """
+
+    if executor == "process":
+        return ProcessPoolExecutor(max_workers, initializer=initializer, initargs=initargs)
+    if executor == "thread":
+        return ThreadPoolExecutor(max_workers)
+    raise ValueError(f"Unknown executor '{executor}'. Expected 'process', 'thread' or 'serial'")
+
+
+def _install_shared(shared: Any) -> None:
+    global _SHARED
+    _SHARED = shared
+
+
+def _call_with_shared(task: Callable[[Any, Any], Any], item: Any) -> Any:
+    return task(item, _SHARED)
+
+
+def map_shared(
+    executor: str,
+    max_workers: Optional[int],
+    task: Callable[[Any, Any], Any],
+    items: Iterable[Any],
+    shared: Any,
+) -> List[Any]:
+    """Return ``[task(item, shared) for item in items]`` evaluated on a pool.
+
+    ``shared`` is sent to each worker process once; thread tasks receive it
+    directly.  ``task`` must be a module-level function for process pools.
+    """
+
+    items = list(items)
+    if executor == "process":
+        with make_executor(executor, max_workers, _install_shared, (shared,)) as pool:
+            return list(pool.map(_call_with_shared, [task] * len(items), items))
+    with make_executor(executor, max_workers) as pool:
+        return list(pool.map(task, items, [shared] * len(items)))
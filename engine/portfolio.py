@@ -0,0 +1,238 @@
+"""Portfolio backtests of one rule set across many symbols on a shared timeline.
+
+Each symbol's rules are evaluated on its own bars with the machinery of
+:class:`~engine.strategy_runner.StrategyRunner`, and the exit of a position
+opened at every entry candidate is resolved per symbol with vectorised
+operations (:class:`~engine.backtest.CandidateExits`).  What couples the
+symbols - available cash and the cap on concurrent positions - is then
+settled by a single pass over the entry candidates of all symbols in time
+order, so the cost grows with the number of signals rather than with
+symbols x bars.  The equity curve is assembled afterwards from the accepted
+trades with array operations.
+"""
+
+from __future__ import annotations
+
+import heapq
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Dict, Hashable, List, Mapping, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import LEDGER_DTYPE, LONG, CandidateExits, TradeLedger
+from engine.strategy_runner import StrategyRunner
+
+# Backtest ledger columns plus the timestamps, size and profit of each trade.
+PORTFOLIO_LEDGER_DTYPE = np.dtype(
+    LEDGER_DTYPE.descr
+    + [("entry_time", object), ("exit_time", object), ("shares", np.float64), ("pnl", np.float64)]
+)
+
+
+@dataclass
+class PortfolioResult:
+    """Outcome of :meth:`PortfolioRunner.run`.
+
+    ``equity_curve`` is the marked-to-market portfolio value on the shared
+    timeline, ``ledgers`` holds a :class:`~engine.backtest.TradeLedger` of
+    ``PORTFOLIO_LEDGER_DTYPE`` rows for every symbol (empty for symbols that
+    never traded) and ``statistics`` summarises the run.
+    """
+
+    equity_curve: pd.Series
+    ledgers: Dict[Hashable, TradeLedger]
+    statistics: Dict[str, float]
+
+
+@dataclass
+class _Holding:
+    """A position accepted by the portfolio; times are positions on the shared timeline."""
+
+    column: int
+    candidate: int
+    entered: int
+    exited: int
+    shares: float
+    cost: float
+    entry_price: float
+    exit_price: float
+
+    @property
+    def proceeds(self) -> float:
+        return self.shares * self.exit_price
+
+
+@dataclass
+class PortfolioRunner:
+    """Run ``entry_rule``/``exit_rule`` on every symbol of ``frames`` with shared capital.
+
+    Each frame needs a ``close`` column and a unique index; the indexes are
+    merged into one timeline and a symbol without a bar at some timestamp is
+    valued at its last close.  A new position is sized at ``position_size``
+    times the current portfolio equity, capped by the available cash, and
+    entries are rejected while ``max_positions`` positions are open.  Entry
+    signals on the same timestamp are served in the order of ``frames``.
+    Exits free their cash at the close of the exit bar, before entries on
+    that bar are considered.
+    """
+
+    frames: Mapping[Hashable, pd.DataFrame]
+    capital: float = 1_000_000.0
+    position_size: float = 0.1
+    max_positions: int = 10
+    _positions: List[np.ndarray] = field(default_factory=list, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.frames:
+            raise ValueError("At least one symbol is required")
+        if self.capital <= 0:
+            raise ValueError("capital must be positive")
+        if not 0 < self.position_size <= 1:
+            raise ValueError("position_size must be in (0, 1]")
+        if self.max_positions < 1:
+            raise ValueError("max_positions must be at least 1")
+        for symbol, frame in self.frames.items():
+            if "close" not in frame.columns:
+                raise ValueError(f"Frame for {symbol!r} must contain a 'close' column")
+            if not frame.index.is_unique:
+                raise ValueError(f"Frame for {symbol!r} has a duplicated index")
+
+        self.symbols = list(self.frames)
+        timeline = self.frames[self.symbols[0]].index
+        for symbol in self.symbols[1:]:
+            timeline = timeline.union(self.frames[symbol].index)
+        self.timeline = timeline
+        self._positions = [timeline.get_indexer(self.frames[symbol].index) for symbol in self.symbols]
+        prices = np.full((len(timeline), len(self.symbols)), np.nan)
+        for column, symbol in enumerate(self.symbols):
+            prices[self._positions[column], column] = self.frames[symbol]["close"].to_numpy(np.float64)
+        # Last known close of every symbol at every timestamp.
+        self.prices = pd.DataFrame(prices).ffill().to_numpy()
+
+    def run(self, *, entry_rule, exit_rule, sl: float, tp: float) -> PortfolioResult:
+        """Backtest the rules on every symbol under the capital and position constraints."""
+
+        tables: List[CandidateExits] = []
+        times, owners, numbers = [], [], []
+        for column, symbol in enumerate(self.symbols):
+            events = StrategyRunner(self.frames[symbol]).rule_events(entry_rule, exit_rule)
+            tables.append(CandidateExits(events, sl=sl, tp=tp))
+            number = np.flatnonzero(events.close[events.starts] > 0)  # skip unpriced entries
+            times.append(self._positions[column][events.starts[number]])
+            owners.append(np.full(len(number), column))
+            numbers.append(number)
+        order = np.lexsort((np.concatenate(owners), np.concatenate(times)))
+        time = np.concatenate(times)[order].tolist()
+        owner = np.concatenate(owners)[order].tolist()
+        candidate = np.concatenate(numbers)[order].tolist()
+
+        cash = float(self.capital)
+        busy_until = [-1] * len(self.symbols)
+        open_positions: List[Tuple[int, int]] = []  # heap of (exit time, index into trades)
+        trades: List[_Holding] = []
+        rejected = 0
+        prices = self.prices
+        position = 0
+        while position < len(time):
+            entered, column = time[position], owner[position]
+            if entered <= busy_until[column]:
+                position += 1
+                continue
+            while open_positions and open_positions[0][0] <= entered:
+                cash += trades[heapq.heappop(open_positions)[1]].proceeds
+            if len(open_positions) >= self.max_positions or cash <= 0:
+                # Nothing changes before the next exit, so every free symbol's signal up
+                # to it is rejected without pricing the portfolio.
+                end = bisect_left(time, open_positions[0][0], position) if open_positions else len(time)
+                for index in range(position, end):
+                    rejected += time[index] > busy_until[owner[index]]
+                position = end
+                continue
+
+            held = 0.0
+            for _, index in open_positions:
+                held += trades[index].shares * prices[entered, trades[index].column]
+            budget = min(self.position_size * (cash + held), cash)
+            number = candidate[position]
+            exit_bar, _reason = tables[column][number]
+            exited = int(self._positions[column][exit_bar])
+            price = prices[entered, column]
+            holding = _Holding(
+                column, number, entered, exited, budget / price, budget, price, prices[exited, column]
+            )
+            trades.append(holding)
+            heapq.heappush(open_positions, (exited, len(trades) - 1))
+            busy_until[column] = exited
+            cash -= budget
+            position += 1
+
+        equity = self._equity_curve(trades)
+        return PortfolioResult(
+            equity_curve=pd.Series(equity, index=self.timeline, name="equity"),
+            ledgers=self._ledgers(trades, tables),
+            statistics=self._statistics(trades, equity, rejected),
+        )
+
+    def _equity_curve(self, trades: List[_Holding]) -> np.ndarray:
+        """Cash plus marked-to-market holdings at every timestamp of the timeline."""
+
+        length = len(self.timeline)
+        holdings = np.zeros((length, len(self.symbols)))
+        cash_flow = np.zeros(length)
+        if trades:
+            column = np.array([trade.column for trade in trades])
+            entered = np.array([trade.entered for trade in trades])
+            exited = np.array([trade.exited for trade in trades])
+            shares = np.array([trade.shares for trade in trades])
+            np.add.at(holdings, (entered, column), shares)
+            np.add.at(holdings, (exited, column), -shares)
+            np.add.at(cash_flow, entered, -np.array([trade.cost for trade in trades]))
+            np.add.at(cash_flow, exited, np.array([trade.proceeds for trade in trades]))
+        holdings = np.cumsum(holdings, axis=0)
+        value = np.where(holdings != 0, holdings * self.prices, 0.0).sum(axis=1)
+        return self.capital + np.cumsum(cash_flow) + value
+
+    def _ledgers(
+        self, trades: List[_Holding], tables: List[CandidateExits]
+    ) -> Dict[Hashable, TradeLedger]:
+        held: List[List[_Holding]] = [[] for _ in self.symbols]
+        for trade in trades:
+            held[trade.column].append(trade)
+        ledgers: Dict[Hashable, TradeLedger] = {}
+        for column, symbol in enumerate(self.symbols):
+            table = tables[column]
+            candidates = np.array([trade.candidate for trade in held[column]], dtype=np.int64)
+            exits = [table[candidate] for candidate in candidates.tolist()]
+            entry_price = np.array([trade.entry_price for trade in held[column]], dtype=np.float64)
+            exit_price = np.array([trade.exit_price for trade in held[column]], dtype=np.float64)
+            shares = np.array([trade.shares for trade in held[column]], dtype=np.float64)
+            entered = np.array([trade.entered for trade in held[column]], dtype=np.int64)
+            exited = np.array([trade.exited for trade in held[column]], dtype=np.int64)
+
+            records = np.empty(len(candidates), dtype=PORTFOLIO_LEDGER_DTYPE)
+            records["entry_index"] = table.events.starts[candidates]
+            records["exit_index"] = [bar for bar, _reason in exits]
+            records["entry_price"] = entry_price
+            records["exit_price"] = exit_price
+            records["return_pct"] = (exit_price - entry_price) / entry_price
+            records["reason"] = [reason for _bar, reason in exits]
+            records["side"] = LONG
+            records["entry_time"] = self.timeline[entered].to_numpy(dtype=object)
+            records["exit_time"] = self.timeline[exited].to_numpy(dtype=object)
+            records["shares"] = shares
+            records["pnl"] = shares * exit_price - np.array([trade.cost for trade in held[column]])
+            ledgers[symbol] = TradeLedger(records)
+        return ledgers
+
+    def _statistics(self, trades: List[_Holding], equity: np.ndarray, rejected: int) -> Dict[str, float]:
+        pnl = np.array([trade.proceeds - trade.cost for trade in trades])
+        return {
+            "trades": len(trades),
+            "rejected_entries": rejected,
+            "win_rate": float((pnl > 0).mean()) if len(pnl) else 0.0,
+            "final_equity": float(equity[-1]),
+            "total_return": float(equity[-1] / self.capital - 1),
+            "max_drawdown": StrategyRunner._calculate_max_drawdown(equity),
+        }
@@ -0,0 +1,147 @@
+"""Per-indicator instrumentation for :class:`~engine.feature_engine.FeatureEngine`.
+
+Attach a :class:`FeatureProfiler` to an engine to record, for every indicator
+it evaluates, the wall time of the indicator callable, the memory it
+allocated (optional, via :mod:`tracemalloc`) and the number of ``NaN`` values
+in each output column.  Every record is also handed to an optional hook, so
+the measurements can be forwarded to structured logs or a metrics sink.
+Engines without a profiler skip all of this.
+"""
+
+from __future__ import annotations
+
+import logging
+import time
+import tracemalloc
+from dataclasses import asdict, dataclass, field
+from typing import Any, Callable, Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+SUMMARY_COLUMNS = ["indicator", "column", "rows", "seconds", "allocated_mb", "nan_count"]
+
+
+@dataclass
+class IndicatorProfile:
+    """Measurements of one indicator evaluation.
+
+    ``allocated_bytes`` is the peak memory traced while the callable ran, or
+    ``None`` when allocation tracking is disabled.  ``nan_counts`` maps each
+    output column written by the indicator to its number of missing values.
+    """
+
+    indicator: str
+    rows: int
+    seconds: float
+    allocated_bytes: Optional[int]
+    nan_counts: Dict[str, int]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Return the record as plain Python types, e.g. for JSON logging."""
+
+        return asdict(self)
+
+
+ProfileHook = Callable[[IndicatorProfile], None]
+
+
+def logging_hook(logger: logging.Logger, level: int = logging.INFO) -> ProfileHook:
+    """Return a hook that logs every record through ``logger`` with the fields in ``extra``."""
+
+    def hook(profile: IndicatorProfile) -> None:
+        logger.log(
+            level,
+            "indicator %s took %.6fs",
+            profile.indicator,
+            profile.seconds,
+            extra={"indicator_profile": profile.to_dict()},
+        )
+
+    return hook
+
+
+@dataclass
+class FeatureProfiler:
+    """Collect :class:`IndicatorProfile` records and pass each one to ``hook``.
+
+    ``track_allocations`` measures the peak traced memory of every indicator
+    call.  Tracing slows Python allocations down considerably, so it is off
+    by default and the timings of a tracked run are not comparable with
+    those of an untracked one.
+    """
+
+    hook: Optional[ProfileHook] = None
+    track_allocations: bool = False
+    records: List[IndicatorProfile] = field(default_factory=list, init=False)
+
+    def measure(self, compute: Callable[..., Any], *args: Any) -> Tuple[Any, float, Optional[int]]:
+        """Call ``compute(*args)`` and return its result, wall time and allocated bytes."""
+
+        if not self.track_allocations:
+            started = time.perf_counter()
+            result = compute(*args)
+            return result, time.perf_counter() - started, None
+
+        owns_trace = not tracemalloc.is_tracing()
+        if owns_trace:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline = tracemalloc.get_traced_memory()[0]
+        try:
+            started = time.perf_counter()
+            result = compute(*args)
+            seconds = time.perf_counter() - started
+            allocated = tracemalloc.get_traced_memory()[1] - baseline
+        finally:
+            if owns_trace:
+                tracemalloc.stop()
+        return result, seconds, allocated
+
+    def record(
+        self,
+        indicator: str,
+        outputs: Mapping[str, Any],
+        seconds: float,
+        allocated_bytes: Optional[int] = None,
+    ) -> IndicatorProfile:
+        """Store a record for ``indicator`` given its written ``outputs`` and notify the hook."""
+
+        nan_counts = {
+            column: int(np.count_nonzero(np.isnan(np.asarray(values, dtype=np.float64))))
+            for column, values in outputs.items()
+        }
+        rows = len(next(iter(outputs.values()))) if outputs else 0
+        profile = IndicatorProfile(indicator, rows, seconds, allocated_bytes, nan_counts)
+        self.records.append(profile)
+        if self.hook is not None:
+            self.hook(profile)
+        return profile
+
+    def reset(self) -> None:
+        """Forget all collected records."""
+
+        self.records.clear()
+
+    def summary(self) -> pd.DataFrame:
+        """Return one row per indicator output column, in evaluation order.
+
+        ``seconds`` and ``allocated_mb`` belong to the indicator call, so they
+        repeat on every column of a multi-output indicator.
+        """
+
+        rows = [
+            {
+                "indicator": profile.indicator,
+                "column": column,
+                "rows": profile.rows,
+                "seconds": profile.seconds,
+                "allocated_mb": (
+                    np.nan if profile.allocated_bytes is None else profile.allocated_bytes / 1e6
+                ),
+                "nan_count": nan_count,
+            }
+            for profile in self.records
+            for column, nan_count in profile.nan_counts.items()
+        ]
+        return pd.DataFrame(rows, columns=SUMMARY_COLUMNS)
@@ -0,0 +1,245 @@
+"""Compiled rule expressions for :class:`~engine.strategy_runner.StrategyRunner`.
+
+Rule strings use the ``DataFrame.eval`` syntax extended with a few
+time-series functions.  :func:`compile_rule` parses an expression once into a
+tree of NumPy operations, cached by expression text, and the compiled rule
+can then be evaluated on any mapping of column arrays - another symbol,
+another grid run, another slice of history - without building intermediate
+dataframes.  Supported syntax:
+
+* column names (backtick-quote names that are not identifiers), numbers,
+  ``True`` and ``False``;
+* arithmetic ``+ - * / // % **`` and unary ``-``, ``not`` and ``~``;
+* comparisons, including chains such as ``30 < RSI < 70``;
+* ``and``, ``or``, ``&`` and ``|``, element-wise and with the precedence of
+  ``and``/``or`` as in ``DataFrame.eval``;
+* ``shift(x, n)`` (alias ``lag``), ``cross_over(a, b)``, ``cross_under(a, b)``,
+  ``rolling_mean``, ``rolling_std``, ``rolling_sum``, ``rolling_min`` and
+  ``rolling_max`` (each ``(x, n)``) and ``abs(x)``.
+
+Comparisons involving ``NaN`` are ``False``, as in pandas; shifted and
+rolling values are ``NaN`` until enough history is available.
+"""
+
+from __future__ import annotations
+
+import ast
+import io
+import re
+import tokenize
+from dataclasses import dataclass
+from functools import lru_cache, reduce
+from typing import Any, Callable, Dict, List, Mapping, Tuple
+
+import numpy as np
+
+from engine import kernels
+
+Node = Callable[[Any], Any]
+
+_BACKTICK = re.compile(r"`([^`]+)`")
+_QUOTED_PREFIX = "__rule_column_"
+
+_BINARY: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Add: np.add,
+    ast.Sub: np.subtract,
+    ast.Mult: np.multiply,
+    ast.Div: np.true_divide,
+    ast.FloorDiv: np.floor_divide,
+    ast.Mod: np.mod,
+    ast.Pow: np.power,
+    ast.BitAnd: np.logical_and,
+    ast.BitOr: np.logical_or,
+}
+_COMPARE: Dict[type, Callable[[Any, Any], Any]] = {
+    ast.Lt: np.less,
+    ast.LtE: np.less_equal,
+    ast.Gt: np.greater,
+    ast.GtE: np.greater_equal,
+    ast.Eq: np.equal,
+    ast.NotEq: np.not_equal,
+}
+_UNARY: Dict[type, Callable[[Any], Any]] = {
+    ast.USub: np.negative,
+    ast.UAdd: np.positive,
+    ast.Not: np.logical_not,
+    ast.Invert: np.logical_not,
+}
+
+
+def _shift(values: Any, periods: int) -> np.ndarray:
+    return kernels.shift(kernels.as_float_array(values), periods)
+
+
+def _cross_over(left: Any, right: Any) -> np.ndarray:
+    spread = kernels.as_float_array(np.subtract(left, right))
+    return (spread > 0) & (kernels.shift(spread, 1) <= 0)
+
+
+def _cross_under(left: Any, right: Any) -> np.ndarray:
+    spread = kernels.as_float_array(np.subtract(left, right))
+    return (spread < 0) & (kernels.shift(spread, 1) >= 0)
+
+
+def _rolling_sum(values: np.ndarray, period: int) -> np.ndarray:
+    return kernels.rolling_mean(values, period) * period
+
+
+# name -> (function, number of array arguments, whether a trailing window/period is required)
+_FUNCTIONS: Dict[str, Tuple[Callable[..., Any], int, bool]] = {
+    "shift": (_shift, 1, True),
+    "lag": (_shift, 1, True),
+    "cross_over": (_cross_over, 2, False),
+    "cross_under": (_cross_under, 2, False),
+    "rolling_mean": (kernels.rolling_mean, 1, True),
+    "rolling_std": (kernels.rolling_std, 1, True),
+    "rolling_sum": (_rolling_sum, 1, True),
+    "rolling_min": (kernels.rolling_min, 1, True),
+    "rolling_max": (kernels.rolling_max, 1, True),
+    "abs": (np.abs, 1, False),
+}
+_WINDOWED = {"rolling_mean", "rolling_std", "rolling_sum", "rolling_min", "rolling_max"}
+
+
+def _normalise(expression: str) -> Tuple[str, Dict[str, str]]:
+    """Replace backtick-quoted names and give ``&``/``|`` the precedence of ``and``/``or``."""
+
+    quoted: Dict[str, str] = {}
+
+    def placeholder(match: re.Match) -> str:
+        name = f"{_QUOTED_PREFIX}{len(quoted)}"
+        quoted[name] = match.group(1)
+        return name
+
+    source = _BACKTICK.sub(placeholder, expression.strip())
+    tokens = []
+    try:
+        for token in tokenize.generate_tokens(io.StringIO(source).readline):
+            if token.type == tokenize.OP and token.string in ("&", "|"):
+                token = token._replace(type=tokenize.NAME, string="and" if token.string == "&" else "or")
+            tokens.append(token[:2])
+    except (tokenize.TokenError, SyntaxError) as exc:
+        raise ValueError(f"Cannot parse rule '{expression}': {exc}") from exc
+    return tokenize.untokenize(tokens), quoted
+
+
+@dataclass(frozen=True)
+class CompiledRule:
+    """A parsed rule expression, evaluated with :meth:`mask` or :meth:`evaluate`.
+
+    ``columns`` lists the column names the rule reads, in order of first use.
+    """
+
+    expression: str
+    columns: Tuple[str, ...]
+    _plan: Node
+
+    def evaluate(self, data: Any) -> Any:
+        """Evaluate the rule on ``data``, anything that maps column names to arrays or series."""
+
+        arrays = {column: np.asarray(data[column]) for column in self.columns}
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            return self._plan(arrays)
+
+    def mask(self, data: Any, length: int) -> np.ndarray:
+        """Evaluate the rule on ``data`` to one boolean per row of a ``length``-row frame."""
+
+        result = np.asarray(self.evaluate(data), dtype=bool)
+        if result.ndim == 0:
+            return np.full(length, bool(result))
+        if result.shape != (length,):
+            raise ValueError(
+                f"Rule '{self.expression}' produced shape {result.shape}, expected ({length},)"
+            )
+        return result
+
+
+class _Compiler:
+    def __init__(self, expression: str, quoted: Mapping[str, str]) -> None:
+        self.expression = expression
+        self.quoted = quoted
+        self.columns: List[str] = []
+
+    def fail(self, node: ast.AST) -> ValueError:
+        return ValueError(f"Unsupported syntax in rule '{self.expression}': {ast.unparse(node)}")
+
+    def compile(self, node: ast.AST) -> Node:
+        if isinstance(node, ast.Expression):
+            return self.compile(node.body)
+        if isinstance(node, ast.Name):
+            return self.column(node.id)
+        if isinstance(node, ast.Constant) and isinstance(node.value, (bool, int, float)):
+            value = node.value
+            return lambda _arrays: value
+        if isinstance(node, ast.UnaryOp) and type(node.op) in _UNARY:
+            operator, operand = _UNARY[type(node.op)], self.compile(node.operand)
+            return lambda arrays: operator(operand(arrays))
+        if isinstance(node, ast.BinOp) and type(node.op) in _BINARY:
+            operator = _BINARY[type(node.op)]
+            left, right = self.compile(node.left), self.compile(node.right)
+            return lambda arrays: operator(left(arrays), right(arrays))
+        if isinstance(node, ast.BoolOp):
+            operator = np.logical_and if isinstance(node.op, ast.And) else np.logical_or
+            operands = [self.compile(value) for value in node.values]
+            return lambda arrays: reduce(operator, (operand(arrays) for operand in operands))
+        if isinstance(node, ast.Compare) and all(type(op) in _COMPARE for op in node.ops):
+            return self.comparison(node)
+        if isinstance(node, ast.Call) and isinstance(node.func, ast.Name) and not node.keywords:
+            return self.call(node)
+        raise self.fail(node)
+
+    def column(self, name: str) -> Node:
+        name = self.quoted.get(name, name)
+        if name not in self.columns:
+            self.columns.append(name)
+        return lambda arrays: arrays[name]
+
+    def comparison(self, node: ast.Compare) -> Node:
+        operands = [self.compile(operand) for operand in [node.left, *node.comparators]]
+        operators = [_COMPARE[type(op)] for op in node.ops]
+
+        def compare(arrays: Mapping[str, np.ndarray]) -> Any:
+            values = [operand(arrays) for operand in operands]
+            result = operators[0](values[0], values[1])
+            for position, operator in enumerate(operators[1:], start=1):
+                result = np.logical_and(result, operator(values[position], values[position + 1]))
+            return result
+
+        return compare
+
+    def call(self, node: ast.Call) -> Node:
+        name = node.func.id
+        if name not in _FUNCTIONS:
+            raise self.fail(node)
+        function, arity, windowed = _FUNCTIONS[name]
+        args = list(node.args)
+        if windowed and len(args) == arity and name not in _WINDOWED:
+            args.append(ast.Constant(1))  # shift/lag default to one bar
+        if len(args) != arity + windowed:
+            raise self.fail(node)
+        operands = [self.compile(arg) for arg in args[:arity]]
+        if not windowed:
+            return lambda arrays: function(*(operand(arrays) for operand in operands))
+
+        window = args[-1]
+        if not (isinstance(window, ast.Constant) and type(window.value) is int and window.value >= 1):
+            raise ValueError(f"{name}() in rule '{self.expression}' needs a positive integer period")
+        period, (operand,) = window.value, operands
+        return lambda arrays: function(kernels.as_float_array(operand(arrays)), period)
+
+
+@lru_cache(maxsize=512)
+def compile_rule(expression: str) -> CompiledRule:
+    """Parse ``expression`` into a :class:`CompiledRule`; results are cached by text.
+
+    Raises ``ValueError`` for syntax outside the supported subset.
+    """
+
+    source, quoted = _normalise(expression)
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Cannot parse rule '{expression}': {exc.msg}") from exc
+    compiler = _Compiler(expression, quoted)
+    plan = compiler.compile(tree)
+    return CompiledRule(expression, tuple(compiler.columns), plan)
@@ -2,52 +2,151 @@
 
 from __future__ import annotations
 
+import warnings
 from dataclasses import dataclass
-from typing import Callable, Dict, List, Sequence
+from functools import wraps
+from itertools import product
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
 
 import numpy as np
 import pandas as pd
 
+from engine import metrics
+from engine.backtest import (
+    RuleEvents,
+    TradeIndices,
+    TradeLedger,
+    rule_events,
+    simulate_events,
+    simulate_grid,
+)
+from engine.execution import ExecutionModel, Fills
+from engine.feature_engine import LazyFeatureFrame
+from engine.parallel import map_shared
+from engine.rules import compile_rule
+
 
 Condition = Callable[[pd.Series], bool]
+BatchCondition = Callable[[Any], Any]
+
+
+@dataclass(frozen=True)
+class _BatchSpec:
+    columns: Optional[Tuple[str, ...]]
+    arrays: bool
+
+
+def batch_rule(
+    func: Optional[BatchCondition] = None,
+    *,
+    columns: Optional[Iterable[str]] = None,
+    arrays: bool = False,
+) -> Any:
+    """Mark a callable rule as evaluated once over all bars instead of once per bar.
+
+    The rule receives the whole frame, or with ``arrays=True`` a dict of
+    column arrays, and returns one boolean per bar.  ``columns`` restricts
+    the input to those columns, so a :class:`LazyFeatureFrame` computes only
+    the indicators the rule reads.  The rule itself is returned, marked with
+    a ``__batch_rule__`` attribute.  Usable bare or with arguments::
+
+        @batch_rule
+        def oversold(df):
+            return df["RSI"] < 30
+
+        @batch_rule(columns=["EMA_10", "EMA_50"], arrays=True)
+        def uptrend(arrays):
+            return arrays["EMA_10"] > arrays["EMA_50"]
+    """
+
+    spec = _BatchSpec(None if columns is None else tuple(columns), arrays)
+
+    def mark(rule: BatchCondition) -> BatchCondition:
+        try:
+            rule.__batch_rule__ = spec
+        except AttributeError:
+            # Bound methods and builtins take no attributes; mark a thin wrapper instead.
+            @wraps(rule)
+            def batch(data: Any) -> Any:
+                return rule(data)
+
+            batch.__batch_rule__ = spec
+            return batch
+        return rule
+
+    return mark if func is None else mark(func)
+
+
+GRID_COLUMNS = [
+    "sl",
+    "tp",
+    "trades",
+    "win_rate",
+    "average_return",
+    "cumulative_return",
+    "max_drawdown",
+    *metrics.METRIC_COLUMNS,
+]
+
+# Bars x combinations marked to market at once when scoring a grid.
+_METRIC_BLOCK_CELLS = 1 << 22
 
 
 @dataclass
-class Trade:
-    entry_index: int
-    exit_index: int
-    entry_price: float
-    exit_price: float
-    return_pct: float
-    reason: str
-
-    def to_dict(self) -> Dict[str, float | int | str]:
-        return {
-            "entry_index": self.entry_index,
-            "exit_index": self.exit_index,
-            "entry_price": self.entry_price,
-            "exit_price": self.exit_price,
-            "return_pct": self.return_pct,
-            "reason": self.reason,
-        }
+class GridResult:
+    """Outcome of :meth:`StrategyRunner.run_grid`.
+
+    ``summary`` has one row per ``(sl, tp)`` combination, in grid order, with
+    the statistics of :meth:`StrategyRunner.run_backtest`.  ``ledgers`` maps
+    each combination to its trade ledger when ledgers were requested.
+    """
+
+    summary: pd.DataFrame
+    ledgers: Dict[Tuple[float, float], TradeLedger]
+
+
+def _grid_chunk(combinations: Sequence[Tuple[float, float]], events: RuleEvents) -> List[TradeIndices]:
+    """Simulate the ``(sl, tp)`` pairs together on ``events``."""
+
+    return simulate_grid(events, combinations)
+
+
+def _ledger(fills: Fills) -> TradeLedger:
+    return TradeLedger.from_columns(
+        entry_index=fills.entry_index,
+        exit_index=fills.exit_index,
+        entry_price=fills.entry_price,
+        exit_price=fills.exit_price,
+        return_pct=fills.return_pct,
+        reason=fills.reason,
+        side=fills.side,
+    )
 
 
 class StrategyRunner:
-    """Execute simple long-only strategies using indicator-driven rules."""
+    """Execute simple strategies using indicator-driven rules.
+
+    Long positions follow ``entry_rule`` and ``exit_rule``; passing
+    ``short_entry_rule`` and ``short_exit_rule`` as well lets the runner go
+    short while flat, with returns and stops mirrored for the short side.
 
-    def __init__(self, df: pd.DataFrame):
+    Rules are strings compiled by :func:`engine.rules.compile_rule` (with a
+    ``DataFrame.eval`` fallback for other syntax), callables marked with
+    :func:`batch_rule` that map the frame to a boolean mask, or legacy
+    callables that receive one row at a time (slow, and warned about).
+
+    ``df`` may be a :class:`~engine.feature_engine.LazyFeatureFrame`, in which
+    case string rules only compute the indicator columns they reference.
+    Batch rules compute the ``columns`` they declare; other callable rules
+    trigger computation of every indicator.
+    """
+
+    def __init__(self, df: pd.DataFrame | LazyFeatureFrame):
         if "close" not in df.columns:
             raise ValueError("Dataframe must contain a 'close' column for PnL calculations")
-        self.df = df.reset_index(drop=True).copy()
-
-    @staticmethod
-    def _resolve_condition(rule, df: pd.DataFrame) -> Sequence[bool] | Condition:
-        if callable(rule):
-            return rule
-        if isinstance(rule, str):
-            # Evaluate the rule vectorised for efficiency and safety.
-            return df.eval(rule)
-        raise TypeError("Rules must be either callables or pandas eval strings")
+        self.features: Optional[LazyFeatureFrame] = df if isinstance(df, LazyFeatureFrame) else None
+        source = df.frame if isinstance(df, LazyFeatureFrame) else df
+        self.df = source.reset_index(drop=True).copy()
 
     def run_backtest(
         self,
@@ -56,92 +155,243 @@ class StrategyRunner:
         exit_rule,
         sl: float,
         tp: float,
+        periods_per_year: float = 252,
+        execution: Optional[ExecutionModel] = None,
+        short_entry_rule=None,
+        short_exit_rule=None,
     ) -> Dict[str, object]:
-        """Run the backtest returning summary statistics and trade ledger."""
-
-        entry_condition = self._resolve_condition(entry_rule, self.df)
-        exit_condition = self._resolve_condition(exit_rule, self.df)
-
-        trades: List[Trade] = []
-        position_open = False
-        entry_price = 0.0
-        entry_index = 0
-
-        def condition_at(rule, idx: int) -> bool:
-            if callable(rule):
-                return bool(rule(self.df.iloc[idx]))
-            return bool(rule.iloc[idx])
-
-        for idx in range(len(self.df)):
-            price = float(self.df.iloc[idx]["close"])
-
-            if not position_open:
-                if condition_at(entry_condition, idx):
-                    position_open = True
-                    entry_price = price
-                    entry_index = idx
-                continue
-
-            change = (price - entry_price) / entry_price
-            should_exit = condition_at(exit_condition, idx)
-            reason = None
-
-            if change <= -sl:
-                reason = "stop_loss"
-            elif change >= tp:
-                reason = "take_profit"
-            elif should_exit:
-                reason = "rule_exit"
-
-            if reason:
-                trades.append(
-                    Trade(
-                        entry_index=entry_index,
-                        exit_index=idx,
-                        entry_price=entry_price,
-                        exit_price=price,
-                        return_pct=change,
-                        reason=reason,
-                    )
-                )
-                position_open = False
-
-        if position_open:
-            # Force close any open position at the last available price.
-            final_price = float(self.df.iloc[-1]["close"])
-            change = (final_price - entry_price) / entry_price
-            trades.append(
-                Trade(
-                    entry_index=entry_index,
-                    exit_index=len(self.df) - 1,
-                    entry_price=entry_price,
-                    exit_price=final_price,
-                    return_pct=change,
-                    reason="end_of_data",
-                )
+        """Run the backtest returning summary statistics and trade ledger.
+
+        Rules are resolved to one boolean mask per bar and the trades are
+        simulated on arrays by :func:`engine.backtest.simulate_trades`.  The
+        ``equity_curve`` compounds the trade returns; ``bar_equity`` marks the
+        position to market on every bar, with its ``underwater`` curve and
+        ``drawdown_duration`` in bars alongside, and the
+        :data:`~engine.metrics.METRIC_COLUMNS` risk metrics are computed from
+        it (annualised with ``periods_per_year``).  All curves are NumPy
+        arrays and the ``ledger`` is a :class:`~engine.backtest.TradeLedger`.
+
+        ``execution`` sets commission, slippage, intrabar stops and entry
+        timing (see :class:`~engine.execution.ExecutionModel`); trade returns,
+        ledger prices and the bar-level equity then reflect the actual fills.
+
+        With ``short_entry_rule`` and ``short_exit_rule`` a flat runner also
+        opens short positions, which ``sl`` stops out when the price rises by
+        that fraction and ``tp`` closes when it falls by it.  A bar signalling
+        both sides opens the long, and a position is never reversed on its
+        exit bar.  The ledger's ``side`` column is ``1`` for longs and ``-1``
+        for shorts, whose ``return_pct`` gains as the price falls, and
+        ``bar_equity`` holds signed positions.
+        """
+
+        model = ExecutionModel() if execution is None else execution
+        prices = self._execution_prices(model)
+        events = self.rule_events(entry_rule, exit_rule, short_entry_rule, short_exit_rule)
+        events = model.prepare(events, prices)
+        fills = model.fill(events, simulate_events(events, sl=sl, tp=tp), prices, sl=sl, tp=tp)
+        statistics = self._statistics(fills.return_pct)
+
+        positions, bar_returns = self._bar_returns(events.close, [fills], settle=execution is not None)
+        risk = metrics.risk_metrics(bar_returns[0], positions[0], periods_per_year=periods_per_year)
+        statistics.update(risk)
+        bar_equity = metrics.equity_curve(bar_returns[0])
+        statistics["bar_equity"] = bar_equity
+        statistics["underwater"] = metrics.underwater(bar_equity)
+        statistics["drawdown_duration"] = metrics.drawdown_duration(bar_equity)
+        statistics["ledger"] = _ledger(fills)
+        return statistics
+
+    def run_grid(
+        self,
+        *,
+        entry_rule,
+        exit_rule,
+        sl: Iterable[float],
+        tp: Iterable[float],
+        ledgers: bool = False,
+        executor: str = "process",
+        max_workers: Optional[int] = None,
+        chunksize: int = 8,
+        periods_per_year: float = 252,
+        execution: Optional[ExecutionModel] = None,
+        short_entry_rule=None,
+        short_exit_rule=None,
+    ) -> GridResult:
+        """Backtest every combination of the ``sl`` and ``tp`` grids.
+
+        The rules are resolved once and the resulting entry and exit events
+        are shipped to each worker once (:func:`~engine.parallel.map_shared`)
+        rather than with every task.  ``executor`` is ``"process"``,
+        ``"thread"`` or ``"serial"`` as in :meth:`FeatureEngine.compute_many`,
+        and each task covers ``chunksize`` combinations, simulated together.
+        Set ``ledgers`` to also return the trade ledger of every combination.
+        The bar-level risk metrics of all
+        combinations are computed together on ``(combinations, bars)`` arrays.
+        ``execution`` and the short rules apply as in :meth:`run_backtest`.
+        """
+
+        combinations = list(product(sl, tp))
+        if not combinations:
+            raise ValueError("sl and tp must each contain at least one value")
+        model = ExecutionModel() if execution is None else execution
+        prices = self._execution_prices(model)
+        events = self.rule_events(entry_rule, exit_rule, short_entry_rule, short_exit_rule)
+        events = model.prepare(events, prices)
+        step = max(chunksize, 1)
+        chunks = [combinations[start : start + step] for start in range(0, len(combinations), step)]
+
+        if executor == "serial":
+            results = _grid_chunk(combinations, events)
+        else:
+            chunked = map_shared(executor, max_workers, _grid_chunk, chunks, events)
+            results = [indices for chunk_result in chunked for indices in chunk_result]
+
+        fills = [
+            model.fill(events, indices, prices, sl=stop_loss, tp=take_profit)
+            for (stop_loss, take_profit), indices in zip(combinations, results)
+        ]
+        risk = self._grid_metrics(events.close, fills, periods_per_year, settle=execution is not None)
+        rows = []
+        trade_ledgers: Dict[Tuple[float, float], TradeLedger] = {}
+        for row, ((stop_loss, take_profit), filled) in enumerate(zip(combinations, fills)):
+            statistics = self._statistics(filled.return_pct)
+            del statistics["equity_curve"]
+            statistics.update({key: values[row].item() for key, values in risk.items()})
+            rows.append({"sl": stop_loss, "tp": take_profit, **statistics})
+            if ledgers:
+                trade_ledgers[(stop_loss, take_profit)] = _ledger(filled)
+        return GridResult(summary=pd.DataFrame(rows, columns=GRID_COLUMNS), ledgers=trade_ledgers)
+
+    def rule_events(
+        self, entry_rule, exit_rule, short_entry_rule=None, short_exit_rule=None
+    ) -> RuleEvents:
+        """Resolve the rules to masks and locate their events on the close prices.
+
+        The rules are evaluated as in :meth:`run_backtest`; the result feeds
+        :func:`~engine.backtest.simulate_events` and
+        :class:`~engine.backtest.CandidateExits` for any stop-loss and
+        take-profit settings.
+        """
+
+        length = len(self.df)
+        entries = self._condition_mask(entry_rule, length)
+        exits = self._condition_mask(exit_rule, length)
+        short_entries = short_exits = None
+        if short_entry_rule is not None:
+            short_entries = self._condition_mask(short_entry_rule, length)
+        if short_exit_rule is not None:
+            short_exits = self._condition_mask(short_exit_rule, length)
+        close = self.df["close"].to_numpy(dtype=np.float64)
+        return rule_events(close, entries, exits, short_entries, short_exits)
+
+    @staticmethod
+    def _bar_returns(
+        close: np.ndarray, fills: Sequence[Fills], *, settle: bool
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return the positions and mark-to-market bar returns of each fill set, one row each.
+
+        With ``settle`` the entry and exit bars are valued at the fill prices
+        net of costs instead of at the close.
+        """
+
+        entries = [filled.entry_index for filled in fills]
+        exits = [filled.exit_index for filled in fills]
+        sides = [filled.side for filled in fills]
+        positions = metrics.position_matrix(len(close), entries, exits, sides)
+        anchors = None
+        if any((side < 0).any() for side in sides):
+            bases = [filled.entry_basis for filled in fills]
+            anchors = metrics.anchor_matrix(len(close), entries, bases)
+        returns = metrics.mark_to_market(close, positions, anchors)
+        if settle and fills:
+            rows = np.repeat(np.arange(len(fills)), [len(filled.entry_index) for filled in fills])
+            metrics.settle_fills(
+                returns,
+                close,
+                rows,
+                np.concatenate(entries),
+                np.concatenate(exits),
+                np.concatenate([filled.entry_basis for filled in fills]),
+                np.concatenate([filled.exit_basis for filled in fills]),
+                np.concatenate(sides),
             )
+        return positions, returns
 
-        returns = np.array([trade.return_pct for trade in trades], dtype=float)
-        equity_curve = np.cumprod(1 + returns) if len(returns) else np.array([])
-        max_drawdown = self._calculate_max_drawdown(equity_curve)
+    @classmethod
+    def _grid_metrics(
+        cls, close: np.ndarray, fills: Sequence[Fills], periods_per_year: float, *, settle: bool
+    ) -> Dict[str, np.ndarray]:
+        """Return the bar-level risk metrics of every fill set, in blocks of bounded size."""
 
-        wins = (returns > 0).sum() if len(returns) else 0
-        win_rate = float(wins / len(returns)) if len(returns) else 0.0
+        block = max(1, _METRIC_BLOCK_CELLS // max(len(close), 1))
+        parts: List[Dict[str, np.ndarray]] = []
+        for start in range(0, len(fills), block):
+            positions, returns = cls._bar_returns(close, fills[start : start + block], settle=settle)
+            parts.append(metrics.risk_metrics(returns, positions, periods_per_year=periods_per_year))
+        return {key: np.concatenate([part[key] for part in parts]) for key in metrics.METRIC_COLUMNS}
 
+    def _execution_prices(self, model: ExecutionModel) -> Dict[str, np.ndarray]:
+        """Return the price columns ``model`` needs besides ``close``, as ``float64`` arrays."""
+
+        missing = [column for column in model.required_columns if column not in self.df.columns]
+        if missing:
+            raise ValueError(f"The execution model needs the columns {missing}")
+        return {column: self.df[column].to_numpy(dtype=np.float64) for column in model.required_columns}
+
+    @classmethod
+    def _statistics(cls, returns: np.ndarray) -> Dict[str, object]:
+        equity_curve = np.cumprod(1 + returns) if len(returns) else np.array([])
+        wins = (returns > 0).sum() if len(returns) else 0
         return {
-            "trades": len(trades),
-            "win_rate": win_rate,
+            "trades": len(returns),
+            "win_rate": float(wins / len(returns)) if len(returns) else 0.0,
             "average_return": float(returns.mean()) if len(returns) else 0.0,
             "cumulative_return": float(returns.sum()) if len(returns) else 0.0,
-            "max_drawdown": max_drawdown,
-            "equity_curve": equity_curve.tolist(),
-            "ledger": [trade.to_dict() for trade in trades],
+            "max_drawdown": cls._calculate_max_drawdown(equity_curve),
+            "equity_curve": equity_curve,
         }
 
+    def _condition_mask(self, rule, length: int) -> np.ndarray:
+        """Evaluate ``rule`` to one boolean per bar."""
+
+        if isinstance(rule, str):
+            source = self.df if self.features is None else self.features
+            try:
+                compiled = compile_rule(rule)
+            except ValueError:
+                compiled = None
+            if compiled is not None and all(column in source for column in compiled.columns):
+                return compiled.mask(source, length)
+            # Syntax outside the compiled subset (or unknown names) is left to pandas.
+            return np.asarray(source.eval(rule), dtype=bool)
+        if not callable(rule):
+            raise TypeError("Rules must be either callables or pandas eval strings")
+
+        spec: Optional[_BatchSpec] = getattr(rule, "__batch_rule__", None)
+        frame = self._rule_frame(None if spec is None else spec.columns)
+        if spec is None:
+            warnings.warn(
+                f"Rule {getattr(rule, '__name__', rule)!r} is called once per bar; decorate it "
+                "with @batch_rule to evaluate it over all bars at once",
+                RuntimeWarning,
+                stacklevel=4,
+            )
+            rows = (bool(rule(row)) for _, row in frame.iterrows())
+            return np.fromiter(rows, dtype=bool, count=length)
+        if spec.arrays:
+            frame = {column: frame[column].to_numpy() for column in frame.columns}
+        return np.asarray(rule(frame), dtype=bool)
+
+    def _rule_frame(self, columns: Optional[Tuple[str, ...]]) -> pd.DataFrame:
+        """Return the frame a callable rule reads, computing lazy indicator columns first."""
+
+        if self.features is not None:
+            self.features.materialize(columns)
+            self.df = self.features.frame.reset_index(drop=True)
+        return self.df if columns is None else self.df[list(columns)]
+
     @staticmethod
-    def _calculate_max_drawdown(equity_curve: np.ndarray) -> float:
-        if equity_curve.size == 0:
-            return 0.0
-        peaks = np.maximum.accumulate(equity_curve)
-        drawdowns = 1 - (equity_curve / peaks)
-        return float(drawdowns.max())
+    def _calculate_max_drawdown(equity_curve: np.ndarray) -> Any:
+        """Maximum drawdown of one curve, or of each row of a 2-D batch of curves."""
+
+        return metrics.max_drawdown(equity_curve)
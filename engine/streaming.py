@@ -0,0 +1,494 @@
+"""Bar-by-bar indicator state for live feature updates.
+
+Each streaming indicator keeps just enough state to produce the next value in
+O(1): recursive accumulators for the exponentially weighted indicators and
+ring buffers or monotonic deques for the windowed ones.  The rolling rank is
+the exception, at O(period) per bar (see :class:`RollingRankStream`).  States
+are primed from an already enriched history so the first streamed bar
+continues exactly where :meth:`~engine.feature_engine.FeatureEngine.add_indicators`
+stopped.
+"""
+
+from __future__ import annotations
+
+import bisect
+import math
+from collections import deque
+from typing import Deque, Dict, List, Mapping, Protocol, Sequence, Tuple
+
+import numpy as np
+
+from engine import kernels
+
+
+History = Mapping[str, np.ndarray]
+Bar = Mapping[str, float]
+
+
+class StreamingIndicator(Protocol):
+    """State object that advances an indicator one bar at a time."""
+
+    def prime(self, history: History) -> None:
+        """Load state from full history arrays (OHLCV plus computed columns)."""
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        """Consume one bar and return one value per indicator output."""
+
+
+def _ratio(numerator: float, denominator: float) -> float:
+    """Divide like NumPy does: ``inf`` or ``NaN`` instead of raising."""
+
+    if denominator == 0:
+        if numerator == 0 or math.isnan(numerator):
+            return math.nan
+        return math.copysign(math.inf, numerator)
+    return numerator / denominator
+
+
+class ExponentialMean:
+    """Adjusted exponentially weighted mean matching ``ewm(adjust=True)``."""
+
+    __slots__ = ("decay", "numerator", "denominator")
+
+    def __init__(self, alpha: float) -> None:
+        self.decay = 1.0 - alpha
+        self.numerator = 0.0
+        self.denominator = 0.0
+
+    def prime(self, values: np.ndarray) -> None:
+        valid = ~np.isnan(values)
+        ages = (len(values) - 1) - np.flatnonzero(valid)
+        weights = self.decay ** ages.astype(float)
+        self.numerator = float(weights @ values[valid])
+        self.denominator = float(weights.sum())
+
+    def update(self, value: float) -> float:
+        # Missing observations still age the existing weights (``ignore_na=False``).
+        self.numerator *= self.decay
+        self.denominator *= self.decay
+        if not math.isnan(value):
+            self.numerator += value
+            self.denominator += 1.0
+        return self.value
+
+    @property
+    def value(self) -> float:
+        return self.numerator / self.denominator if self.denominator > 0 else math.nan
+
+
+class RollingWindow:
+    """Ring buffer exposing the trailing mean and sample standard deviation."""
+
+    __slots__ = ("period", "values", "total", "squares", "missing", "updates")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.values: Deque[float] = deque(maxlen=period)
+        self.total = 0.0
+        self.squares = 0.0
+        self.missing = 0
+        self.updates = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.period:
+            self._remove(self.values[0])
+        self.values.append(value)
+        if math.isnan(value):
+            self.missing += 1
+        else:
+            self.total += value
+            self.squares += value * value
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self._refresh()
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            self.missing -= 1
+        else:
+            self.total -= value
+            self.squares -= value * value
+
+    def _refresh(self) -> None:
+        # Rebuild the sums once per window to stop add/remove drift accumulating.
+        finite = [value for value in self.values if not math.isnan(value)]
+        self.total = math.fsum(finite)
+        self.squares = math.fsum(value * value for value in finite)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.period and self.missing == 0
+
+    @property
+    def mean(self) -> float:
+        return self.total / self.period if self.ready else math.nan
+
+    @property
+    def std(self) -> float:
+        if not self.ready or self.period < 2:
+            return math.nan
+        variance = (self.squares - self.total * self.total / self.period) / (self.period - 1)
+        return math.sqrt(max(variance, 0.0))
+
+
+class RollingMoments:
+    """Windowed Welford accumulator for the trailing mean and sample standard deviation.
+
+    Values entering and leaving the window update the running mean and sum of
+    squared deviations in O(1); the moments are rebuilt once per window so
+    rounding errors from the removals cannot accumulate.
+    """
+
+    __slots__ = ("period", "values", "count", "center", "m2", "missing", "updates")
+
+    def __init__(self, period: int) -> None:
+        self.period = period
+        self.values: Deque[float] = deque(maxlen=period)
+        self.count = 0
+        self.center = 0.0
+        self.m2 = 0.0
+        self.missing = 0
+        self.updates = 0
+
+    def push(self, value: float) -> None:
+        if len(self.values) == self.period:
+            self._remove(self.values[0])
+        self.values.append(value)
+        if math.isnan(value):
+            self.missing += 1
+        else:
+            self.count += 1
+            delta = value - self.center
+            self.center += delta / self.count
+            self.m2 += delta * (value - self.center)
+        self.updates += 1
+        if self.updates % self.period == 0:
+            self._refresh()
+
+    def _remove(self, value: float) -> None:
+        if math.isnan(value):
+            self.missing -= 1
+            return
+        self.count -= 1
+        if self.count == 0:
+            self.center = self.m2 = 0.0
+            return
+        delta = value - self.center
+        self.center -= delta / self.count
+        self.m2 -= delta * (value - self.center)
+
+    def _refresh(self) -> None:
+        finite = [value for value in self.values if not math.isnan(value)]
+        self.count = len(finite)
+        self.center = math.fsum(finite) / self.count if finite else 0.0
+        self.m2 = math.fsum((value - self.center) ** 2 for value in finite)
+
+    @property
+    def ready(self) -> bool:
+        return len(self.values) == self.period and self.missing == 0
+
+    @property
+    def std(self) -> float:
+        if not self.ready or self.period < 2:
+            return math.nan
+        return math.sqrt(max(self.m2 / (self.period - 1), 0.0))
+
+
+class RollingExtreme:
+    """Monotonic deque tracking the trailing maximum (or minimum) in O(1) amortised."""
+
+    __slots__ = ("period", "sign", "window", "index", "last_missing")
+
+    def __init__(self, period: int, *, maximum: bool = True) -> None:
+        self.period = period
+        self.sign = 1.0 if maximum else -1.0
+        self.window: Deque[Tuple[int, float]] = deque()
+        self.index = -1
+        self.last_missing = -period
+
+    def push(self, value: float) -> float:
+        self.index += 1
+        if math.isnan(value):
+            self.last_missing = self.index
+        else:
+            keyed = self.sign * value
+            while self.window and self.window[-1][1] <= keyed:
+                self.window.pop()
+            self.window.append((self.index, keyed))
+        while self.window and self.window[0][0] <= self.index - self.period:
+            self.window.popleft()
+        return self.value
+
+    @property
+    def value(self) -> float:
+        if self.index + 1 < self.period or self.last_missing > self.index - self.period:
+            return math.nan
+        return self.sign * self.window[0][1]
+
+
+class EMAStream:
+    """Streaming :func:`engine.kernels.ema`."""
+
+    def __init__(self, period: int, column: str = "close") -> None:
+        self.column = column
+        self.mean = ExponentialMean(2.0 / (period + 1.0))
+
+    def prime(self, history: History) -> None:
+        self.mean.prime(history[self.column])
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        return (self.mean.update(bar[self.column]),)
+
+
+class SMAStream:
+    """Streaming :func:`engine.kernels.sma` over any column."""
+
+    def __init__(self, period: int, column: str = "close") -> None:
+        self.column = column
+        self.window = RollingWindow(period)
+
+    def prime(self, history: History) -> None:
+        for value in history[self.column][-self.window.period :]:
+            self.window.push(float(value))
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        self.window.push(bar[self.column])
+        return (self.window.mean,)
+
+
+class RSIStream:
+    """Streaming :func:`engine.kernels.rsi`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.gain = ExponentialMean(1.0 / period)
+        self.loss = ExponentialMean(1.0 / period)
+        self.previous = math.nan
+
+    def prime(self, history: History) -> None:
+        close = history["close"]
+        delta = close - kernels.shift(close)
+        self.gain.prime(np.clip(delta, 0.0, None))
+        self.loss.prime(np.clip(-delta, 0.0, None))
+        self.previous = float(close[-1]) if len(close) else math.nan
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        close = bar["close"]
+        delta = close - self.previous
+        self.previous = close
+        gain = self.gain.update(max(delta, 0.0) if not math.isnan(delta) else math.nan)
+        loss = self.loss.update(max(-delta, 0.0) if not math.isnan(delta) else math.nan)
+        return (100.0 - _ratio(100.0, 1.0 + _ratio(gain, loss)),)
+
+
+class MACDStream:
+    """Streaming :func:`engine.kernels.macd` emitting the line and its signal."""
+
+    def __init__(self, period_fast: int = 12, period_slow: int = 26, signal: int = 9) -> None:
+        self.periods = (period_fast, period_slow)
+        self.fast = ExponentialMean(2.0 / (period_fast + 1.0))
+        self.slow = ExponentialMean(2.0 / (period_slow + 1.0))
+        self.signal = ExponentialMean(2.0 / (signal + 1.0))
+
+    def prime(self, history: History) -> None:
+        close = history["close"]
+        self.fast.prime(close)
+        self.slow.prime(close)
+        self.signal.prime(kernels.ema(close, self.periods[0]) - kernels.ema(close, self.periods[1]))
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        close = bar["close"]
+        line = self.fast.update(close) - self.slow.update(close)
+        return line, self.signal.update(line)
+
+
+class OBVStream:
+    """Streaming :func:`engine.kernels.obv`."""
+
+    def __init__(self) -> None:
+        self.total = 0.0
+        self.previous = math.nan
+
+    def prime(self, history: History) -> None:
+        close = history["close"]
+        previous = kernels.shift(close)
+        volume = history["volume"]
+        flow = np.where(close > previous, volume, np.where(close < previous, -volume, 0.0))
+        self.total = float(np.nansum(flow))
+        self.previous = float(close[-1]) if len(close) else math.nan
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        close = bar["close"]
+        previous, self.previous = self.previous, close
+        if math.isnan(bar["volume"]):
+            # The batch kernel skips missing volume in its running total.
+            return (math.nan,)
+        if close > previous:
+            self.total += bar["volume"]
+        elif close < previous:
+            self.total -= bar["volume"]
+        else:
+            return (math.nan,)
+        return (self.total,)
+
+
+class BollingerStream:
+    """Streaming :func:`engine.kernels.bollinger` emitting the upper and lower band."""
+
+    def __init__(self, period: int = 20, std_multiplier: float = 2.0) -> None:
+        self.window = RollingWindow(period)
+        self.std_multiplier = std_multiplier
+
+    def prime(self, history: History) -> None:
+        for value in history["close"][-self.window.period :]:
+            self.window.push(float(value))
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        self.window.push(bar["close"])
+        middle = self.window.mean
+        width = self.std_multiplier * self.window.std
+        return middle + width, middle - width
+
+
+class ATRStream:
+    """Streaming :func:`engine.kernels.atr`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.window = RollingWindow(period)
+        self.previous = math.nan
+
+    def prime(self, history: History) -> None:
+        tail = slice(-(self.window.period + 1), None)
+        for high, low, close in zip(history["high"][tail], history["low"][tail], history["close"][tail]):
+            self.update({"high": float(high), "low": float(low), "close": float(close)})
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        high, low, close = bar["high"], bar["low"], bar["close"]
+        ranges = [abs(high - low), abs(high - self.previous), abs(self.previous - low)]
+        finite = [value for value in ranges if not math.isnan(value)]
+        self.previous = close
+        self.window.push(max(finite) if finite else math.nan)
+        return (self.window.mean,)
+
+
+class StochasticKStream:
+    """Streaming :func:`engine.kernels.stochastic_k`."""
+
+    def __init__(self, period: int = 14) -> None:
+        self.highest = RollingExtreme(period, maximum=True)
+        self.lowest = RollingExtreme(period, maximum=False)
+
+    def prime(self, history: History) -> None:
+        period = self.highest.period
+        for high, low in zip(history["high"][-period:], history["low"][-period:]):
+            self.highest.push(float(high))
+            self.lowest.push(float(low))
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        highest = self.highest.push(bar["high"])
+        lowest = self.lowest.push(bar["low"])
+        return (_ratio(bar["close"] - lowest, highest - lowest) * 100.0,)
+
+
+class ZScoreStream:
+    """Streaming :func:`engine.kernels.rolling_zscore` of one column."""
+
+    def __init__(self, period: int, column: str) -> None:
+        self.column = column
+        self.moments = RollingMoments(period)
+
+    def prime(self, history: History) -> None:
+        for value in history[self.column][-self.moments.period :]:
+            self.moments.push(float(value))
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        value = bar[self.column]
+        self.moments.push(value)
+        if not self.moments.ready:
+            return (math.nan,)
+        return (_ratio(value - self.moments.center, self.moments.std),)
+
+
+class RollingRankStream:
+    """Streaming :func:`engine.kernels.rolling_rank` of one column.
+
+    The window is mirrored in a sorted Python list: each bar costs O(log
+    period) comparisons to locate values, but inserting and deleting shift up
+    to ``period`` list slots, so an update is O(period) overall.  The shift
+    is a single ``memmove``, which for practical windows is faster than a
+    pure-Python order-statistics tree.
+    """
+
+    def __init__(self, period: int, column: str) -> None:
+        self.period = period
+        self.column = column
+        self.window: Deque[float] = deque()
+        self.ordered: List[float] = []
+        self.missing = 0
+
+    def prime(self, history: History) -> None:
+        for value in history[self.column][-self.period :]:
+            self.update({self.column: float(value)})
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        value = bar[self.column]
+        if len(self.window) == self.period:
+            oldest = self.window.popleft()
+            if math.isnan(oldest):
+                self.missing -= 1
+            else:
+                del self.ordered[bisect.bisect_left(self.ordered, oldest)]
+        self.window.append(value)
+        if math.isnan(value):
+            self.missing += 1
+        else:
+            bisect.insort(self.ordered, value)
+        if len(self.window) < self.period or self.missing:
+            return (math.nan,)
+        below = bisect.bisect_left(self.ordered, value)
+        equal = bisect.bisect_right(self.ordered, value) - below
+        return ((below + (equal + 1) / 2.0) / self.period,)
+
+
+class MinMaxStream:
+    """Streaming :func:`engine.kernels.expanding_minmax` of one column."""
+
+    def __init__(self, column: str) -> None:
+        self.column = column
+        self.lowest = math.nan
+        self.highest = math.nan
+
+    def prime(self, history: History) -> None:
+        values = history[self.column]
+        if len(values) and not np.isnan(values).all():
+            self.lowest = float(np.nanmin(values))
+            self.highest = float(np.nanmax(values))
+
+    def update(self, bar: Bar) -> Tuple[float, ...]:
+        value = bar[self.column]
+        if not math.isnan(value):
+            self.lowest = value if math.isnan(self.lowest) else min(self.lowest, value)
+            self.highest = value if math.isnan(self.highest) else max(self.highest, value)
+        return (_ratio(value - self.lowest, self.highest - self.lowest),)
+
+
+class IndicatorStream:
+    """Drive a set of streaming indicators in dependency order.
+
+    ``states`` is a sequence of ``(outputs, state)`` pairs already sorted so
+    that every dependency is produced before it is read; outputs from earlier
+    states are visible to later ones through the bar mapping.
+    """
+
+    def __init__(self, states: Sequence[Tuple[Sequence[str], StreamingIndicator]]) -> None:
+        self.states = list(states)
+        self.columns: List[str] = [column for outputs, _state in self.states for column in outputs]
+
+    def prime(self, history: History) -> None:
+        for _outputs, state in self.states:
+            state.prime(history)
+
+    def update(self, bar: Bar) -> Dict[str, float]:
+        row = dict(bar)
+        for outputs, state in self.states:
+            row.update(zip(outputs, state.update(row)))
+        return row
@@ -0,0 +1,284 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.backtest import EXIT_REASONS, TradeLedger, simulate_events, simulate_trades
+from engine.feature_engine import FeatureEngine
+from engine.strategy_runner import GRID_COLUMNS, StrategyRunner, batch_rule
+from engine.testing import assert_same_backtest, random_frame
+
+
+def _loop_reference(close, entries, exits, sl, tp, short_entries=None, short_exits=None):
+    """The bar-by-bar loop ``StrategyRunner.run_backtest`` used before vectorisation.
+
+    With ``short_entries`` and ``short_exits`` it also opens short positions
+    while flat, long entries taking precedence.
+    """
+
+    short_entries = np.zeros(len(close), dtype=bool) if short_entries is None else short_entries
+    trades = []
+    position_open = False
+    entry_price = 0.0
+    entry_index = 0
+    side = 1
+    for idx in range(len(close)):
+        price = float(close[idx])
+        if not position_open:
+            if bool(entries[idx]) or bool(short_entries[idx]):
+                position_open, entry_price, entry_index = True, price, idx
+                side = 1 if bool(entries[idx]) else -1
+            continue
+        change = side * (price - entry_price) / entry_price
+        reason = None
+        if change <= -sl:
+            reason = "stop_loss"
+        elif change >= tp:
+            reason = "take_profit"
+        elif bool(exits[idx] if side == 1 else short_exits[idx]):
+            reason = "rule_exit"
+        if reason:
+            trades.append((entry_index, idx, reason))
+            position_open = False
+    if position_open:
+        trades.append((entry_index, len(close) - 1, "end_of_data"))
+    return trades
+
+
+def _as_tuples(indices):
+    return list(zip(indices.entry_index.tolist(), indices.exit_index.tolist(), indices.reasons))
+
+
+@pytest.mark.parametrize("density", [0.002, 0.05, 0.6])
+@pytest.mark.parametrize("sl, tp", [(0.01, 0.02), (0.05, 0.1), (1.0, 10.0)])
+def test_simulation_matches_bar_loop(density, sl, tp):
+    rng = np.random.default_rng(int(density * 1000))
+    close = 100 + np.cumsum(rng.normal(0, 0.3, 5_000))
+    close[rng.choice(5_000, 50, replace=False)] = np.nan
+    entries = rng.random(5_000) < density
+    exits = rng.random(5_000) < density
+
+    result = simulate_trades(close, entries, exits, sl=sl, tp=tp)
+
+    assert _as_tuples(result) == _loop_reference(close, entries, exits, sl, tp)
+    assert set(result.reasons) <= set(EXIT_REASONS)
+
+
+@pytest.mark.parametrize("density", [0.01, 0.2])
+@pytest.mark.parametrize("sl, tp", [(0.01, 0.02), (0.05, 0.1)])
+def test_long_short_simulation_matches_bar_loop(density, sl, tp):
+    rng = np.random.default_rng(int(density * 100))
+    close = 100 + np.cumsum(rng.normal(0, 0.3, 5_000))
+    close[rng.choice(5_000, 50, replace=False)] = np.nan
+    entries, exits, short_entries, short_exits = rng.random((4, 5_000)) < density
+
+    result = simulate_trades(
+        close, entries, exits, sl=sl, tp=tp, short_entries=short_entries, short_exits=short_exits
+    )
+
+    expected = _loop_reference(close, entries, exits, sl, tp, short_entries, short_exits)
+    assert _as_tuples(result) == expected
+    sides = [1 if entries[entry] else -1 for entry, _, _ in expected]
+    assert result.sides.tolist() == sides and -1 in sides
+    with pytest.raises(ValueError):
+        simulate_trades(close, entries, exits, sl=sl, tp=tp, short_entries=short_entries)
+
+
+def test_exact_threshold_hits_and_last_bar_entry():
+    close = np.array([100.0, 95.0, 100.0, 110.0, 100.0, 100.0])
+    entries = np.array([True, False, True, False, False, True])
+    exits = np.array([False, True, False, True, False, False])
+
+    result = simulate_trades(close, entries, exits, sl=0.05, tp=0.1)
+
+    assert _as_tuples(result) == _loop_reference(close, entries, exits, 0.05, 0.1)
+    assert result.reasons == ["stop_loss", "take_profit", "end_of_data"]
+    exits[-1] = True
+    assert simulate_trades(close, entries, exits, sl=0.05, tp=0.1).reasons[-1] == "end_of_data"
+    entries[-2] = True
+    assert simulate_trades(close, entries, exits, sl=0.05, tp=0.1).reasons[-1] == "rule_exit"
+    with pytest.raises(ValueError):
+        simulate_trades(close, entries[:-1], exits, sl=0.05, tp=0.1)
+
+
+def test_run_backtest_ledger_matches_bar_loop():
+    df = random_frame(3_000)
+    df["signal"] = np.sin(np.arange(len(df)) / 15.0)
+    runner = StrategyRunner(df)
+
+    result = runner.run_backtest(entry_rule="signal < -0.9", exit_rule="signal > 0.9", sl=0.01, tp=0.02)
+
+    close = df["close"].to_numpy()
+    signal = df["signal"].to_numpy()
+    expected = _loop_reference(close, signal < -0.9, signal > 0.9, 0.01, 0.02)
+    ledger = result["ledger"]
+    assert [(t["entry_index"], t["exit_index"], t["reason"]) for t in ledger] == expected
+    for trade in ledger:
+        entry, exit_ = close[trade["entry_index"]], close[trade["exit_index"]]
+        assert trade["return_pct"] == (float(exit_) - float(entry)) / float(entry)
+    assert result["trades"] == len(expected)
+
+    events = runner.rule_events("signal < -0.9", "signal > 0.9")
+    indices = simulate_events(events, sl=0.01, tp=0.02)
+    assert indices.entry_index.tolist() == [entry for entry, _exit, _reason in expected]
+
+
+def test_run_backtest_trades_both_sides_in_one_pass():
+    df = random_frame(3_000)
+    df["RSI"] = 50 + 40 * np.sin(np.arange(len(df)) / 11.0)
+    rules = {"entry_rule": "RSI < 30", "exit_rule": "RSI > 50", "sl": 0.02, "tp": 0.03}
+    runner = StrategyRunner(df)
+
+    result = runner.run_backtest(**rules, short_entry_rule="RSI > 70", short_exit_rule="RSI < 50")
+
+    close, rsi = df["close"].to_numpy(), df["RSI"].to_numpy()
+    expected = _loop_reference(close, rsi < 30, rsi > 50, 0.02, 0.03, rsi > 70, rsi < 50)
+    ledger = result["ledger"]
+    trades = zip(ledger["entry_index"].tolist(), ledger["exit_index"].tolist(), ledger.reasons)
+    assert list(trades) == expected
+    side = ledger["side"]
+    assert set(side.tolist()) == {1, -1}
+    entry, exit_ = close[ledger["entry_index"]], close[ledger["exit_index"]]
+    np.testing.assert_array_equal(ledger["return_pct"], side * (exit_ - entry) / entry)
+    # Signed bar equity compounds exactly the trade returns, shorts included.
+    assert result["bar_equity"][-1] == pytest.approx(np.prod(1 + ledger["return_pct"]), rel=1e-9)
+    positions = np.zeros(len(df))
+    for trade in ledger:
+        positions[trade["entry_index"] : trade["exit_index"]] = trade["side"]
+    assert result["exposure"] == pytest.approx(np.abs(positions).mean())
+    # Short rules that never fire leave the long-only backtest untouched.
+    never = runner.run_backtest(**rules, short_entry_rule="RSI > 100", short_exit_rule="RSI < 0")
+    assert_same_backtest(never, runner.run_backtest(**rules))
+
+
+def test_trade_ledger_is_columnar_with_dict_like_rows(tmp_path):
+    df = random_frame(2_000)
+    rules = {"entry_rule": "close < open", "exit_rule": "close > open", "sl": 0.01, "tp": 0.02}
+    result = StrategyRunner(df).run_backtest(**rules)
+    ledger = result["ledger"]
+
+    assert isinstance(ledger, TradeLedger) and isinstance(result["equity_curve"], np.ndarray)
+    assert ledger["entry_index"].dtype == np.int64 and len(ledger) == result["trades"] > 10
+    trade = ledger[3]
+    assert trade.entry_index == trade["entry_index"] == ledger["entry_index"][3]
+    assert trade["reason"] == ledger.reasons[3] and trade["reason"] in EXIT_REASONS
+    assert ledger == ledger.to_dicts() == [dict(trade) for trade in ledger]
+    assert ledger[1:3] == ledger.to_dicts()[1:3] and ledger != ledger[1:]
+    frame = ledger.to_frame()
+    assert list(frame.columns) == list(ledger.columns)
+    assert frame["reason"].astype(str).tolist() == ledger.reasons
+
+    pytest.importorskip("pyarrow")
+    ledger.to_parquet(tmp_path / "ledger.parquet")
+    pd.testing.assert_frame_equal(pd.read_parquet(tmp_path / "ledger.parquet"), frame)
+
+
+def test_run_backtest_callable_rules_match_string_rules():
+    df = random_frame(1_000)
+    df["signal"] = np.cos(np.arange(len(df)) / 7.0)
+    runner = StrategyRunner(df)
+    risk = {"sl": 0.02, "tp": 0.03}
+
+    strings = runner.run_backtest(entry_rule="signal < -0.5", exit_rule="signal > 0.5", **risk)
+    with pytest.warns(RuntimeWarning, match="batch_rule"):
+        rows = runner.run_backtest(
+            entry_rule=lambda row: row["signal"] < -0.5,
+            exit_rule=lambda row: row["signal"] > 0.5,
+            **risk,
+        )
+    frames = runner.run_backtest(
+        entry_rule=batch_rule(lambda frame: frame["signal"] < -0.5),
+        exit_rule=batch_rule(lambda frame: frame["signal"] > 0.5),
+        **risk,
+    )
+    arrays = runner.run_backtest(
+        entry_rule=batch_rule(lambda data: data["signal"] < -0.5, columns=["signal"], arrays=True),
+        exit_rule=batch_rule(columns=["signal"], arrays=True)(lambda data: data["signal"] > 0.5),
+        **risk,
+    )
+
+    for result in (rows, frames, arrays):
+        assert_same_backtest(result, strings)
+
+    # The per-row warning points at the caller for long and short rules alike.
+    with pytest.warns(RuntimeWarning, match="batch_rule") as caught:
+        runner.run_backtest(
+            entry_rule="signal < -0.5",
+            exit_rule="signal > 0.5",
+            short_entry_rule=lambda row: row["signal"] > 0.5,
+            short_exit_rule=lambda row: row["signal"] < -0.5,
+            **risk,
+        )
+    assert [warning.filename for warning in caught] == [__file__, __file__]
+
+
+def test_batch_rule_marks_the_rule_itself():
+    def oversold(frame):
+        return frame["RSI"] < 30
+
+    assert batch_rule(oversold) is oversold
+    assert batch_rule(columns=["RSI"], arrays=True)(oversold) is oversold
+    assert oversold.__batch_rule__.columns == ("RSI",) and oversold.__batch_rule__.arrays
+
+
+def test_batch_rules_compute_only_declared_lazy_columns():
+    df = random_frame(400)
+    lazy = FeatureEngine(df, backend="numpy").lazy()
+
+    @batch_rule(columns=["RSI"], arrays=True)
+    def oversold(data):
+        return data["RSI"] < 40
+
+    rules = {"exit_rule": "RSI > 60", "sl": 0.02, "tp": 0.04}
+    result = StrategyRunner(lazy).run_backtest(entry_rule=oversold, **rules)
+
+    assert lazy.computed == ["RSI"]
+    eager = FeatureEngine(df, backend="numpy", dropna=False).add_indicators()
+    assert_same_backtest(result, StrategyRunner(eager).run_backtest(entry_rule="RSI < 40", **rules))
+    with pytest.raises(ValueError):
+        StrategyRunner(df).run_backtest(
+            entry_rule=batch_rule(lambda frame: frame["close"].iloc[1:] > 0),
+            exit_rule="close > 0",
+            sl=0.1,
+            tp=0.1,
+        )
+
+
+def test_run_backtest_handles_a_non_default_index():
+    df = random_frame(500)
+    df.index = pd.date_range("2024-01-01", periods=len(df), freq="h")
+    rules = {"entry_rule": "close < open", "exit_rule": "close > open", "sl": 0.01, "tp": 0.01}
+
+    shifted = StrategyRunner(df).run_backtest(**rules)
+
+    assert_same_backtest(shifted, StrategyRunner(df.reset_index(drop=True)).run_backtest(**rules))
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_run_grid_matches_individual_backtests(executor):
+    df = random_frame(2_000)
+    df["signal"] = np.sin(np.arange(len(df)) / 11.0)
+    runner = StrategyRunner(df)
+    rules = {"entry_rule": "signal < -0.8", "exit_rule": "signal > 0.8"}
+
+    grid = runner.run_grid(
+        **rules, sl=[0.005, 0.02], tp=[0.01, 0.05, 0.2], ledgers=True, executor=executor, chunksize=2
+    )
+
+    assert list(zip(grid.summary["sl"], grid.summary["tp"])) == list(grid.ledgers)
+    assert len(grid.summary) == 6
+    for row in grid.summary.to_dict("records"):
+        expected = runner.run_backtest(**rules, sl=row["sl"], tp=row["tp"])
+        for key in GRID_COLUMNS[2:]:
+            assert row[key] == expected[key]
+        assert grid.ledgers[(row["sl"], row["tp"])] == expected["ledger"]
+
+
+def test_run_grid_validates_arguments():
+    runner = StrategyRunner(random_frame(100))
+    rules = {"entry_rule": "close > open", "exit_rule": "close < open"}
+
+    assert runner.run_grid(**rules, sl=[0.01], tp=[0.02], executor="serial").ledgers == {}
+    with pytest.raises(ValueError):
+        runner.run_grid(**rules, sl=[], tp=[0.02])
+    with pytest.raises(ValueError):
+        runner.run_grid(**rules, sl=[0.01], tp=[0.02], executor="cluster")
@@ -0,0 +1,147 @@
+import numpy as np
+import pandas as pd
+
+from engine import feature_engine
+from engine.cache import FeatureCache, fingerprint_callable
+from engine.feature_engine import FeatureEngine, _ema
+from engine.testing import random_frame
+
+
+def _fail_compute(*_args, **_kwargs):
+    raise AssertionError("indicators should be served from the cache")
+
+
+def test_cache_hit_returns_identical_frame_without_recomputing(tmp_path, monkeypatch):
+    df = random_frame(300)
+    cache = FeatureCache(tmp_path)
+    first = FeatureEngine(df, cache=cache).add_indicators()
+
+    monkeypatch.setattr(FeatureEngine, "_compute", _fail_compute)
+    second = FeatureEngine(df, cache=cache).add_indicators()
+
+    pd.testing.assert_frame_equal(first, second)
+
+
+def test_cache_key_tracks_data_and_parameters(tmp_path):
+    df = random_frame(300)
+    cache = FeatureCache(tmp_path)
+    FeatureEngine(df, cache=cache).add_indicators()
+    FeatureEngine(df, cache=cache, backend="numpy").add_indicators()
+    changed = df.copy()
+    changed.loc[5, "close"] += 1
+    FeatureEngine(changed, cache=cache).add_indicators()
+
+    assert len(list(tmp_path.glob("*.npy"))) == 3
+    assert fingerprint_callable(_ema(10).compute) != fingerprint_callable(_ema(20).compute)
+
+
+def test_cache_key_tracks_column_labels_and_existing_features(tmp_path):
+    df = random_frame(300)
+    cache = FeatureCache(tmp_path)
+    FeatureEngine(df, cache=cache).add_indicators()
+
+    # The same arrays under other names are a different input.
+    relabelled = df.set_axis(["close", "high", "low", "open", "volume"], axis=1)
+    cached = FeatureEngine(relabelled, cache=cache).add_indicators()
+    pd.testing.assert_frame_equal(cached, FeatureEngine(relabelled).add_indicators())
+
+    # A frame that already holds a feature column keeps it without ``overwrite``.
+    extra = np.linspace(0.0, 1.0, len(df))
+    FeatureEngine(df.assign(note=extra), cache=cache).add_indicators()
+    with_rsi = df.assign(RSI=extra)
+    cached = FeatureEngine(with_rsi, cache=cache).add_indicators()
+    pd.testing.assert_frame_equal(cached, FeatureEngine(with_rsi).add_indicators())
+
+
+class _Roll:
+    def __init__(self, window):
+        self.window = window
+
+    def compute(self, df, _raw):
+        return df["CLOSE"].rolling(self.window).mean()
+
+    __call__ = compute
+
+
+class _Opaque:
+    __slots__ = ()
+
+    def __call__(self, df, _raw):
+        return df["CLOSE"] * 2
+
+
+_SCALE = 1.0
+
+
+def _scaled(df, _raw):
+    return df["CLOSE"] * _SCALE
+
+
+def test_cache_key_tracks_instance_state_and_globals(tmp_path, monkeypatch):
+    df = random_frame(300)
+    cache = FeatureCache(tmp_path)
+    for roll in (_Roll(3), _Roll(50)):
+        for indicator in (roll.compute, roll):
+            cached = FeatureEngine(df, {"ROLL": indicator}, dropna=False, cache=cache).add_indicators()
+            plain = FeatureEngine(df, {"ROLL": indicator}, dropna=False).add_indicators()
+            pd.testing.assert_frame_equal(cached, plain)
+    assert fingerprint_callable(_Roll(3).compute) != fingerprint_callable(_Roll(50).compute)
+    assert fingerprint_callable(_Roll(3)) == fingerprint_callable(_Roll(3))
+
+    before = fingerprint_callable(_scaled)
+    monkeypatch.setitem(_scaled.__globals__, "_SCALE", 2.0)
+    assert fingerprint_callable(_scaled) != before
+
+
+def test_callables_without_a_stable_fingerprint_bypass_the_cache(tmp_path):
+    df = random_frame(300)
+    assert fingerprint_callable(_Opaque()) is None
+
+    FeatureEngine(df, {"DOUBLE": _Opaque()}, cache=FeatureCache(tmp_path)).add_indicators()
+
+    assert not list(tmp_path.glob("*.npy"))
+
+
+def test_appended_rows_reuse_cached_prefix(tmp_path, monkeypatch):
+    df = random_frame(400)
+    expected = FeatureEngine(df, backend="numpy", dropna=False).add_indicators()
+    cache = FeatureCache(tmp_path)
+    FeatureEngine(df.iloc[:350], cache=cache, backend="numpy").add_indicators()
+
+    monkeypatch.setattr(FeatureEngine, "_compute", _fail_compute)
+    extended = FeatureEngine(df, cache=cache, backend="numpy", dropna=False).add_indicators()
+
+    np.testing.assert_allclose(
+        extended.to_numpy(), expected.to_numpy(), rtol=1e-9, atol=1e-6, equal_nan=True
+    )
+
+
+def test_long_tails_are_recomputed(tmp_path, monkeypatch):
+    monkeypatch.setattr(feature_engine, "STREAM_TAIL_LIMIT", 10)
+    df = random_frame(300)
+    cache = FeatureCache(tmp_path)
+    FeatureEngine(df.iloc[:200], cache=cache).add_indicators()
+
+    calls = []
+    original = FeatureEngine._compute
+
+    def counting_compute(self, *args, **kwargs):
+        calls.append(1)
+        return original(self, *args, **kwargs)
+
+    monkeypatch.setattr(FeatureEngine, "_compute", counting_compute)
+    result = FeatureEngine(df, cache=cache).add_indicators()
+
+    assert calls == [1]
+    pd.testing.assert_frame_equal(result, FeatureEngine(df).add_indicators())
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    cache = FeatureCache(tmp_path, max_bytes=20_000)
+    frames = [random_frame(300, seed=seed) for seed in range(3)]
+    for frame in frames:
+        FeatureEngine(frame, cache=cache, backend="numpy").add_indicators()
+
+    sizes = sum(path.stat().st_size for path in tmp_path.iterdir())
+    assert sizes <= 20_000
+    assert len(list(tmp_path.glob("*.npy"))) < 3
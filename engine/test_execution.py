@@ -0,0 +1,187 @@
+import numpy as np
+import pytest
+
+from engine.execution import ExecutionModel, bps_slippage
+from engine.strategy_runner import StrategyRunner
+from engine.testing import assert_same_backtest, random_frame
+
+
+def _execution_loop(
+    df, entries, exits, sl, tp, *, intrabar, next_open, commission, slippage, shorts=None
+):
+    """Bar-by-bar reference for ``ExecutionModel``: ``(entry, exit, reason, return)`` per trade.
+
+    ``shorts`` is an optional ``(short_entries, short_exits)`` pair.
+    """
+
+    open_, high, low, close = (df[column].to_numpy() for column in ("open", "high", "low", "close"))
+    low, high = (low, high) if intrabar else (close, close)
+    short_entries, short_exits = shorts if shorts is not None else (np.zeros(len(close), bool), None)
+    trades = []
+    position_open = False
+    for idx in range(len(close)):
+        if not position_open:
+            signal = entries[idx] or short_entries[idx]
+            if signal and not (next_open and idx == len(close) - 1):
+                position_open = True
+                side = 1 if entries[idx] else -1
+                entry_bar = idx + 1 if next_open else idx
+                quote = open_[idx + 1] if next_open else close[idx]
+            continue
+        adverse, favourable = (low[idx], high[idx]) if side == 1 else (high[idx], low[idx])
+        pick_stop, pick_target = (min, max) if side == 1 else (max, min)
+        reason, fill = None, close[idx]
+        if side * (adverse - quote) / quote <= -sl:
+            reason = "stop_loss"
+            fill = pick_stop(open_[idx], quote * (1 - side * sl)) if intrabar else close[idx]
+        elif side * (favourable - quote) / quote >= tp:
+            reason = "take_profit"
+            fill = pick_target(open_[idx], quote * (1 + side * tp)) if intrabar else close[idx]
+        elif (exits if side == 1 else short_exits)[idx]:
+            reason = "rule_exit"
+        if reason:
+            trades.append((entry_bar, idx, reason, side, quote, fill))
+            position_open = False
+    if position_open:
+        trades.append((entry_bar, len(close) - 1, "end_of_data", side, quote, close[-1]))
+
+    result = []
+    for entry_bar, exit_bar, reason, side, quote, fill in trades:
+        cost = quote * (1 + side * slippage) * (1 + side * commission)
+        value = fill * (1 - side * slippage) * (1 - side * commission)
+        result.append((entry_bar, exit_bar, reason, side * (value - cost) / cost))
+    return result
+
+
+@pytest.mark.parametrize("intrabar", [False, True])
+@pytest.mark.parametrize("next_open", [False, True])
+@pytest.mark.parametrize("sl, tp", [(0.005, 0.01), (0.03, 0.05)])
+def test_execution_model_matches_bar_loop(intrabar, next_open, sl, tp):
+    df = random_frame(3_000, seed=11)
+    rng = np.random.default_rng(4)
+    df["go"], df["stop"] = rng.random(len(df)) < 0.05, rng.random(len(df)) < 0.05
+    df.loc[len(df) - 1, "go"] = True
+    timing = "next_open" if next_open else "close"
+    model = ExecutionModel(commission_bps=5, slippage=bps_slippage(2), intrabar=intrabar, entry=timing)
+
+    result = StrategyRunner(df).run_backtest(
+        entry_rule="go", exit_rule="stop", sl=sl, tp=tp, execution=model
+    )
+
+    costs = {"commission": 5e-4, "slippage": 2e-4}
+    expected = _execution_loop(
+        df, df["go"], df["stop"], sl, tp, intrabar=intrabar, next_open=next_open, **costs
+    )
+    ledger = result["ledger"]
+    trades = zip(ledger["entry_index"].tolist(), ledger["exit_index"].tolist(), ledger.reasons)
+    assert list(trades) == [trade[:3] for trade in expected]
+    np.testing.assert_allclose(ledger["return_pct"], [trade[3] for trade in expected], rtol=1e-12)
+    # The mark-to-market equity compounds exactly the net trade returns.
+    assert result["bar_equity"][-1] == pytest.approx(np.prod(1 + ledger["return_pct"]), rel=1e-9)
+
+
+@pytest.mark.parametrize("intrabar", [False, True])
+@pytest.mark.parametrize("next_open", [False, True])
+def test_execution_model_matches_bar_loop_for_shorts(intrabar, next_open):
+    df = random_frame(3_000, seed=12)
+    rng = np.random.default_rng(5)
+    df["go"], df["stop"], df["sell"], df["cover"] = rng.random((4, len(df))) < 0.05
+    timing = "next_open" if next_open else "close"
+    model = ExecutionModel(commission_bps=5, slippage=bps_slippage(2), intrabar=intrabar, entry=timing)
+
+    result = StrategyRunner(df).run_backtest(
+        entry_rule="go",
+        exit_rule="stop",
+        short_entry_rule="sell",
+        short_exit_rule="cover",
+        sl=0.01,
+        tp=0.02,
+        execution=model,
+    )
+
+    expected = _execution_loop(
+        df,
+        df["go"],
+        df["stop"],
+        0.01,
+        0.02,
+        intrabar=intrabar,
+        next_open=next_open,
+        commission=5e-4,
+        slippage=2e-4,
+        shorts=(df["sell"], df["cover"]),
+    )
+    ledger = result["ledger"]
+    trades = zip(ledger["entry_index"].tolist(), ledger["exit_index"].tolist(), ledger.reasons)
+    assert list(trades) == [trade[:3] for trade in expected]
+    np.testing.assert_allclose(ledger["return_pct"], [trade[3] for trade in expected], rtol=1e-12)
+    assert (ledger["side"] == -1).sum() > 10
+    assert result["bar_equity"][-1] == pytest.approx(np.prod(1 + ledger["return_pct"]), rel=1e-9)
+
+
+def test_intrabar_stops_fill_at_the_level_or_the_gap_open():
+    df = random_frame(6)
+    df[["open", "high", "low", "close"]] = [
+        [100, 100, 100, 100],
+        [100, 101, 97, 99],  # touches the 2% stop intrabar, closes above it
+        [100, 100, 100, 100],
+        [95, 96, 94, 95],  # opens below the stop
+        [100, 100, 100, 100],
+        [100, 100, 100, 100],
+    ]
+    df["go"] = [True, False, True, False, False, False]
+    rules = {"entry_rule": "go", "exit_rule": "close < 0", "sl": 0.02, "tp": 0.5}
+
+    close_only = StrategyRunner(df).run_backtest(**rules)
+    intrabar = StrategyRunner(df).run_backtest(**rules, execution=ExecutionModel(intrabar=True))
+
+    # On closes alone the first position survives bar 1 and is only stopped out at bar 3.
+    assert close_only["ledger"]["exit_index"].tolist() == [3]
+    assert intrabar["ledger"]["exit_index"].tolist() == [1, 3]
+    assert intrabar["ledger"].reasons == ["stop_loss", "stop_loss"]
+    assert intrabar["ledger"]["exit_price"].tolist() == [98.0, 95.0]
+
+
+def test_default_execution_model_changes_nothing():
+    df = random_frame(1_500)
+    rules = {"entry_rule": "close < open", "exit_rule": "close > open", "sl": 0.01, "tp": 0.02}
+    runner = StrategyRunner(df)
+
+    plain = runner.run_backtest(**rules)
+    assert_same_backtest(plain, runner.run_backtest(**rules, execution=ExecutionModel()))
+    costly = runner.run_backtest(**rules, execution=ExecutionModel(commission_bps=10))
+    assert costly["trades"] == plain["trades"]
+    assert (costly["ledger"]["return_pct"] < plain["ledger"]["return_pct"]).all()
+
+
+@pytest.mark.parametrize("shorts", [False, True])
+def test_run_grid_applies_the_execution_model(shorts):
+    df = random_frame(2_000)
+    rules = {"entry_rule": "close < open", "exit_rule": "close > open"}
+    if shorts:
+        rules.update(short_entry_rule="close > open * 1.001", short_exit_rule="close < open")
+    model = ExecutionModel(commission_bps=3, intrabar=True, entry="next_open")
+
+    grid = StrategyRunner(df).run_grid(
+        **rules, sl=[0.005, 0.02], tp=[0.01, 0.03], ledgers=True, executor="serial", execution=model
+    )
+
+    for row in grid.summary.to_dict("records"):
+        expected = StrategyRunner(df).run_backtest(**rules, sl=row["sl"], tp=row["tp"], execution=model)
+        for key in grid.summary.columns[2:]:
+            assert row[key] == pytest.approx(expected[key], rel=1e-12)
+        assert grid.ledgers[(row["sl"], row["tp"])] == expected["ledger"]
+
+
+def test_execution_model_validation():
+    with pytest.raises(ValueError):
+        ExecutionModel(commission_bps=-1)
+    with pytest.raises(ValueError):
+        ExecutionModel(entry="vwap")
+    with pytest.raises(ValueError):
+        bps_slippage(-2)
+    runner = StrategyRunner(random_frame(100)[["close"]])
+    rules = {"entry_rule": "close > 0", "exit_rule": "close < 0", "sl": 0.1, "tp": 0.1}
+    with pytest.raises(ValueError):
+        runner.run_backtest(**rules, execution=ExecutionModel(intrabar=True))
+    runner.run_backtest(**rules, execution=ExecutionModel(commission_bps=1, slippage=bps_slippage(1)))
@@ -1,24 +1,17 @@
 import numpy as np
 import pandas as pd
+import pytest
+from finta import TA
 
-from engine.feature_engine import FeatureEngine
+from engine.backtest import TradeLedger
+from engine.feature_engine import DEFAULT_INDICATORS, NATIVE_INDICATORS, FeatureEngine, Indicator
+from engine.profiling import FeatureProfiler
 from engine.strategy_runner import StrategyRunner
+from engine.testing import assert_same_backtest, random_frame
 
 
 def _constant_frame(rows: int = 200) -> pd.DataFrame:
-    rng = np.random.default_rng(42)
-    close = np.cumsum(rng.normal(0, 0.5, rows)) + 100
-    open_ = close + rng.normal(0, 0.1, rows)
-    high = np.maximum(open_, close) + rng.normal(0.2, 0.1, rows)
-    low = np.minimum(open_, close) - rng.normal(0.2, 0.1, rows)
-    volume = rng.integers(1_000, 5_000, rows)
-    return pd.DataFrame({
-        "open": open_,
-        "high": high,
-        "low": low,
-        "close": close,
-        "volume": volume,
-    })
+    return random_frame(rows, seed=42)
 
 
 def test_add_indicators_produces_expected_columns():
@@ -45,6 +38,71 @@ def test_add_indicators_produces_expected_columns():
     assert not enriched.isnull().values.any()
 
 
+def test_stochastic_d_reuses_stochastic_k():
+    df = _constant_frame()
+    enriched = FeatureEngine(df, dropna=False).add_indicators()
+
+    expected = TA.STOCHD(df, period=3, stoch_period=14)
+    np.testing.assert_allclose(enriched["STOCH_D"], expected, equal_nan=True)
+
+
+@pytest.mark.parametrize("backend, table", [("finta", DEFAULT_INDICATORS), ("numpy", NATIVE_INDICATORS)])
+def test_retired_indicator_keys_alias_the_merged_indicators(backend, table):
+    df = _constant_frame()
+    assert table["MACD_SIGNAL"] is table["MACD"] and table["BB_LOWER"] is table["BBANDS"]
+    old_keys = ["MACD", "MACD_SIGNAL", "BB_UPPER", "BB_LOWER"]
+    engine = FeatureEngine(df, indicators={key: table[key] for key in old_keys}, backend=backend)
+
+    assert list(engine.available_indicators()) == ["MACD", "MACD_SIGNAL", "BB_UPPER", "BB_LOWER"]
+    enriched = engine.add_indicators()
+    expected = FeatureEngine(df, backend=backend).add_indicators()
+    pd.testing.assert_frame_equal(enriched[old_keys], expected.loc[enriched.index, old_keys])
+
+    # Anything else registered under a retired key still replaces just that column.
+    replaced = FeatureEngine(df, backend=backend).add_indicators({"BB_UPPER": lambda *_: df["close"]})
+    assert (replaced["BB_UPPER"] == replaced["close"]).all()
+    pd.testing.assert_series_equal(replaced["BB_LOWER"], expected["BB_LOWER"])
+
+
+def test_extra_indicators_support_outputs_and_dependencies():
+    df = _constant_frame()
+    calls = []
+
+    def channel(_finta_df, raw_df):
+        calls.append("channel")
+        return raw_df["high"].rolling(5).max(), raw_df["low"].rolling(5).min()
+
+    extra = {
+        # Declared before its dependency to exercise the ordering.
+        "CHANNEL_WIDTH": Indicator(
+            outputs=("CHANNEL_WIDTH",),
+            compute=lambda _finta_df, raw_df: raw_df["CH_HIGH"] - raw_df["CH_LOW"],
+            depends_on=("CH_HIGH", "CH_LOW"),
+        ),
+        "CHANNEL": Indicator(outputs=("CH_HIGH", "CH_LOW"), compute=channel),
+    }
+    enriched = FeatureEngine(df).add_indicators(extra_indicators=extra)
+
+    assert calls == ["channel"]
+    np.testing.assert_allclose(enriched["CHANNEL_WIDTH"], enriched["CH_HIGH"] - enriched["CH_LOW"])
+
+
+def test_indicator_dependency_errors():
+    df = _constant_frame()
+    engine = FeatureEngine(df, indicators={})
+
+    missing = {"X": Indicator(outputs=("X",), compute=lambda *_: df["close"], depends_on=("NOPE",))}
+    with pytest.raises(ValueError, match="unknown column 'NOPE'"):
+        engine.add_indicators(extra_indicators=missing)
+
+    cycle = {
+        "A": Indicator(outputs=("A",), compute=lambda *_: df["close"], depends_on=("B",)),
+        "B": Indicator(outputs=("B",), compute=lambda *_: df["close"], depends_on=("A",)),
+    }
+    with pytest.raises(ValueError, match="cycle"):
+        engine.add_indicators(extra_indicators=cycle)
+
+
 def test_strategy_runner_generates_trades():
     df = _constant_frame()
     fe = FeatureEngine(df)
@@ -54,6 +112,182 @@ def test_strategy_runner_generates_trades():
     results = runner.run_backtest(entry_rule="RSI < 40", exit_rule="RSI > 60", sl=0.05, tp=0.1)
 
     assert "ledger" in results
-    assert isinstance(results["ledger"], list)
+    assert isinstance(results["ledger"], TradeLedger)
     assert results["trades"] == len(results["ledger"])
     assert results["max_drawdown"] >= 0
+
+
+def test_compute_many_reports_timings_and_failures():
+    frames = {
+        "AAA": _constant_frame(),
+        "BBB": _constant_frame(150),
+        "BAD": _constant_frame().drop(columns="volume"),
+    }
+
+    result = FeatureEngine.compute_many(frames, executor="thread", max_workers=2, chunksize=1)
+
+    assert set(result.timings) == {"AAA", "BBB", "BAD"}
+    assert list(result.failures) == ["BAD"]
+    assert "volume" in result.failures["BAD"]
+    assert list(result.features.index.get_level_values("symbol").unique()) == ["AAA", "BBB"]
+    pd.testing.assert_frame_equal(
+        result.features.loc["AAA"], FeatureEngine(frames["AAA"]).add_indicators()
+    )
+
+
+def test_compute_many_process_pool_long_layout():
+    frames = {"AAA": _constant_frame(), "BBB": _constant_frame(150)}
+
+    result = FeatureEngine.compute_many(
+        frames, executor="process", max_workers=2, layout="long", backend="numpy"
+    )
+
+    assert not result.failures
+    assert list(result.features.columns[:1]) == ["symbol"]
+    assert result.features["symbol"].value_counts().to_dict() == {
+        "AAA": len(FeatureEngine(frames["AAA"]).add_indicators()),
+        "BBB": len(FeatureEngine(frames["BBB"]).add_indicators()),
+    }
+
+
+def test_low_memory_mode_matches_default_and_shares_input():
+    df = _constant_frame()
+    expected = FeatureEngine(df).add_indicators()
+    engine = FeatureEngine(df, low_memory=True, dropna=False)
+    enriched = engine.add_indicators()
+
+    assert np.shares_memory(enriched["close"].to_numpy(), df["close"].to_numpy())
+    assert "EMA_10" not in df.columns
+    pd.testing.assert_frame_equal(
+        FeatureEngine(df, low_memory=True).add_indicators(), expected, check_exact=False
+    )
+
+
+def test_dropna_handles_interior_gaps():
+    df = _constant_frame()
+    df.loc[100, "volume"] = np.nan
+
+    enriched = FeatureEngine(df).add_indicators()
+
+    assert not enriched.isnull().values.any()
+    assert len(enriched) == len(FeatureEngine(df, dropna=False).add_indicators().dropna())
+
+
+def test_float32_output_stays_close_to_float64():
+    df = _constant_frame()
+    reference = FeatureEngine(df).add_indicators()
+    compact = FeatureEngine(df, dtype=np.float32, input_tolerance=1e-6).add_indicators()
+
+    indicator_columns = list(FeatureEngine(df).available_indicators())
+    assert set(compact[indicator_columns].dtypes) == {np.dtype(np.float32)}
+    assert compact["close"].dtype == np.float32
+    assert compact["volume"].dtype == np.float32
+    np.testing.assert_array_equal(compact["volume"].astype(np.int64), reference["volume"])
+    np.testing.assert_allclose(
+        compact.to_numpy(dtype=np.float64), reference.to_numpy(dtype=np.float64), rtol=1e-6, atol=1e-4
+    )
+
+
+def test_float32_keeps_inputs_that_would_lose_precision():
+    df = _constant_frame()
+    df["volume"] = df["volume"].astype(np.int64) + 2**25 + 1
+
+    enriched = FeatureEngine(df, dtype="float32", low_memory=True).add_indicators()
+
+    assert enriched["volume"].dtype == np.int64
+    assert enriched["RSI"].dtype == np.float32
+
+
+def test_non_float_dtype_is_rejected():
+    with pytest.raises(ValueError, match="floating point"):
+        FeatureEngine(_constant_frame(), dtype=np.int32)
+    with pytest.raises(ValueError):
+        FeatureEngine(_constant_frame(), dtype=np.float32, input_tolerance=-1)
+
+
+def test_float32_keeps_float_prices_unless_a_tolerance_allows_rounding():
+    df = _constant_frame()
+    df["close"] = 98765.4321 + np.arange(len(df))
+    df["open"] = df["open"].round(2)
+
+    exact = FeatureEngine(df, dtype=np.float32).add_indicators()
+    loose = FeatureEngine(df, dtype=np.float32, input_tolerance=1e-6).add_indicators()
+
+    # float32 rounds this price by about 2.4e-3, within its own rounding error.
+    assert exact["close"].dtype == np.float64 and exact["open"].dtype == np.float64
+    assert exact["volume"].dtype == np.float32
+    assert loose["close"].dtype == np.float32
+    exact_only = df.assign(high=df["high"].astype(np.float32).astype(np.float64))
+    assert FeatureEngine(exact_only, dtype=np.float32).add_indicators()["high"].dtype == np.float32
+
+
+def test_lazy_frame_computes_only_requested_columns():
+    df = _constant_frame()
+    eager = FeatureEngine(df, dropna=False).add_indicators()
+    lazy = FeatureEngine(df).lazy()
+
+    pd.testing.assert_series_equal(lazy["RSI"], eager["RSI"])
+    assert lazy.computed == ["RSI"]
+    lazy[["STOCH_D"]]
+    assert lazy.computed == ["RSI", "STOCH_K", "STOCH_D"]
+    pd.testing.assert_frame_equal(lazy.to_frame(), FeatureEngine(df).add_indicators())
+
+
+def test_lazy_frame_retries_an_indicator_that_failed():
+    df = _constant_frame()
+    calls = []
+
+    def flaky(_finta_df, raw_df):
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("data feed hiccup")
+        return raw_df["close"] * 2
+
+    lazy = FeatureEngine(df).lazy({"DOUBLE": Indicator(outputs=("DOUBLE",), compute=flaky)})
+    with pytest.raises(RuntimeError):
+        lazy["DOUBLE"]
+    assert "DOUBLE" not in lazy.computed
+
+    pd.testing.assert_series_equal(lazy["DOUBLE"], df["close"] * 2, check_names=False)
+    assert "DOUBLE" in lazy.computed and len(calls) == 2
+
+
+def test_strategy_runner_with_lazy_frame_computes_referenced_columns():
+    df = _constant_frame(300)
+    lazy = FeatureEngine(df, backend="numpy").lazy()
+    rules = {"entry_rule": "RSI < 45", "exit_rule": "`EMA_10` < EMA_50", "sl": 0.02, "tp": 0.04}
+
+    result = StrategyRunner(lazy).run_backtest(**rules)
+    eager = FeatureEngine(df, backend="numpy", dropna=False).add_indicators()
+    expected = StrategyRunner(eager).run_backtest(**rules)
+
+    assert sorted(lazy.computed) == ["EMA_10", "EMA_50", "RSI"]
+    assert_same_backtest(result, expected)
+
+
+def test_profile_indicators_reports_every_column_and_feeds_the_hook():
+    df = _constant_frame()
+    records = []
+    engine = FeatureEngine(df, backend="numpy", dropna=False)
+    engine.profiler = FeatureProfiler(hook=records.append, track_allocations=True)
+
+    enriched, summary = engine.profile_indicators()
+
+    expected = FeatureEngine(df, backend="numpy", dropna=False).add_indicators()
+    pd.testing.assert_frame_equal(enriched, expected)
+    assert list(summary["column"]) == [
+        column for column in enriched.columns if column not in df.columns
+    ]
+    assert [record.indicator for record in records] == list(dict.fromkeys(summary["indicator"]))
+    nan_counts = summary.set_index("column")["nan_count"]
+    assert nan_counts["EMA_10"] == 0
+    assert nan_counts["SMA_20"] == enriched["SMA_20"].isna().sum() == 19
+    assert (summary["seconds"] >= 0).all() and (summary["allocated_mb"] > 0).all()
+
+
+def test_profile_indicators_without_profiler_uses_a_temporary_one():
+    engine = FeatureEngine(_constant_frame(), backend="numpy")
+    _, summary = engine.profile_indicators()
+
+    assert engine.profiler is None
+    assert summary["allocated_mb"].isna().all() and len(summary) > 0
@@ -0,0 +1,155 @@
+import numpy as np
+import pytest
+
+from engine import kernels
+from engine.feature_engine import FeatureEngine
+from engine.testing import flat_frame, random_frame
+
+
+@pytest.mark.parametrize("frame_factory", [random_frame, flat_frame])
+def test_numpy_backend_matches_finta(frame_factory):
+    df = frame_factory()
+    finta = FeatureEngine(df, dropna=False).add_indicators()
+    native = FeatureEngine(df, dropna=False, backend="numpy").add_indicators()
+
+    assert list(native.columns) == list(finta.columns)
+    for column in FeatureEngine(df).available_indicators():
+        np.testing.assert_allclose(
+            native[column].to_numpy(),
+            finta[column].to_numpy(),
+            rtol=1e-9,
+            atol=1e-6,
+            equal_nan=True,
+            err_msg=column,
+        )
+
+
+def test_numpy_backend_dropna_matches_finta():
+    df = random_frame()
+    finta = FeatureEngine(df).add_indicators()
+    native = FeatureEngine(df, backend="numpy").add_indicators()
+
+    assert len(native) == len(finta)
+    np.testing.assert_allclose(native.to_numpy(), finta.to_numpy(), rtol=1e-9, atol=1e-6)
+
+
+def test_kernels_accept_two_dimensional_input():
+    df = random_frame()
+    close = df["close"].to_numpy()
+    panel = np.column_stack([close, close * 2])
+
+    np.testing.assert_allclose(kernels.ema(panel, 10)[:, 1], kernels.ema(close * 2, 10))
+    np.testing.assert_allclose(
+        kernels.rolling_std(panel, 20)[:, 0], kernels.rolling_std(close, 20), equal_nan=True
+    )
+
+
+def test_short_series_yields_nan_windows():
+    values = np.arange(5, dtype=float)
+
+    assert np.isnan(kernels.sma(values, 10)).all()
+    assert np.isnan(kernels.rolling_max(values, 10)).all()
+
+
+def test_unknown_backend_is_rejected():
+    with pytest.raises(ValueError, match="Unknown backend"):
+        FeatureEngine(random_frame(), backend="cuda")
+
+
+def test_compute_panel_matches_per_symbol_results():
+    frames = [random_frame(300, seed=seed) for seed in range(4)]
+    panel = {
+        column: np.column_stack([frame[column] for frame in frames])
+        for column in ("high", "low", "close", "volume")
+    }
+
+    features = FeatureEngine.compute_panel(panel)
+    tensor, columns = FeatureEngine.compute_panel(panel, dtype=np.float32, as_tensor=True)
+
+    assert tensor.shape == (300, 4, len(columns))
+    assert tensor.dtype == np.float32
+    for symbol, frame in enumerate(frames):
+        expected = FeatureEngine(frame, dropna=False, backend="numpy").add_indicators()
+        for position, column in enumerate(columns):
+            np.testing.assert_allclose(
+                features[column][:, symbol], expected[column], rtol=1e-9, equal_nan=True, err_msg=column
+            )
+            np.testing.assert_allclose(
+                tensor[:, symbol, position], expected[column], rtol=1e-5, equal_nan=True
+            )
+
+
+def test_compute_panel_rejects_misaligned_arrays():
+    panel = {name: np.ones((10, 3)) for name in ("high", "low", "close")}
+    panel["volume"] = np.ones((10, 2))
+
+    with pytest.raises(ValueError, match="same"):
+        FeatureEngine.compute_panel(panel)
+
+
+_SWEEP_FRAME = random_frame(1_000)
+_SWEEP_FRAME.loc[300:305, "close"] = np.nan
+_CLOSE, _HIGH, _LOW = (_SWEEP_FRAME[column].to_numpy() for column in ("close", "high", "low"))
+
+
+@pytest.mark.parametrize(
+    "name, factory",
+    [
+        ("EMA", lambda period: kernels.ema(_CLOSE, period)),
+        ("SMA", lambda period: kernels.sma(_CLOSE, period)),
+        ("RSI", lambda period: kernels.rsi(_CLOSE, period)),
+        ("ATR", lambda period: kernels.atr(_HIGH, _LOW, _CLOSE, period)),
+        ("BB_UPPER", lambda period: kernels.bollinger(_CLOSE, period)[0]),
+        ("BB_LOWER", lambda period: kernels.bollinger(_CLOSE, period)[2]),
+    ],
+)
+def test_sweep_matches_fixed_period_kernels(name, factory):
+    periods = [2, 5, 14, 50, 200]
+    kind = "BBANDS" if name.startswith("BB_") else name
+    swept = FeatureEngine(_SWEEP_FRAME).sweep(kind, periods)
+
+    assert list(swept.index) == list(_SWEEP_FRAME.index)
+    for period in periods:
+        np.testing.assert_allclose(
+            swept[f"{name}_{period}"], factory(period), rtol=1e-9, atol=1e-6, equal_nan=True
+        )
+
+
+def test_sweep_rejects_unknown_indicator_and_periods():
+    engine = FeatureEngine(random_frame(50))
+
+    with pytest.raises(ValueError, match="Unknown sweep"):
+        engine.sweep("VWAP", [10])
+    with pytest.raises(ValueError, match="positive"):
+        engine.sweep("EMA", [0, 10])
+
+
+def _ewm_reference(values: np.ndarray, alpha: float) -> np.ndarray:
+    numerator = denominator = np.longdouble(0)
+    decay = np.longdouble(1 - alpha)
+    reference = np.empty(len(values), dtype=np.longdouble)
+    for row, value in enumerate(values):
+        numerator *= decay
+        denominator *= decay
+        if not np.isnan(value):
+            numerator += np.longdouble(value)
+            denominator += 1
+        reference[row] = numerator / denominator if denominator else np.nan
+    return reference
+
+
+@pytest.mark.parametrize("gaps", [False, True])
+@pytest.mark.parametrize("alpha", [2 / 11, 1 / 14, 2 / 201, 1 / 2_000])
+def test_ewm_scan_error_stays_within_documented_bound(alpha, gaps):
+    rng = np.random.default_rng(11)
+    values = np.cumsum(rng.normal(0, 1, 20_000)) + 10_000
+    values[:3] = np.nan
+    if gaps:
+        values[5_000:5_010] = np.nan
+
+    result = kernels.ewm_mean(values, alpha)
+    reference = _ewm_reference(values, alpha)
+
+    bound = np.finfo(np.float64).eps * np.nanmax(np.abs(values)) / alpha
+    assert np.nanmax(np.abs(result - reference)) <= bound
+    np.testing.assert_array_equal(np.isnan(result), np.isnan(reference))
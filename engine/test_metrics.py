@@ -0,0 +1,89 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine import metrics
+from engine.backtest import simulate_trades
+from engine.strategy_runner import StrategyRunner
+from engine.testing import random_frame
+
+
+def _pandas_metrics(returns, positions, periods_per_year):
+    """Straightforward per-curve reference for ``metrics.risk_metrics``."""
+
+    returns = pd.Series(returns)
+    equity = (1 + returns).cumprod()
+    peaks = equity.cummax()
+    drawdown = float((1 - equity / peaks).max())
+    last_peak = pd.Series(np.where(equity >= peaks, np.arange(len(equity)), np.nan)).ffill()
+    annual = equity.iloc[-1] ** (periods_per_year / len(returns)) - 1
+    downside = np.sqrt((returns.clip(upper=0) ** 2).mean())
+    return {
+        "sharpe": returns.mean() / returns.std() * np.sqrt(periods_per_year),
+        "sortino": returns.mean() / downside * np.sqrt(periods_per_year),
+        "calmar": annual / drawdown,
+        "exposure": positions.mean(),
+        "turnover": np.abs(np.diff(positions, prepend=0)).sum() / len(positions),
+        "bar_max_drawdown": drawdown,
+        "max_drawdown_duration": int((np.arange(len(equity)) - last_peak).max()),
+    }
+
+
+def test_mark_to_market_equity_compounds_the_trade_returns():
+    rng = np.random.default_rng(3)
+    close = 100 + np.cumsum(rng.normal(0, 0.5, 3_000))
+    trades = simulate_trades(close, rng.random(3_000) < 0.02, rng.random(3_000) < 0.02, sl=0.02, tp=0.03)
+
+    positions = metrics.position_matrix(len(close), [trades.entry_index], [trades.exit_index])[0]
+    equity = metrics.equity_curve(metrics.mark_to_market(close, positions))
+
+    trade_returns = close[trades.exit_index] / close[trades.entry_index]
+    np.testing.assert_allclose(equity[trades.exit_index], np.cumprod(trade_returns))
+    assert set(np.unique(positions)) == {0.0, 1.0}
+    assert positions[trades.entry_index].all() and not positions[trades.exit_index].any()
+
+
+def test_batched_metrics_match_a_per_curve_reference():
+    rng = np.random.default_rng(5)
+    close = 100 * np.cumprod(1 + rng.normal(0.0002, 0.01, 1_500))
+    positions = (rng.random((4, len(close))) < 0.4).astype(float)
+    returns = metrics.mark_to_market(close, positions)
+
+    batched = metrics.risk_metrics(returns, positions, periods_per_year=365)
+
+    for row in range(len(positions)):
+        single = metrics.risk_metrics(returns[row], positions[row], periods_per_year=365)
+        expected = _pandas_metrics(returns[row], positions[row], 365)
+        for key in metrics.METRIC_COLUMNS:
+            assert single[key] == pytest.approx(expected[key], rel=1e-9)
+            assert batched[key][row] == single[key]
+
+
+def test_underwater_and_drawdown_duration():
+    equity = np.array([[1.0, 1.2, 0.9, 1.0, 1.3, 1.1], [1.0, 1.0, 1.0, 1.0, 1.0, 1.0]])
+
+    np.testing.assert_allclose(metrics.underwater(equity)[0], [0, 0, -0.25, -1 / 6, 0, -2 / 13])
+    np.testing.assert_array_equal(metrics.drawdown_duration(equity), [[0, 0, 1, 2, 0, 1], [0] * 6])
+    np.testing.assert_allclose(StrategyRunner._calculate_max_drawdown(equity), [0.25, 0.0])
+    assert StrategyRunner._calculate_max_drawdown(equity[0]) == pytest.approx(0.25)
+    assert StrategyRunner._calculate_max_drawdown(np.array([])) == 0.0
+    flat = metrics.max_drawdown(np.array([1.0, 1.1, 1.2]))
+    assert flat == 0.0 and not np.signbit(flat)
+    assert not np.signbit(metrics.max_drawdown(np.ones((2, 3)))).any()
+    flat = metrics.risk_metrics(np.zeros(10), np.zeros(10))
+    assert all(value == 0 for value in flat.values())
+
+
+def test_run_backtest_reports_bar_level_curves():
+    df = random_frame(2_000)
+    result = StrategyRunner(df).run_backtest(
+        entry_rule="close < open", exit_rule="close > open", sl=0.01, tp=0.02, periods_per_year=24 * 365
+    )
+
+    assert result["bar_equity"].shape == result["underwater"].shape == (len(df),)
+    assert result["bar_max_drawdown"] == pytest.approx(-result["underwater"].min())
+    assert result["max_drawdown_duration"] == result["drawdown_duration"].max()
+    ledger = result["ledger"]
+    held = ledger["exit_index"] > ledger["entry_index"]  # a last-bar entry never holds a position
+    assert result["turnover"] == pytest.approx(2 * held.sum() / len(df))
+    assert result["exposure"] == (ledger["exit_index"] - ledger["entry_index"]).sum() / len(df)
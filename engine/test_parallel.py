@@ -0,0 +1,17 @@
+import pytest
+
+from engine.parallel import map_shared
+
+
+def _scaled(item, shared):
+    return item * shared["factor"]
+
+
+@pytest.mark.parametrize("executor", ["process", "thread"])
+def test_map_shared_passes_the_shared_input_to_every_task(executor):
+    assert map_shared(executor, 2, _scaled, range(5), {"factor": 3}) == [0, 3, 6, 9, 12]
+
+
+def test_map_shared_rejects_unknown_executors():
+    with pytest.raises(ValueError, match="Unknown executor"):
+        map_shared("cluster", None, _scaled, [1], {"factor": 1})
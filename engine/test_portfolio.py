@@ -0,0 +1,117 @@
+import heapq
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.backtest import CandidateExits, TradeLedger
+from engine.portfolio import PORTFOLIO_LEDGER_DTYPE, PortfolioRunner
+from engine.strategy_runner import StrategyRunner
+from engine.testing import random_frame
+
+RULES = {"entry_rule": "close < open", "exit_rule": "close > open", "sl": 0.01, "tp": 0.02}
+
+
+def _universe(symbols: int = 4, rows: int = 300) -> dict:
+    frames = {}
+    for seed in range(symbols):
+        frame = random_frame(rows, seed=seed)
+        frame.index = pd.date_range("2024-01-01", periods=rows, freq="h")
+        # Stagger listings so the timeline has gaps for some symbols.
+        frames[f"S{seed}"] = frame.iloc[seed * 10 :]
+    return frames
+
+
+def test_unconstrained_portfolio_matches_single_symbol_backtests():
+    frames = _universe()
+    result = PortfolioRunner(frames, capital=100_000, position_size=0.05, max_positions=10).run(**RULES)
+
+    for symbol, frame in frames.items():
+        expected = StrategyRunner(frame).run_backtest(**RULES)["ledger"]
+        ledger = result.ledgers[symbol]
+        assert isinstance(ledger, TradeLedger) and ledger.records.dtype == PORTFOLIO_LEDGER_DTYPE
+        keys = ["entry_index", "exit_index", "entry_price", "exit_price", "return_pct", "reason", "side"]
+        assert [{key: trade[key] for key in keys} for trade in ledger] == expected
+        assert all(trade["entry_time"] == frame.index[trade["entry_index"]] for trade in ledger)
+
+    pnl = sum(trade["pnl"] for ledger in result.ledgers.values() for trade in ledger)
+    assert result.statistics["final_equity"] == pytest.approx(100_000 + pnl)
+    assert result.statistics["rejected_entries"] == 0
+    assert result.equity_curve.index.equals(frames["S0"].index)
+    frame = result.ledgers["S1"].to_frame()
+    assert list(frame.columns) == list(PORTFOLIO_LEDGER_DTYPE.names)
+    assert (frame["entry_time"] == frames["S1"].index[frame["entry_index"]]).all()
+
+
+def test_symbols_without_trades_get_empty_ledgers():
+    frames = _universe(symbols=2)
+    frames["S1"] = frames["S1"].assign(open=frames["S1"]["close"])  # never "close < open"
+    result = PortfolioRunner(frames).run(**RULES)
+
+    assert len(result.ledgers["S0"]) > 0
+    assert len(result.ledgers["S1"]) == 0
+    assert result.ledgers["S1"].records.dtype == PORTFOLIO_LEDGER_DTYPE
+
+
+def test_position_cap_and_cash_limit_entries():
+    frames = _universe(symbols=6)
+    result = PortfolioRunner(frames, capital=10_000, position_size=0.5, max_positions=2).run(**RULES)
+
+    trades = [trade for ledger in result.ledgers.values() for trade in ledger]
+    intervals = sorted((trade["entry_time"], trade["exit_time"]) for trade in trades)
+    for position, (entered, _exited) in enumerate(intervals):
+        overlapping = [other for other in intervals[:position] if other[1] > entered]
+        assert len(overlapping) < 2
+    for trade in trades:
+        cost = trade["shares"] * trade["entry_price"]
+        assert cost <= 0.5 * result.equity_curve[trade["entry_time"]] * (1 + 1e-9)
+    assert result.statistics["rejected_entries"] > 0
+    assert np.isfinite(result.equity_curve).all()
+
+
+def _signal_loop_reference(runner, size, cap):
+    """Visit every entry signal of every symbol in time order; returns (trades, rejected, equity)."""
+
+    signals, tables = [], []
+    for column, symbol in enumerate(runner.symbols):
+        frame = runner.frames[symbol]
+        events = StrategyRunner(frame).rule_events(RULES["entry_rule"], RULES["exit_rule"])
+        tables.append(CandidateExits(events, sl=RULES["sl"], tp=RULES["tp"]))
+        timeline = runner._positions[column]
+        signals += [(timeline[start], column, k) for k, start in enumerate(events.starts)]
+    cash, busy, held, trades, rejected = runner.capital, [-1] * len(tables), [], [], 0
+    for time, column, k in sorted(signals):
+        if time <= busy[column]:
+            continue
+        while held and held[0][0] <= time:
+            cash += trades[heapq.heappop(held)[1]][1]
+        if len(held) >= cap or cash <= 0:
+            rejected += 1
+            continue
+        equity = cash + sum(trades[i][0] * runner.prices[time, trades[i][2]] for _, i in held)
+        budget = min(size * equity, cash)
+        exited = int(runner._positions[column][tables[column][k][0]])
+        shares = budget / runner.prices[time, column]
+        trades.append((shares, shares * runner.prices[exited, column], column))
+        heapq.heappush(held, (exited, len(trades) - 1))
+        busy[column], cash = exited, cash - budget
+    return len(trades), rejected, cash + sum(trades[i][1] for _, i in held)
+
+
+@pytest.mark.parametrize("size, cap", [(0.5, 2), (0.3, 10), (0.1, 3)])
+def test_constrained_portfolio_matches_signal_loop(size, cap):
+    runner = PortfolioRunner(_universe(symbols=6), capital=10_000, position_size=size, max_positions=cap)
+    result = runner.run(**RULES)
+
+    trades, rejected, final_equity = _signal_loop_reference(runner, size, cap)
+    assert (result.statistics["trades"], result.statistics["rejected_entries"]) == (trades, rejected)
+    assert result.statistics["final_equity"] == pytest.approx(final_equity)
+
+
+def test_portfolio_validates_configuration():
+    with pytest.raises(ValueError):
+        PortfolioRunner({})
+    with pytest.raises(ValueError):
+        PortfolioRunner(_universe(1), position_size=1.5)
+    with pytest.raises(ValueError):
+        PortfolioRunner(_universe(1), max_positions=0)
@@ -0,0 +1,86 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.rules import compile_rule
+from engine.strategy_runner import StrategyRunner
+from engine.testing import assert_same_backtest, random_frame
+
+
+def _frame() -> pd.DataFrame:
+    df = random_frame(600)
+    df.loc[20:30, "close"] = np.nan
+    df["flag"] = df["close"] > df["open"]
+    df["fast ema"] = df["close"].ewm(span=5).mean()
+    return df
+
+
+@pytest.mark.parametrize(
+    "expression",
+    [
+        "close > open",
+        "close > open & volume > 2000",
+        "close < open | volume > 4000 and high - low > 0.5",
+        "95 < close < 110",
+        "not flag or ~flag & (volume % 7 == 0)",
+        "(close / open - 1) ** 2 > 0.0001",
+        "`fast ema` >= close",
+        "-close < -100 and True",
+        "volume // 100 != 30",
+    ],
+)
+def test_compiled_rules_match_dataframe_eval(expression):
+    df = _frame()
+
+    mask = compile_rule(expression).mask(df, len(df))
+
+    np.testing.assert_array_equal(mask, np.asarray(df.eval(expression), dtype=bool))
+
+
+def test_time_series_functions_match_pandas():
+    df = _frame()
+    close, mean = df["close"], df["close"].rolling(5).mean()
+    cases = {
+        "cross_over(close, rolling_mean(close, 5))": (close > mean) & (close.shift() <= mean.shift()),
+        "cross_under(close, 100)": (close < 100) & (close.shift() >= 100),
+        "shift(close) < close": close.shift() < close,
+        "lag(close, 3) > close": close.shift(3) > close,
+        "rolling_max(high, 10) == high": df["high"].rolling(10).max() == df["high"],
+        "rolling_min(low, 4) == low": df["low"].rolling(4).min() == df["low"],
+        "rolling_std(close, 3) > 0.5": close.rolling(3).std() > 0.5,
+        "rolling_sum(volume, 3) > 9000": df["volume"].rolling(3).sum() > 9000,
+        "abs(close - open) > 0.1": (close - df["open"]).abs() > 0.1,
+    }
+    for expression, expected in cases.items():
+        np.testing.assert_array_equal(compile_rule(expression).mask(df, len(df)), expected.to_numpy())
+
+
+def test_compiled_rules_are_cached_and_reusable_across_symbols():
+    rule = compile_rule("cross_over(close, rolling_mean(close, 10))")
+    assert compile_rule("cross_over(close, rolling_mean(close, 10))") is rule
+    assert rule.columns == ("close",)
+
+    for seed in (1, 2):
+        df = random_frame(300, seed=seed)
+        arrays = {"close": df["close"].to_numpy()}
+        np.testing.assert_array_equal(rule.mask(arrays, 300), rule.mask(df, 300))
+
+
+@pytest.mark.parametrize(
+    "expression",
+    ["log(close) > 1", "close > @level", "shift(close, 0) > 1", "close.abs() > 1", "close >"],
+)
+def test_unsupported_rules_raise_value_error(expression):
+    with pytest.raises(ValueError):
+        compile_rule(expression)
+
+
+def test_strategy_runner_falls_back_to_eval_for_other_syntax():
+    df = random_frame(800)
+    runner = StrategyRunner(df)
+    rules = {"exit_rule": "close > open", "sl": 0.01, "tp": 0.02}
+
+    fallback = runner.run_backtest(entry_rule="log(close) < log(open)", **rules)
+    compiled = runner.run_backtest(entry_rule="close < open", **rules)
+
+    assert_same_backtest(fallback, compiled)
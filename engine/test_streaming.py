@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.feature_engine import NATIVE_INDICATORS, FeatureEngine, normalization_indicators
+from engine.testing import flat_frame, random_frame
+
+
+@pytest.mark.parametrize("backend", ["finta", "numpy"])
+@pytest.mark.parametrize("frame_factory", [random_frame, flat_frame])
+def test_extend_matches_batch_computation(backend, frame_factory):
+    df = frame_factory()
+    split = len(df) // 2
+    full = FeatureEngine(df, dropna=False, backend=backend).add_indicators()
+
+    engine = FeatureEngine(df.iloc[:split], dropna=False, backend=backend)
+    streamed = engine.extend(df.iloc[split:])
+
+    assert list(streamed.index) == list(df.index[split:])
+    for column in engine.available_indicators():
+        np.testing.assert_allclose(
+            streamed[column].to_numpy(),
+            full[column].to_numpy()[split:],
+            rtol=1e-9,
+            atol=1e-6,
+            equal_nan=True,
+            err_msg=column,
+        )
+
+
+def test_update_returns_bar_with_indicators():
+    df = random_frame(300)
+    full = FeatureEngine(df, dropna=False, backend="numpy").add_indicators()
+    engine = FeatureEngine(df.iloc[:-1], backend="numpy")
+
+    bar = {key.upper(): value for key, value in df.iloc[-1].items()}
+    bar["symbol"] = "TEST"
+    row = engine.update(bar)
+
+    assert row["symbol"] == "TEST"
+    for column in engine.available_indicators():
+        assert row[column] == pytest.approx(full[column].iloc[-1], rel=1e-9)
+
+
+def test_streaming_warm_up_from_empty_history():
+    df = random_frame(80)
+    engine = FeatureEngine(df.iloc[:0], dropna=False, backend="numpy")
+    streamed = engine.extend(df)
+    full = FeatureEngine(df, dropna=False, backend="numpy").add_indicators()
+
+    pd.testing.assert_frame_equal(streamed, full, rtol=1e-9, atol=1e-6)
+
+
+def test_streaming_requires_stream_support():
+    engine = FeatureEngine(random_frame(), indicators={"CLOSE_X2": lambda _f, raw: raw["close"] * 2})
+
+    with pytest.raises(ValueError, match="CLOSE_X2"):
+        engine.update({"open": 1, "high": 1, "low": 1, "close": 1, "volume": 1})
+
+
+@pytest.mark.parametrize("method", ["zscore", "rank", "minmax"])
+def test_normalizers_match_pandas_and_stream(method):
+    df = random_frame(400)
+    df.loc[150, "volume"] = np.nan
+    normalizers = normalization_indicators(["OBV", "EMA_50", "volume"], method=method, period=30)
+    indicators = {**NATIVE_INDICATORS, **normalizers}
+    engine = FeatureEngine(df.iloc[:250], indicators=indicators, dropna=False, backend="numpy")
+    full = FeatureEngine(df, indicators=indicators, dropna=False, backend="numpy").add_indicators()
+
+    expected = {
+        "zscore": lambda s: (s - s.rolling(30).mean()) / s.rolling(30).std(),
+        "rank": lambda s: s.rolling(30).rank(pct=True),
+        "minmax": lambda s: (s - s.cummin()) / (s.cummax() - s.cummin()),
+    }[method]
+    streamed = engine.extend(df.iloc[250:])
+    for column, spec in normalizers.items():
+        source = spec.depends_on[0]
+        np.testing.assert_allclose(
+            full[column], expected(full[source]), rtol=1e-7, atol=1e-9, equal_nan=True
+        )
+        np.testing.assert_allclose(
+            streamed[column], full[column].iloc[250:], rtol=1e-7, atol=1e-9, equal_nan=True
+        )
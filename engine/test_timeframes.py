@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.feature_engine import FeatureEngine
+from engine.testing import random_frame
+from engine.timeframes import MultiTimeframeFeatures, resample_ohlcv
+
+TIMEFRAMES = ["15min", "1h"]
+
+
+def _minute_frame(rows: int = 3_000) -> pd.DataFrame:
+    df = random_frame(rows)
+    df.index = pd.date_range("2024-03-01 09:07", periods=rows, freq="1min")
+    # Drop a block of bars so some higher-timeframe bins are empty.
+    return df.drop(df.index[700:800])
+
+
+def _naive_join(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    bars = resample_ohlcv(df, timeframe)
+    features = FeatureEngine(bars, dropna=False, backend="numpy").add_indicators()
+    previous = features[FeatureEngine(bars, backend="numpy").available_indicators()].shift(1)
+    previous.index = bars.index
+    return previous.reindex(df.index.floor(timeframe)).set_axis(df.index)
+
+
+def test_fit_transform_joins_previous_completed_bar():
+    df = _minute_frame()
+    stage = MultiTimeframeFeatures(TIMEFRAMES)
+    enriched = stage.fit_transform(df)
+
+    assert list(enriched.index) == list(df.index)
+    for timeframe in TIMEFRAMES:
+        expected = _naive_join(df, timeframe)
+        for column in expected.columns:
+            np.testing.assert_allclose(
+                enriched[f"{column}_{timeframe}"], expected[column], rtol=1e-9, atol=1e-6, equal_nan=True
+            )
+
+
+def test_features_do_not_depend_on_future_bars():
+    df = _minute_frame()
+    cutoff = df.index[1_500]
+    changed = df.copy()
+    changed.loc[changed.index > cutoff, ["open", "high", "low", "close"]] *= 1.5
+
+    original = MultiTimeframeFeatures(TIMEFRAMES).fit_transform(df)
+    shocked = MultiTimeframeFeatures(TIMEFRAMES).fit_transform(changed)
+
+    pd.testing.assert_frame_equal(
+        original.loc[:cutoff].drop(columns=["open", "high", "low", "close"]),
+        shocked.loc[:cutoff].drop(columns=["open", "high", "low", "close"]),
+    )
+
+
+@pytest.mark.parametrize("splits", [[1_000], [1_000, 1_001, 1_037, 2_200]])
+def test_incremental_updates_match_full_history(splits):
+    df = _minute_frame()
+    full = MultiTimeframeFeatures(TIMEFRAMES).fit_transform(df)
+
+    stage = MultiTimeframeFeatures(TIMEFRAMES)
+    bounds = [0, *splits, len(df)]
+    parts = [stage.fit_transform(df.iloc[: bounds[1]])]
+    for start, stop in zip(bounds[1:-1], bounds[2:]):
+        parts.append(stage.update(df.iloc[start:stop]))
+
+    pd.testing.assert_frame_equal(pd.concat(parts), full, rtol=1e-9, atol=1e-6)
+
+
+def test_indicators_without_streaming_are_recomputed():
+    df = _minute_frame(600)
+    indicators = {"CLOSE_X2": lambda _inputs, raw: raw["close"] * 2}
+    stage = MultiTimeframeFeatures(["1h"], indicators=indicators)
+    stage.fit_transform(df.iloc[:300])
+
+    tail = stage.update(df.iloc[300:])
+
+    expected = MultiTimeframeFeatures(["1h"], indicators=indicators).fit_transform(df).iloc[300:]
+    pd.testing.assert_frame_equal(tail, expected)
+    assert stage.columns == ["CLOSE_X2_1h"]
@@ -0,0 +1,100 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from engine.strategy_runner import StrategyRunner
+from engine.testing import random_frame
+from engine.walk_forward import FOLD_COLUMNS, WalkForward, walk_forward_folds
+
+
+class _LevelModel:
+    """Scores rows by how far ``signal`` sits above its mean over the positive training labels."""
+
+    def fit(self, X, y):
+        self.level = float(X["signal"].to_numpy()[np.asarray(y) == 1].mean())
+        return self
+
+    def predict_proba(self, X):
+        positive = 1 / (1 + np.exp(-(X["signal"].to_numpy() - self.level) * 5))
+        return np.column_stack([1 - positive, positive])
+
+
+def _frame():
+    df = random_frame(1_200)
+    df.index = pd.date_range("2024-01-01", periods=len(df), freq="h")
+    df["signal"] = np.sin(np.arange(len(df)) / 9.0) + np.linspace(0, 1, len(df))
+    targets = (df["close"].shift(-1) > df["close"]).to_numpy(dtype=int)
+    return df, targets
+
+
+def test_rolling_and_expanding_folds():
+    rolling = walk_forward_folds(100, train_size=40, test_size=25, gap=2)
+    assert [(f.train.start, f.train.stop, f.test.start, f.test.stop) for f in rolling] == [
+        (0, 40, 42, 67),
+        (25, 65, 67, 92),
+        (50, 90, 92, 100),
+    ]
+    expanding = walk_forward_folds(100, train_size=40, test_size=30, step=35, expanding=True)
+    assert [(f.train.start, f.train.stop, f.test.start, f.test.stop) for f in expanding] == [
+        (0, 40, 40, 70),
+        (0, 75, 75, 100),
+    ]
+    with pytest.raises(ValueError):
+        walk_forward_folds(100, train_size=40, test_size=30, step=10)
+    with pytest.raises(ValueError):
+        walk_forward_folds(100, train_size=0, test_size=30)
+
+
+@pytest.mark.parametrize("executor", ["serial", "thread", "process"])
+def test_folds_match_individually_trained_backtests(executor):
+    df, targets = _frame()
+    walk = WalkForward(df, ["signal"], targets, 300, 200, gap=1, model_factory=_LevelModel)
+
+    result = walk.run(sl=0.01, tp=0.02, executor=executor, max_workers=2)
+
+    assert list(result.folds.columns) == FOLD_COLUMNS
+    assert len(result.folds) == len(walk.folds) == 5
+    assert result.predictions.index.equals(df.index[301:])
+    returns = []
+    for fold, row in zip(walk.folds, result.folds.to_dict("records")):
+        model = _LevelModel().fit(df.iloc[fold.train], targets[fold.train])
+        window = df.iloc[fold.test].copy()
+        window["prediction"] = model.predict_proba(window)[:, 1]
+        np.testing.assert_array_equal(result.predictions.loc[window.index], window["prediction"])
+        expected = StrategyRunner(window).run_backtest(
+            entry_rule="prediction > 0.55", exit_rule="prediction < 0.5", sl=0.01, tp=0.02
+        )
+        assert row["test_start"] == window.index[0] and row["test_end"] == window.index[-1]
+        for key in FOLD_COLUMNS[6:]:
+            assert row[key] == expected[key]
+        returns.extend(trade["return_pct"] for trade in expected["ledger"])
+
+    assert result.statistics["trades"] == len(result.ledger) == len(returns)
+    assert [trade["return_pct"] for trade in result.ledger] == returns
+    close = df["close"].to_numpy()
+    for trade in result.ledger:
+        assert trade["entry_price"] == close[trade["entry_index"]]
+
+
+def test_walk_forward_validates_inputs():
+    df, targets = _frame()
+    with pytest.raises(ValueError):
+        WalkForward(df, ["missing"], targets, 300, 200, model_factory=_LevelModel)
+    with pytest.raises(ValueError):
+        WalkForward(df, ["signal"], targets[:-1], 300, 200, model_factory=_LevelModel)
+    with pytest.raises(ValueError):
+        WalkForward(df, ["signal"], targets, 1_200, 200, model_factory=_LevelModel)
+    walk = WalkForward(df, ["signal"], targets, 300, 200, model_factory=_LevelModel)
+    with pytest.raises(ValueError):
+        walk.run(sl=0.01, tp=0.02, executor="cluster")
+
+
+def test_alpha_model_is_the_default_model():
+    pytest.importorskip("xgboost")
+    pytest.importorskip("sklearn")
+    df, targets = _frame()
+
+    result = WalkForward(df, ["signal"], targets, 600, 300).run(sl=0.01, tp=0.02, executor="serial")
+
+    assert len(result.folds) == 2
+    assert result.predictions.between(0, 1).all()
@@ -0,0 +1,35 @@
+"""Helpers shared by the engine test modules: synthetic OHLCV frames and result checks."""
+
+import numpy as np
+import pandas as pd
+
+
+def random_frame(rows: int = 500, seed: int = 7) -> pd.DataFrame:
+    """Random-walk OHLCV bars; the same ``seed`` always gives the same frame."""
+
+    rng = np.random.default_rng(seed)
+    close = np.cumsum(rng.normal(0, 0.5, rows)) + 100
+    open_ = close + rng.normal(0, 0.1, rows)
+    high = np.maximum(open_, close) + rng.normal(0.2, 0.1, rows)
+    low = np.minimum(open_, close) - rng.normal(0.2, 0.1, rows)
+    volume = rng.integers(1_000, 5_000, rows)
+    return pd.DataFrame({"open": open_, "high": high, "low": low, "close": close, "volume": volume})
+
+
+def flat_frame(rows: int = 120) -> pd.DataFrame:
+    # Repeated closes exercise the NaN gaps in OBV and zero ranges in STOCH.
+    frame = random_frame(rows, seed=3)
+    frame.loc[10:30, ["open", "high", "low", "close"]] = 101.0
+    frame["close"] = frame["close"].round(1)
+    return frame
+
+
+def assert_same_backtest(left, right):
+    """Assert two ``run_backtest`` results are equal, comparing array values element-wise."""
+
+    assert left.keys() == right.keys()
+    for key, value in left.items():
+        if isinstance(value, np.ndarray):
+            np.testing.assert_array_equal(value, right[key])
+        else:
+            assert value == right[key], key
@@ -0,0 +1,162 @@
+"""Multi-timeframe feature stage.
+
+Base-frequency OHLCV bars are resampled to higher timeframes, indicators are
+computed on each timeframe and the results are joined back onto the base
+index.  A base bar only ever sees the most recent *completed* higher-timeframe
+bar, so no value depends on prices that were not yet known when the base bar
+closed.  The stage keeps the raw rows of each still-open bin together with
+streaming indicator state, so new bars are handled without re-aggregating or
+re-computing the history.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass, field
+from typing import Dict, List, Mapping, Optional, Sequence
+
+import numpy as np
+import pandas as pd
+
+from engine.feature_engine import BACKENDS, FeatureEngine, IndicatorSpec, _as_indicator
+
+OHLCV_AGGREGATION: Mapping[str, str] = {
+    "open": "first",
+    "high": "max",
+    "low": "min",
+    "close": "last",
+    "volume": "sum",
+}
+
+
+def resample_ohlcv(df: pd.DataFrame, timeframe: str) -> pd.DataFrame:
+    """Aggregate base bars into ``timeframe`` bars labelled by their (left-closed) start.
+
+    Fixed-length timeframes are anchored at the Unix epoch so that resampling
+    any slice of the data yields the same bin edges.  Bins without base bars
+    are dropped.
+    """
+
+    if not isinstance(df.index, pd.DatetimeIndex):
+        raise ValueError("Resampling requires a DatetimeIndex")
+    options = {"label": "left", "closed": "left"}
+    if isinstance(pd.tseries.frequencies.to_offset(timeframe), pd.tseries.offsets.Tick):
+        options["origin"] = "epoch"
+    bars = df[list(OHLCV_AGGREGATION)].resample(timeframe, **options).agg(OHLCV_AGGREGATION)
+    return bars[bars["close"].notna()]
+
+
+@dataclass
+class _TimeframeState:
+    """Completed bars, indicator state and the still-open bin of one timeframe."""
+
+    engine: Optional[FeatureEngine] = None
+    bars: Optional[pd.DataFrame] = None
+    pending: Optional[pd.DataFrame] = None
+    last_features: Optional[pd.DataFrame] = None
+
+
+@dataclass
+class MultiTimeframeFeatures:
+    """Compute indicators on higher timeframes and align them to the base bars.
+
+    ``timeframes`` are pandas offset aliases such as ``"5min"``, ``"1h"`` or
+    ``"1D"``.  Indicator columns are suffixed with their timeframe, e.g.
+    ``RSI_1h``.  Each base bar receives the values of the last higher-timeframe
+    bar that closed before the base bar's own bin opened.
+
+    Call :meth:`fit_transform` with the history, then :meth:`update` with each
+    batch of newly arrived bars.  Updates aggregate only the open bin plus the
+    new rows; indicators with streaming support advance one completed bar at
+    a time and others are recomputed over the (much shorter) resampled series.
+    """
+
+    timeframes: Sequence[str]
+    indicators: Optional[Mapping[str, IndicatorSpec]] = None
+    backend: str = "numpy"
+    _states: Dict[str, _TimeframeState] = field(default_factory=dict, init=False, repr=False)
+
+    def __post_init__(self) -> None:
+        if not self.timeframes:
+            raise ValueError("At least one timeframe is required")
+        if self.backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{self.backend}'. Expected one of: " + ", ".join(sorted(BACKENDS))
+            )
+        configured = BACKENDS[self.backend] if self.indicators is None else self.indicators
+        specs = [_as_indicator(key, spec) for key, spec in configured.items()]
+        self._streaming = all(spec.stream is not None for spec in specs)
+        self._columns = list(dict.fromkeys(column for spec in specs for column in spec.outputs))
+
+    @property
+    def columns(self) -> List[str]:
+        """Names of the columns added to the base bars."""
+
+        return [f"{column}_{timeframe}" for timeframe in self.timeframes for column in self._columns]
+
+    def fit_transform(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Reset the stage and return ``df`` joined with every timeframe's indicators."""
+
+        self._states = {timeframe: _TimeframeState() for timeframe in self.timeframes}
+        return self._process(df)
+
+    def update(self, df_tail: pd.DataFrame) -> pd.DataFrame:
+        """Consume bars that follow the data seen so far and return them enriched."""
+
+        if not self._states:
+            return self.fit_transform(df_tail)
+        return self._process(df_tail)
+
+    def _process(self, rows: pd.DataFrame) -> pd.DataFrame:
+        if not isinstance(rows.index, pd.DatetimeIndex):
+            raise ValueError("Multi-timeframe features require a DatetimeIndex")
+        enriched = rows.copy()
+        for timeframe in self.timeframes:
+            joined = self._advance(self._states[timeframe], timeframe, rows)
+            for column in self._columns:
+                enriched[f"{column}_{timeframe}"] = joined[column]
+        return enriched
+
+    def _advance(
+        self, state: _TimeframeState, timeframe: str, rows: pd.DataFrame
+    ) -> Dict[str, np.ndarray]:
+        """Fold ``rows`` into ``state`` and return the aligned feature columns for them."""
+
+        pending = rows if state.pending is None else pd.concat([state.pending, rows])
+        binned = resample_ohlcv(pending, timeframe)
+        if binned.empty:
+            return {column: np.full(len(rows), np.nan) for column in self._columns}
+        completed = binned.iloc[:-1]
+        state.pending = pending[pending.index >= binned.index[-1]]
+
+        # Feature rows visible to ``rows``: the last bar completed before this
+        # call followed by the bars completed by it.
+        lookup = [] if state.last_features is None else [state.last_features]
+        if not completed.empty:
+            lookup.append(self._completed_features(state, completed))
+        if not lookup:
+            return {column: np.full(len(rows), np.nan) for column in self._columns}
+        features = pd.concat(lookup) if len(lookup) > 1 else lookup[0]
+        state.last_features = features.iloc[-1:]
+
+        # Each row reads the bar preceding the bin it falls into.
+        labels = features.index.append(binned.index[-1:])
+        previous = labels.searchsorted(rows.index, side="right") - 2
+        values = features.to_numpy(dtype=np.float64)
+        usable = previous >= 0
+        return {
+            column: np.where(usable, values[np.maximum(previous, 0), position], np.nan)
+            for position, column in enumerate(self._columns)
+        }
+
+    def _completed_features(self, state: _TimeframeState, completed: pd.DataFrame) -> pd.DataFrame:
+        """Return indicator values for newly completed bars, advancing the indicator state."""
+
+        if self._streaming and state.engine is not None:
+            return state.engine.extend(completed)[self._columns]
+        # Without streaming support indicators are recomputed over all completed bars.
+        state.bars = completed if state.bars is None else pd.concat([state.bars, completed])
+        state.engine = FeatureEngine(
+            state.bars, indicators=self.indicators, dropna=False, backend=self.backend
+        )
+        features = state.engine.add_indicators(overwrite=True)
+        return features[self._columns].iloc[-len(completed) :]
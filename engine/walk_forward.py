@@ -0,0 +1,254 @@
+"""Walk-forward evaluation of a model-driven strategy on out-of-sample windows.
+
+The series is cut into consecutive folds, each a training window followed by
+a test window.  For every fold a fresh model is fitted on the training rows,
+its probabilities for the test rows are written to a ``prediction`` column,
+and the test window is backtested by :class:`~engine.strategy_runner.StrategyRunner`
+with rules that read that column.  Features are computed once for the full
+series by the caller; the folds only slice them, and a process pool receives
+the frame once per worker through its initializer, as
+:meth:`StrategyRunner.run_grid` does with its rule events.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from engine.backtest import LEDGER_DTYPE, TradeLedger
+from engine.parallel import map_shared
+from engine.strategy_runner import StrategyRunner
+
+PREDICTION_COLUMN = "prediction"
+
+FOLD_LEDGER_DTYPE = np.dtype([("fold", np.int64), *LEDGER_DTYPE.descr])
+
+FOLD_COLUMNS = [
+    "fold",
+    "train_start",
+    "train_end",
+    "test_start",
+    "test_end",
+    "accuracy",
+    "trades",
+    "win_rate",
+    "average_return",
+    "cumulative_return",
+    "max_drawdown",
+]
+
+
+@dataclass(frozen=True)
+class Fold:
+    """Row positions of one fold: train on ``train``, evaluate on ``test``."""
+
+    number: int
+    train: slice
+    test: slice
+
+
+def walk_forward_folds(
+    length: int,
+    *,
+    train_size: int,
+    test_size: int,
+    step: Optional[int] = None,
+    expanding: bool = False,
+    gap: int = 0,
+) -> List[Fold]:
+    """Split ``length`` rows into walk-forward folds.
+
+    Test windows of ``test_size`` rows start every ``step`` rows (default
+    ``test_size``) after the first ``train_size + gap`` rows; the last one is
+    truncated at the end of the data.  Each training window ends ``gap`` rows
+    before its test window, which keeps labels that look ahead from leaking
+    into it, and spans ``train_size`` rows or, with ``expanding=True``, every
+    row from the start of the series.
+    """
+
+    step = test_size if step is None else step
+    if train_size < 1 or test_size < 1:
+        raise ValueError("train_size and test_size must be at least 1")
+    if step < test_size:
+        raise ValueError("step must be at least test_size so test windows do not overlap")
+    if gap < 0:
+        raise ValueError("gap must be non-negative")
+
+    folds = []
+    for start in range(train_size + gap, length, step):
+        train_end = start - gap
+        train_start = 0 if expanding else train_end - train_size
+        folds.append(
+            Fold(len(folds), slice(train_start, train_end), slice(start, min(start + test_size, length)))
+        )
+    return folds
+
+
+def _alpha_model() -> Any:
+    # Imported here so the scheduler works with other models when xgboost is unavailable.
+    from engine.models import AlphaModel
+
+    return AlphaModel()
+
+
+@dataclass
+class WalkForwardResult:
+    """Outcome of :meth:`WalkForward.run`.
+
+    ``folds`` has one row per fold with its window bounds (index labels,
+    inclusive), the test accuracy at a 0.5 threshold and the statistics of
+    its backtest.  ``predictions`` holds the out-of-sample probability of
+    every test row.  ``ledger`` holds the trades of all folds with a
+    ``fold`` column and positions relative to the full frame, and
+    ``statistics`` summarises those trades as :meth:`StrategyRunner.run_backtest`
+    does.
+    """
+
+    folds: pd.DataFrame
+    predictions: pd.Series
+    ledger: TradeLedger
+    statistics: Dict[str, object]
+
+
+@dataclass
+class _FoldJob:
+    frame: pd.DataFrame
+    feature_columns: List[str]
+    targets: np.ndarray
+    model_factory: Callable[[], Any]
+    entry_rule: Any
+    exit_rule: Any
+    sl: float
+    tp: float
+
+
+def _run_fold(fold: Fold, job: _FoldJob) -> Tuple[np.ndarray, float, Dict[str, object]]:
+    """Fit a model on the fold's training rows and backtest its test rows.
+
+    Returns the test probabilities, the test accuracy and the backtest result.
+    """
+
+    features = job.frame[job.feature_columns]
+    model = job.model_factory()
+    model.fit(features.iloc[fold.train], job.targets[fold.train])
+    probabilities = np.asarray(model.predict_proba(features.iloc[fold.test]))[:, -1]
+    accuracy = float(((probabilities >= 0.5) == (job.targets[fold.test] == 1)).mean())
+
+    window = job.frame.iloc[fold.test].copy()
+    window[PREDICTION_COLUMN] = probabilities
+    backtest = StrategyRunner(window).run_backtest(
+        entry_rule=job.entry_rule, exit_rule=job.exit_rule, sl=job.sl, tp=job.tp
+    )
+    return probabilities, accuracy, backtest
+
+
+@dataclass
+class WalkForward:
+    """Retrain a model per fold and backtest its predictions out of sample.
+
+    ``frame`` is the enriched frame for the full series (it needs a
+    ``close`` column and the ``feature_columns``) and ``targets`` holds one
+    label per row.  ``model_factory`` returns a fresh, unfitted model with
+    ``fit(X, y)`` and ``predict_proba(X)`` for every fold; it defaults to
+    :class:`~engine.models.AlphaModel`.  The remaining fields are passed to
+    :func:`walk_forward_folds`.
+    """
+
+    frame: pd.DataFrame
+    feature_columns: Sequence[str]
+    targets: Any
+    train_size: int
+    test_size: int
+    step: Optional[int] = None
+    expanding: bool = False
+    gap: int = 0
+    model_factory: Callable[[], Any] = _alpha_model
+
+    def __post_init__(self) -> None:
+        if "close" not in self.frame.columns:
+            raise ValueError("Dataframe must contain a 'close' column for PnL calculations")
+        missing = [column for column in self.feature_columns if column not in self.frame.columns]
+        if missing:
+            raise ValueError(f"Feature columns missing from the frame: {missing}")
+        self.targets = np.asarray(self.targets)
+        if self.targets.shape != (len(self.frame),):
+            raise ValueError(f"Expected one target per row, got shape {self.targets.shape}")
+        self.folds = walk_forward_folds(
+            len(self.frame),
+            train_size=self.train_size,
+            test_size=self.test_size,
+            step=self.step,
+            expanding=self.expanding,
+            gap=self.gap,
+        )
+        if not self.folds:
+            raise ValueError("The frame is too short for a single fold")
+
+    def run(
+        self,
+        *,
+        entry_rule="prediction > 0.55",
+        exit_rule="prediction < 0.5",
+        sl: float,
+        tp: float,
+        executor: str = "process",
+        max_workers: Optional[int] = None,
+    ) -> WalkForwardResult:
+        """Fit and backtest every fold, ``executor`` choosing how folds run in parallel.
+
+        The rules may read the ``prediction`` column alongside any column of
+        the frame.  ``executor`` is ``"process"``, ``"thread"`` or
+        ``"serial"`` as in :meth:`StrategyRunner.run_grid`; process pools
+        pickle the model factory and rules, so these must be module-level
+        callables or strings.  Positions still open at the end of a test
+        window are closed there with reason ``end_of_data``.
+        """
+
+        model, columns = self.model_factory, list(self.feature_columns)
+        job = _FoldJob(self.frame, columns, self.targets, model, entry_rule, exit_rule, sl, tp)
+        if executor == "serial":
+            outcomes = [_run_fold(fold, job) for fold in self.folds]
+        else:
+            outcomes = map_shared(executor, max_workers, _run_fold, self.folds, job)
+
+        index = self.frame.index
+        rows = []
+        ledger = np.empty(sum(len(backtest["ledger"]) for _, _, backtest in outcomes), FOLD_LEDGER_DTYPE)
+        filled = 0
+        for fold, (_probabilities, accuracy, backtest) in zip(self.folds, outcomes):
+            rows.append(
+                {
+                    "fold": fold.number,
+                    "train_start": index[fold.train.start],
+                    "train_end": index[fold.train.stop - 1],
+                    "test_start": index[fold.test.start],
+                    "test_end": index[fold.test.stop - 1],
+                    "accuracy": accuracy,
+                    **{key: backtest[key] for key in FOLD_COLUMNS[6:]},
+                }
+            )
+            trades = backtest["ledger"].records
+            part = ledger[filled : filled + len(trades)]
+            for name in LEDGER_DTYPE.names:
+                part[name] = trades[name]
+            part["fold"] = fold.number
+            part["entry_index"] += fold.test.start
+            part["exit_index"] += fold.test.start
+            filled += len(trades)
+
+        tested = np.concatenate([np.arange(fold.test.start, fold.test.stop) for fold in self.folds])
+        predictions = pd.Series(
+            np.concatenate([probabilities for probabilities, _, _ in outcomes]),
+            index=index[tested],
+            name=PREDICTION_COLUMN,
+        )
+        statistics = StrategyRunner._statistics(ledger["return_pct"])
+        return WalkForwardResult(
+            folds=pd.DataFrame(rows, columns=FOLD_COLUMNS),
+            predictions=predictions,
+            ledger=TradeLedger(ledger),
+            statistics=statistics,
+        )
@@ -3,12 +3,16 @@
 from __future__ import annotations
 
 import argparse
+from pathlib import Path
+from typing import Any, Dict, Mapping
 
 import numpy as np
 
-from engine.feature_engine import FeatureEngine
+from engine.cache import FeatureCache
+from engine.feature_engine import NORMALIZERS, FeatureEngine, normalization_indicators
 from engine.models import AlphaModel
 from engine.strategy_runner import StrategyRunner
+from engine.walk_forward import WalkForward
 from utils.data_loader import OHLCVLoader
 
 
@@ -18,6 +22,42 @@ def parse_args() -> argparse.Namespace:
     parser.add_argument("--train-test-split", type=float, default=0.2, dest="test_size")
     parser.add_argument("--take-profit", type=float, default=0.1)
     parser.add_argument("--stop-loss", type=float, default=0.05)
+    parser.add_argument(
+        "--dtype",
+        choices=["float64", "float32"],
+        default="float64",
+        help="Floating point type of the feature matrix",
+    )
+    parser.add_argument(
+        "--normalize",
+        choices=sorted(NORMALIZERS),
+        default=None,
+        help="Train on normalised indicators instead of raw levels",
+    )
+    parser.add_argument(
+        "--normalize-window",
+        type=int,
+        default=100,
+        help="Window of the rolling z-score and rank normalisations",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=None,
+        help="Directory for the on-disk feature cache (disabled when omitted)",
+    )
+    parser.add_argument(
+        "--walk-forward",
+        type=int,
+        default=0,
+        metavar="FOLDS",
+        help="Also retrain and backtest out of sample on this many expanding walk-forward folds",
+    )
+    parser.add_argument(
+        "--backtest-arrays",
+        default=None,
+        metavar="PATH",
+        help="Save the backtest's equity and drawdown arrays and its trade ledger to this .npz file",
+    )
     return parser.parse_args()
 
 
@@ -27,19 +67,25 @@ def build_targets(close_prices: np.ndarray, threshold: float = 0.0) -> np.ndarra
     return (future_returns > threshold).astype(int)
 
 
+def summarize(result: Mapping[str, Any]) -> Dict[str, Any]:
+    """Return the scalar statistics of a backtest result, leaving out arrays and the ledger."""
+
+    return {key: value for key, value in result.items() if isinstance(value, (int, float, np.number))}
+
+
+def save_arrays(path: str, result: Mapping[str, Any]) -> None:
+    """Write the array entries of a backtest result, and its ledger records, to ``path``."""
+
+    arrays = {key: value for key, value in result.items() if isinstance(value, np.ndarray)}
+    np.savez(path, ledger=result["ledger"].records, **arrays)
+
+
 def main() -> None:
     args = parse_args()
 
     loader = OHLCVLoader(args.source)
     df = loader.load()
 
-    engine = FeatureEngine(df)
-    enriched_df = engine.add_indicators()
-
-    targets = build_targets(enriched_df["close"].to_numpy(), threshold=0.01)
-    enriched_df = enriched_df.iloc[:-1].copy()
-    targets = targets[:-1]
-
     feature_columns = [
         "EMA_10",
         "EMA_50",
@@ -54,6 +100,19 @@ def main() -> None:
         "STOCH_K",
         "STOCH_D",
     ]
+    normalizers = {}
+    if args.normalize:
+        normalizers = normalization_indicators(feature_columns, args.normalize, args.normalize_window)
+        feature_columns = list(normalizers)
+
+    cache = FeatureCache(Path(args.cache_dir)) if args.cache_dir else None
+    engine = FeatureEngine(df, cache=cache, dtype=args.dtype)
+    enriched_df = engine.add_indicators(normalizers)
+
+    targets = build_targets(enriched_df["close"].to_numpy(), threshold=0.01)
+    enriched_df = enriched_df.iloc[:-1].copy()
+    targets = targets[:-1]
+
     X = enriched_df[feature_columns]
 
     model = AlphaModel()
@@ -67,7 +126,21 @@ def main() -> None:
         sl=args.stop_loss,
         tp=args.take_profit,
     )
-    print("Backtest summary:", backtest)
+    print("Backtest summary:", summarize(backtest))
+    if args.backtest_arrays:
+        save_arrays(args.backtest_arrays, backtest)
+        print("Backtest arrays saved to", args.backtest_arrays)
+
+    if args.walk_forward > 0:
+        # The first window trains only; each fold then tests one further window.
+        window = len(enriched_df) // (args.walk_forward + 1)
+        walk_forward = WalkForward(
+            enriched_df, feature_columns, targets, window, window, expanding=True, gap=1
+        )
+        result = walk_forward.run(sl=args.stop_loss, tp=args.take_profit)
+        print("Walk-forward folds:")
+        print(result.folds.to_string(index=False))
+        print("Out-of-sample summary:", summarize(result.statistics))
 
 
 if __name__ == "__main__":
@@ -1,5 +1,8 @@
+import os
+
 import streamlit as st
 import pandas as pd
+from engine.cache import FeatureCache
 from engine.feature_engine import FeatureEngine
 from utils.data_loader import OHLCVLoader
 
@@ -12,7 +15,8 @@ if csv_file:
     df = pd.read_csv(csv_file)
     loader = OHLCVLoader(csv_file)
     raw = loader.load()
-    fe = FeatureEngine(raw)
+    cache = FeatureCache(os.environ.get("ALPHA_FEATURE_CACHE", ".feature_cache"))
+    fe = FeatureEngine(raw, cache=cache)
     enriched = fe.add_indicators()
 
     st.subheader("Enriched Indicators")
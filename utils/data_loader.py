@@ -11,10 +11,15 @@ import yfinance as yf
 
 @dataclass
 class OHLCVLoader:
-    """Load OHLCV data from CSV files or directly from yfinance."""
+    """Load OHLCV data from CSV files or directly from yfinance.
+
+    With ``datetime_index`` the rows are indexed by ``date_column``, which the
+    multi-timeframe stage in :mod:`engine.timeframes` requires.
+    """
 
     source: str
     date_column: str = "date"
+    datetime_index: bool = False
 
     def load(self) -> pd.DataFrame:
         if self.source.lower().endswith(".csv"):
@@ -34,4 +39,8 @@ class OHLCVLoader:
         if missing:
             raise ValueError(f"Data source missing required columns: {missing}")
 
+        if self.datetime_index:
+            if self.date_column not in df.columns:
+                raise ValueError(f"Data source has no '{self.date_column}' column to index by")
+            return df.set_index(self.date_column)[columns]
         return df[columns].reset_index(drop=True)